@@ -0,0 +1,30 @@
+"""Add totp code organization, identifier and workflow run index
+
+Revision ID: c4e7a1d2f9b3
+Revises: b0f1a2c3d4e5
+Create Date: 2025-08-18 12:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c4e7a1d2f9b3"
+down_revision: Union[str, None] = "b0f1a2c3d4e5"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "totp_code_org_identifier_run_index",
+        "totp_codes",
+        ["organization_id", "totp_identifier", "workflow_run_id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("totp_code_org_identifier_run_index", table_name="totp_codes")
@@ -0,0 +1,146 @@
+"""
+Measure the memory held by the elements of a scraped page, with and without compact_elements.
+
+The elements are read from a JSON file with the elements of a recorded page (the first item returned by
+buildTreeFromBody, e.g. saved from the browser console), or generated. The nested children are relinked to the
+elements with the same id, as the browser returns them.
+"""
+
+import copy
+import json
+import random
+import tracemalloc
+from pathlib import Path
+from typing import Annotated, Any, Optional
+
+import typer
+from pydantic import BaseModel
+
+from skyvern.webeye.scraper.element_store import compact_elements
+from skyvern.webeye.scraper.scraper import ScrapedPage, build_element_dict, trim_element_tree
+
+TAG_NAMES = ["div", "span", "a", "button", "input", "label", "li", "img", "select", "option"]
+CLASS_NAMES = ["btn", "btn-primary", "form-control", "nav-item", "card", "row", "col-md-6", "text-muted"]
+
+
+class BaselineScrapedPage(BaseModel):
+    # the element fields of ScrapedPage before compact_elements, validated and so copied by pydantic
+    elements: list[dict]
+    id_to_element_dict: dict[str, dict]
+    element_tree: list[dict]
+    element_tree_trimmed: list[dict]
+
+
+def generate_page(element_count: int) -> str:
+    rng = random.Random(42)
+    elements: list[dict[str, Any]] = []
+    for idx in range(element_count):
+        tag_name = rng.choice(TAG_NAMES)
+        attributes: dict[str, Any] = {"class": " ".join(rng.sample(CLASS_NAMES, 2)), "unique_id": f"{idx:04X}"}
+        if tag_name == "a":
+            attributes["href"] = f"https://example.com/products/{rng.randrange(10**6)}?ref=navigation"
+        if tag_name == "input":
+            attributes.update({"type": rng.choice(["text", "email", "checkbox"]), "name": f"field_{idx % 20}"})
+        if rng.random() < 0.3:
+            attributes["aria-label"] = rng.choice(["Close", "Open menu", "Search", "Next"])
+        left, top = rng.uniform(0, 1200), rng.uniform(0, 8000)
+        width, height = rng.uniform(10, 300), rng.uniform(10, 60)
+        elements.append(
+            {
+                "id": f"{idx:04X}",
+                "frame": "main.frame",
+                "frame_index": 0,
+                "interactable": tag_name in {"a", "button", "input", "select"},
+                "tagName": tag_name,
+                "attributes": attributes,
+                "beforePseudoText": None,
+                "text": rng.choice(["", "Submit", "Learn more", f"Item {idx}"]),
+                "afterPseudoText": None,
+                "children": [],
+                "rect": {
+                    "bottom": top + height,
+                    "top": top,
+                    "left": left,
+                    "right": left + width,
+                    "width": width,
+                    "height": height,
+                },
+                "purgeable": False,
+                "keepAllAttr": False,
+                "isSelectable": tag_name == "select",
+            }
+        )
+    for idx, element in enumerate(elements[1:], start=1):
+        elements[rng.randrange(idx)]["children"].append(element)
+    # the children are nested copies in the JSON, as in a recorded page
+    return json.dumps(elements)
+
+
+def load_page(page_json: str) -> tuple[list[dict], list[dict]]:
+    elements = json.loads(page_json)
+    id_to_element = {element["id"]: element for element in elements}
+    child_ids: set[str] = set()
+    for element in elements:
+        element["children"] = [id_to_element.get(child["id"], child) for child in element.get("children", [])]
+        child_ids.update(child["id"] for child in element["children"])
+    element_tree = [element for element in elements if element["id"] not in child_ids]
+    return elements, element_tree
+
+
+def build_page(page_json: str, compact: bool) -> BaseModel:
+    elements, element_tree = load_page(page_json)
+    if compact:
+        compact_elements(elements)
+    # stands for the cleanup of the element tree, which works on a copy
+    element_tree = copy.deepcopy(element_tree)
+    element_tree_trimmed = trim_element_tree(copy.deepcopy(element_tree))
+    id_to_css_dict, id_to_element_dict, id_to_frame_dict, id_to_element_hash, hash_to_element_ids = build_element_dict(
+        elements
+    )
+    if not compact:
+        return BaselineScrapedPage(
+            elements=elements,
+            id_to_element_dict=id_to_element_dict,
+            element_tree=element_tree,
+            element_tree_trimmed=element_tree_trimmed,
+        )
+    return ScrapedPage(
+        elements=elements,
+        id_to_css_dict=id_to_css_dict,
+        id_to_element_dict=id_to_element_dict,
+        id_to_frame_dict=id_to_frame_dict,
+        id_to_element_hash=id_to_element_hash,
+        hash_to_element_ids=hash_to_element_ids,
+        element_tree=element_tree,
+        element_tree_trimmed=element_tree_trimmed,
+        screenshots=[],
+        url="https://example.com",
+        html="",
+        _browser_state=None,
+        _clean_up_func=None,
+        _scrape_exclude=None,
+    )
+
+
+def measure(page_json: str, compact: bool) -> int:
+    tracemalloc.start()
+    scraped_page = build_page(page_json, compact)
+    held_bytes, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del scraped_page
+    return held_bytes
+
+
+def main(
+    page_file: Annotated[Optional[Path], typer.Argument()] = None,
+    elements: int = 5000,
+) -> None:
+    page_json = page_file.read_text() if page_file else generate_page(elements)
+    baseline_bytes = measure(page_json, compact=False)
+    compact_bytes = measure(page_json, compact=True)
+    print(f"baseline: {baseline_bytes / 2**20:.1f} MiB")
+    print(f" compact: {compact_bytes / 2**20:.1f} MiB ({1 - compact_bytes / baseline_bytes:.0%} less)")
+
+
+if __name__ == "__main__":
+    typer.run(main)
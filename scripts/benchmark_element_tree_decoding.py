@@ -0,0 +1,103 @@
+"""
+Compare the parse time and peak memory of the element tree received from the browser, as the nested objects
+serialized by playwright and in the compact wire format of buildEncodedTreeFromBody.
+
+The elements are read from a JSON file with the elements of a recorded page (the first item returned by
+buildTreeFromBody), or generated, see benchmark_element_memory.py.
+"""
+
+import json
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Annotated, Any, Callable, Optional
+
+import typer
+from playwright._impl._js_handle import parse_value, serialize_value
+
+from scripts.benchmark_element_memory import generate_page, load_page
+from skyvern.webeye.scraper.element_store import ELEMENT_TREE_WIRE_VERSION, decode_element_tree
+
+
+def encode_fields(obj: dict, string_index: Callable[[str], int], placeholder_keys: set[str]) -> list:
+    # as encodeFields in domUtils.js
+    fields: list = []
+    for key, value in obj.items():
+        if key in placeholder_keys:
+            fields.extend((-string_index(key) - 1, None))
+        elif isinstance(value, str):
+            fields.extend((string_index(key), string_index(value)))
+        else:
+            fields.extend((-string_index(key) - 1, value))
+    return fields
+
+
+def encode_element_tree(elements: list[dict], element_tree: list[dict]) -> str:
+    # as encodeElementTree in domUtils.js
+    string_indexes: dict[str, int] = {}
+
+    def string_index(value: str) -> int:
+        return string_indexes.setdefault(value, len(string_indexes))
+
+    element_indexes = {id(element): idx for idx, element in enumerate(elements)}
+    parents = [-2] * len(elements)
+    for root in element_tree:
+        parents[element_indexes[id(root)]] = -1
+    records = []
+    for idx, element in enumerate(elements):
+        for child in element.get("children", []):
+            if id(child) in element_indexes:
+                parents[element_indexes[id(child)]] = idx
+        records.append(
+            [
+                encode_fields(element, string_index, {"children", "attributes"}),
+                encode_fields(element.get("attributes", {}), string_index, set()),
+            ]
+        )
+    return json.dumps(
+        {
+            "version": ELEMENT_TREE_WIRE_VERSION,
+            "strings": list(string_indexes),
+            "elements": records,
+            "parents": parents,
+        }
+    )
+
+
+def measure(name: str, message: str, parse: Callable[[str], Any], repeat: int) -> None:
+    durations = []
+    for _ in range(repeat):
+        t_start = time.perf_counter()
+        parse(message)
+        durations.append(time.perf_counter() - t_start)
+    tracemalloc.start()
+    parse(message)
+    _, peak_bytes = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(
+        f"{name:>7}: message={len(message) / 2**20:.1f} MiB parse={min(durations) * 1000:.0f}ms "
+        f"peak={peak_bytes / 2**20:.1f} MiB"
+    )
+
+
+def main(
+    page_file: Annotated[Optional[Path], typer.Argument()] = None,
+    elements: int = 5000,
+    repeat: int = 5,
+) -> None:
+    elements_list, element_tree = load_page(page_file.read_text() if page_file else generate_page(elements))
+    # the driver messages carrying the evaluate results
+    nested_message = json.dumps({"value": serialize_value([elements_list, element_tree], [])})
+    encoded_message = json.dumps({"value": {"s": encode_element_tree(elements_list, element_tree)}})
+
+    measure("nested", nested_message, lambda message: parse_value(json.loads(message)["value"]), repeat)
+    measure(
+        "encoded",
+        encoded_message,
+        lambda message: decode_element_tree(parse_value(json.loads(message)["value"])),
+        repeat,
+    )
+
+
+if __name__ == "__main__":
+    typer.run(main)
@@ -0,0 +1,73 @@
+"""
+Replay LLM latencies with and without hedging and compare the latency percentiles.
+
+The latencies are read from a JSON file with a list of seconds (e.g. the duration_seconds of the
+"LLM API handler duration metrics" logs of a prompt), or sampled from a heavy-tailed distribution.
+"""
+
+import asyncio
+import json
+import logging
+import random
+from pathlib import Path
+from typing import Annotated, Optional
+
+import structlog
+import typer
+
+from skyvern.forge.sdk.api.llm.hedging import hedged_call
+
+
+def percentile(values: list[float], quantile: float) -> float:
+    ordered_values = sorted(values)
+    return ordered_values[min(int(quantile * len(ordered_values)), len(ordered_values) - 1)]
+
+
+async def replay(latencies: list[float], requests: int, hedge_quantile: float, time_scale: float) -> None:
+    rng = random.Random(0)
+    hedge_delay_seconds = percentile(latencies, hedge_quantile) * time_scale
+
+    async def fake_completion() -> float:
+        latency = rng.choice(latencies) * time_scale
+        await asyncio.sleep(latency)
+        return latency
+
+    async def timed(hedged: bool) -> tuple[float, bool]:
+        loop = asyncio.get_running_loop()
+        t_start = loop.time()
+        if hedged:
+            hedged_response = await hedged_call(fake_completion, fake_completion, hedge_delay_seconds)
+            return (loop.time() - t_start) / time_scale, hedged_response.hedged
+        await fake_completion()
+        return (loop.time() - t_start) / time_scale, False
+
+    for hedged in (False, True):
+        results = await asyncio.gather(*[timed(hedged) for _ in range(requests)])
+        durations = [duration for duration, _ in results]
+        hedge_rate = sum(1 for _, was_hedged in results if was_hedged) / requests
+        print(
+            f"{'hedged' if hedged else 'baseline':>8}: "
+            f"p50={percentile(durations, 0.5):.2f}s p95={percentile(durations, 0.95):.2f}s "
+            f"p99={percentile(durations, 0.99):.2f}s extra requests={hedge_rate:.1%}"
+        )
+
+
+def main(
+    latencies_file: Annotated[Optional[Path], typer.Argument()] = None,
+    requests: int = 500,
+    hedge_quantile: float = 0.95,
+    time_scale: float = 0.05,
+) -> None:
+    # the per-request logs would skew the simulated latencies
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.WARNING))
+    if latencies_file:
+        latencies = [float(latency) for latency in json.loads(latencies_file.read_text())]
+    else:
+        rng = random.Random(42)
+        # mostly fast responses with an occasional very slow provider response
+        latencies = [rng.lognormvariate(1.2, 0.3) if rng.random() > 0.03 else rng.uniform(20, 60) for _ in range(5000)]
+    asyncio.run(replay(latencies, requests, hedge_quantile, time_scale))
+
+
+if __name__ == "__main__":
+    typer.run(main)
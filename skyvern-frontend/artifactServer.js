@@ -1,9 +1,33 @@
 import express from "express";
 import fs from "fs";
+import zlib from "zlib";
 import cors from "cors";
 
 const app = express();
 
+// content addressed artifacts may be stored compressed, the compression is the suffix of the path
+function readArtifact(path) {
+  const contents = fs.readFileSync(path);
+  if (path.endsWith(".gz")) {
+    return zlib.gunzipSync(contents).toString("utf8");
+  }
+  if (path.endsWith(".zst")) {
+    // zstd is only built into Node 22.15 and later, the API content route decompresses it otherwise
+    if (!zlib.zstdDecompressSync) {
+      throw new Error("zstd decompression isn't supported by this Node version");
+    }
+    return zlib.zstdDecompressSync(contents).toString("utf8");
+  }
+  return contents.toString("utf8");
+}
+
+function sendReadError(res, err) {
+  if (err.code === "ENOENT") {
+    return res.status(404).send("File not found");
+  }
+  return res.status(500).send(err.message);
+}
+
 app.use(cors());
 
 app.get("/artifact/recording", (req, res) => {
@@ -61,9 +85,9 @@ app.get("/artifact/json", (req, res) => {
   if (!path) return res.status(400).send("Missing 'path' query parameter");
   let contents;
   try {
-    contents = fs.readFileSync(path, "utf8");
+    contents = readArtifact(path);
   } catch (e) {
-    return res.status(404).send("File not found");
+    return sendReadError(res, e);
   }
   try {
     const data = JSON.parse(contents);
@@ -77,10 +101,10 @@ app.get("/artifact/text", (req, res) => {
   const path = req.query.path;
   if (!path) return res.status(400).send("Missing 'path' query parameter");
   try {
-    const contents = fs.readFileSync(path, "utf8");
+    const contents = readArtifact(path);
     res.type("text/plain").send(contents);
   } catch (e) {
-    res.status(404).send("File not found");
+    sendReadError(res, e);
   }
 });
 
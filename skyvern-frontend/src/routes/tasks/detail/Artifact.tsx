@@ -1,6 +1,8 @@
-import { artifactApiClient } from "@/api/AxiosClient";
-import { ArtifactApiResponse } from "@/api/types";
+import { artifactApiClient, getClient } from "@/api/AxiosClient";
+import { ArtifactApiResponse, ArtifactType } from "@/api/types";
 import { Skeleton } from "@/components/ui/skeleton";
+import { useCredentialGetter } from "@/hooks/useCredentialGetter";
+import { apiPathPrefix } from "@/util/env";
 import { CodeEditor } from "@/routes/workflows/components/CodeEditor";
 import { useQueries } from "@tanstack/react-query";
 import axios from "axios";
@@ -52,8 +54,35 @@ type Props = {
   artifacts: Array<ArtifactApiResponse>;
 };
 
+// log artifacts are stored as append-only segments that the API stitches together
+const segmentedArtifactTypes: Array<string> = [
+  ArtifactType.SkyvernLog,
+  ArtifactType.SkyvernLogRaw,
+];
+
+// content addressed artifacts may be stored compressed, the API decompresses them
+function isCompressedArtifact(artifact: ArtifactApiResponse) {
+  return artifact.uri.endsWith(".zst") || artifact.uri.endsWith(".gz");
+}
+
 function Artifact({ type, artifacts }: Props) {
-  function fetchArtifact(artifact: ArtifactApiResponse) {
+  const credentialGetter = useCredentialGetter();
+
+  async function fetchArtifact(artifact: ArtifactApiResponse) {
+    if (segmentedArtifactTypes.includes(artifact.artifact_type)) {
+      const client = await getClient(credentialGetter);
+      return client
+        .get(`${apiPathPrefix}/artifacts/${artifact.artifact_id}/content`, {
+          responseType: "text",
+        })
+        .then((response) => response.data);
+    }
+    if (isCompressedArtifact(artifact)) {
+      const client = await getClient(credentialGetter);
+      return client
+        .get(`${apiPathPrefix}/artifacts/${artifact.artifact_id}/content`)
+        .then((response) => response.data);
+    }
     if (artifact.uri.startsWith("file://")) {
       const endpoint = getEndpoint(type);
       return artifactApiClient
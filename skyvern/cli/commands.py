@@ -5,6 +5,7 @@ from .docs import docs_app
 from .init_command import init, init_browser
 from .quickstart import quickstart_app
 from .run_commands import run_app
+from .shapes import shapes_app
 from .status import status_app
 from .stop_commands import stop_app
 from .tasks import tasks_app
@@ -25,6 +26,7 @@ cli_app.add_typer(tasks_app, name="tasks", help="Task management commands.")
 cli_app.add_typer(docs_app, name="docs", help="Open Skyvern documentation.")
 cli_app.add_typer(status_app, name="status", help="Check if Skyvern services are running.")
 cli_app.add_typer(stop_app, name="stop", help="Stop Skyvern services.")
+cli_app.add_typer(shapes_app, name="shapes", help="Export and import the recognized svg and css shapes.")
 init_app = typer.Typer(
     invoke_without_command=True,
     help="Interactively configure Skyvern and its dependencies.",
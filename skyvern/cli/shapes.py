@@ -0,0 +1,39 @@
+"""Shape store CLI helpers."""
+
+from pathlib import Path
+
+import typer
+
+from skyvern.config import settings
+from skyvern.forge.sdk.cache.shape_store import ShapeStore
+
+from .console import console
+
+shapes_app = typer.Typer(help="Export and import the recognized svg and css shapes.")
+
+
+def _get_shape_store() -> ShapeStore:
+    if not settings.SHAPE_STORE_PATH:
+        console.print("[red]The shape store is disabled, set SHAPE_STORE_PATH to enable it.[/red]")
+        raise typer.Exit(code=1)
+    return ShapeStore(settings.SHAPE_STORE_PATH)
+
+
+@shapes_app.command("export")
+def export_shapes(
+    path: Path = typer.Argument(..., help="JSON lines file to write the shapes to"),
+    limit: int | None = typer.Option(None, "--limit", help="Only export the most used shapes"),
+) -> None:
+    """Export the stored shapes, the most used first."""
+    exported_count = _get_shape_store().export_shapes(path, limit=limit)
+    console.print(f"[green]Exported {exported_count} shapes to {path}[/green]")
+
+
+@shapes_app.command("import")
+def import_shapes(
+    path: Path = typer.Argument(..., exists=True, dir_okay=False, help="JSON lines file exported by another node"),
+    overwrite: bool = typer.Option(False, "--overwrite", help="Replace the shapes already stored under the same key"),
+) -> None:
+    """Import shapes exported by another node."""
+    imported_count = _get_shape_store().import_shapes(path, overwrite=overwrite)
+    console.print(f"[green]Imported {imported_count} shapes from {path}[/green]")
@@ -17,6 +17,17 @@ class Settings(BaseSettings):
     CHROME_EXECUTABLE_PATH: str | None = None
     MAX_SCRAPING_RETRIES: int = 0
     VIDEO_PATH: str | None = "./video"
+    # the recordings are appended as segments of at least this size while they grow, each segment also refreshes the
+    # whole recording at the artifact uri
+    VIDEO_SEGMENT_MIN_SIZE_BYTES: int = 1024 * 1024
+    # screenshot and html captured after the actions: always, viewport, on_failure, sampled or last_action. The
+    # experimentation provider ARTIFACT_CAPTURE_POLICY value of a task overrides the policy of its organization
+    ARTIFACT_CAPTURE_POLICY: str = "always"
+    ARTIFACT_CAPTURE_POLICY_BY_ORGANIZATION: dict[str, str] = {}
+    ARTIFACT_CAPTURE_SAMPLE_RATE: float = 0.2
+    # random delay between two actions
+    ACTION_DELAY_MIN_SECONDS: float = 0.5
+    ACTION_DELAY_MAX_SECONDS: float = 1.0
     HAR_PATH: str | None = "./har"
     LOG_PATH: str = "./log"
     TEMP_PATH: str = "./temp"
@@ -24,7 +35,12 @@ class Settings(BaseSettings):
     BROWSER_SCREENSHOT_TIMEOUT_MS: int = 20000
     BROWSER_LOADING_TIMEOUT_MS: int = 90000
     BROWSER_SCRAPING_BUILDING_ELEMENT_TREE_TIMEOUT_MS: int = 60 * 1000  # 1 minute
+    # the encoded element tree is transferred from the browser in chunks of this many characters
+    BROWSER_SCRAPING_ELEMENT_TREE_CHUNK_SIZE: int = 16 * 1024 * 1024
     OPTION_LOADING_TIMEOUT_MS: int = 600000
+    # the waits for new options/elements after a dropdown or autocomplete interaction end once no new element has been
+    # observed for this long
+    DOM_INCREMENT_QUIET_MS: int = 1500
     MAX_STEPS_PER_RUN: int = 10
     MAX_STEPS_PER_TASK_V2: int = 25
     MAX_ITERATIONS_PER_TASK_V2: int = 10
@@ -38,6 +54,13 @@ class Settings(BaseSettings):
     DATABASE_STATEMENT_TIMEOUT_MS: int = 60000
     DISABLE_CONNECTION_POOL: bool = False
     PROMPT_ACTION_HISTORY_WINDOW: int = 1
+    # the action history is summarized (oldest reasoning then oldest actions dropped) to fit in this many tokens, None
+    # keeps the whole history of the window as before
+    PROMPT_ACTION_HISTORY_TOKEN_BUDGET: int | None = None
+    # the actions of a step are written at the end of the step, or as soon as this many of them are pending. The pending
+    # actions are only visible to the readers in the same process, 1 writes every action right away for the deployments
+    # where the API doesn't run the tasks
+    ACTION_JOURNAL_MAX_PENDING_ACTIONS: int = 20
     TASK_RESPONSE_ACTION_SCREENSHOT_COUNT: int = 3
 
     ENV: str = "local"
@@ -75,6 +98,9 @@ class Settings(BaseSettings):
 
     # Artifact storage settings
     ARTIFACT_STORAGE_PATH: str = f"{SKYVERN_DIR}/artifacts"
+    # shard the local artifact directories by a hash prefix of the task/run id to keep directories small
+    ARTIFACT_STORAGE_SHARDED: bool = False
+    ARTIFACT_STORAGE_IO_WORKERS: int = 8
     GENERATE_PRESIGNED_URLS: bool = False
     AWS_S3_BUCKET_ARTIFACTS: str = "skyvern-artifacts"
     AWS_S3_BUCKET_SCREENSHOTS: str = "skyvern-screenshots"
@@ -109,6 +135,16 @@ class Settings(BaseSettings):
 
     # Saved browser session settings
     BROWSER_SESSION_BASE_PATH: str = f"{constants.REPO_ROOT_DIR}/browser_sessions"
+    # max number of browser session files transferred in parallel when persisting or restoring a browser session
+    BROWSER_SESSION_SYNC_CONCURRENCY: int = 16
+
+    # secrets of a workflow run are resolved concurrently, with a concurrency limit per secret provider
+    AWS_SECRETS_MANAGER_CONCURRENCY: int = 8
+    CREDENTIAL_DB_CONCURRENCY: int = 8
+    # resolved secrets can be cached encrypted in memory per organization, a rotated secret is then only picked up once
+    # its entry expires. 0 disables the cache
+    SECRET_CACHE_TTL_SECONDS: float = 0
+    SECRET_CACHE_MAX_SIZE: int = 1000
 
     #####################
     # Bitwarden Configs #
@@ -135,6 +171,46 @@ class Settings(BaseSettings):
     LLM_CONFIG_TEMPERATURE: float = 0
     LLM_CONFIG_SUPPORT_VISION: bool = True  # Whether the model supports vision
     LLM_CONFIG_ADD_ASSISTANT_PREFIX: bool = False  # Whether to add assistant prefix
+    # Responses of the cache-safe prompts below are cached, keyed by the prompt, the screenshots, the model and params
+    ENABLE_LLM_RESPONSE_CACHE: bool = False
+    LLM_RESPONSE_CACHE_PROMPT_NAMES: list[str] = [
+        "svg-convert",
+        "css-shape-convert",
+        "check-phone-number-format",
+        "parse-input-or-select-context",
+    ]
+    LLM_RESPONSE_CACHE_TTL_SECONDS: int = 24 * 60 * 60
+    # Screenshots sent to the LLMs: png, jpeg or webp. LLM_SCREENSHOT_FORMATS overrides the format per provider, the
+    # provider being the litellm prefix of the model name (e.g. {"anthropic": "webp", "gemini": "jpeg"})
+    LLM_SCREENSHOT_FORMAT: str = "png"
+    LLM_SCREENSHOT_FORMATS: dict[str, str] = {}
+    LLM_SCREENSHOT_QUALITY: int = 80
+    LLM_SCREENSHOT_MAX_DIMENSION: int | None = None
+    LLM_SCREENSHOT_CACHE_SIZE: int = 32
+    # providers (litellm prefix of the model name) getting an explicit cache_control marker on the static prompt prefix
+    LLM_PROMPT_CACHE_CONTROL_PROVIDERS: list[str] = ["anthropic"]
+    # Process wide LLM request scheduling. LLM_RATE_LIMITS maps the model names to their budgets, e.g.
+    # {"gpt-4o": {"requests_per_minute": 500, "tokens_per_minute": 800000}}
+    ENABLE_LLM_SCHEDULER: bool = True
+    LLM_RATE_LIMITS: dict[str, dict[str, int]] = {}
+    LLM_HIGH_PRIORITY_PROMPT_NAMES: list[str] = ["extract-action", "task_v2", "task_v2_check_completion"]
+    LLM_LOW_PRIORITY_PROMPT_NAMES: list[str] = [
+        "svg-convert",
+        "css-shape-convert",
+        "generate_workflow_run_block_description",
+    ]
+    LLM_RATE_LIMIT_MAX_RETRIES: int = 3
+    LLM_RATE_LIMIT_BACKOFF_SECONDS: float = 2
+    # stream the extract-actions responses and start executing the leading actions before the response is complete.
+    # Custom llm api handlers have to accept the stream_handler argument.
+    ENABLE_LLM_ACTION_STREAMING: bool = False
+    # concurrent svg/css shape conversions (visibility checks and secondary LLM calls) while cleaning up an element tree
+    SHAPE_CONVERSION_CONCURRENCY: int = 5
+    # path of the sqlite file of the durable store of the recognized shapes shared by the workers of a node, disabled
+    # by default. The seed is a JSON lines file exported by `skyvern shapes export`, loaded when the store is
+    # opened without overwriting the stored shapes
+    SHAPE_STORE_PATH: str | None = None
+    SHAPE_STORE_SEED_PATH: str | None = None
     # LLM PROVIDER SPECIFIC
     ENABLE_OPENAI: bool = False
     ENABLE_ANTHROPIC: bool = False
@@ -262,6 +338,11 @@ class Settings(BaseSettings):
     TOTP_LIFESPAN_MINUTES: int = 10
     VERIFICATION_CODE_INITIAL_WAIT_TIME_SECS: int = 40
     VERIFICATION_CODE_POLLING_TIMEOUT_MINS: int = 15
+    # the waiters are woken up as soon as a code is sent, the lookup interval is only a fallback for the codes whose
+    # notification was missed and for the totp verification urls
+    VERIFICATION_CODE_POLLING_INTERVAL_SECS: int = 10
+    # announce the new totp codes to the other workers with postgres LISTEN/NOTIFY
+    TOTP_CODE_NOTIFICATIONS_ENABLED: bool = True
 
     # Bitwarden Settings
     BITWARDEN_CLIENT_ID: str | None = None
@@ -281,6 +362,18 @@ class Settings(BaseSettings):
     SVG_MAX_LENGTH: int = 100000
 
     ENABLE_LOG_ARTIFACTS: bool = False
+    # log artifacts are appended as NDJSON segments. A segment is flushed when the log entity reaches a final state,
+    # when it has accumulated LOG_ARTIFACT_SEGMENT_MAX_ENTRIES entries or when the flush interval has elapsed. Each
+    # flush also stores the whole log at the artifact uri.
+    LOG_ARTIFACT_FLUSH_INTERVAL_SECONDS: float = 10
+    LOG_ARTIFACT_SEGMENT_MAX_ENTRIES: int = 500
+    # Supported compressions: none, gzip, zstd (requires the zstandard package)
+    LOG_ARTIFACT_COMPRESSION: str | None = None
+    # screenshots, prompts, element trees and html scrapes are stored once per organization, keyed by their sha256
+    ENABLE_CONTENT_ADDRESSED_ARTIFACTS: bool = False
+    # compression of the text content addressed artifacts: none, gzip, zstd (falls back to gzip without zstandard)
+    CONTENT_ADDRESSED_ARTIFACT_COMPRESSION: str | None = "zstd"
+    CONTENT_ADDRESSED_ARTIFACT_CACHE_SIZE: int = 10000
     ENABLE_CODE_BLOCK: bool = False
 
     TASK_BLOCKED_SITE_FALLBACK_URL: str = "https://www.google.com"
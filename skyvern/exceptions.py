@@ -723,6 +723,11 @@ class BrowserSessionNotRenewable(SkyvernException):
         super().__init__(f"Browser session {browser_session_id} is not renewable: {reason}")
 
 
+class BrowserSessionStoreFailed(SkyvernException):
+    def __init__(self, workflow_permanent_id: str) -> None:
+        super().__init__(f"Failed to store the browser session manifest of workflow {workflow_permanent_id}")
+
+
 class MissingBrowserAddressError(SkyvernException):
     def __init__(self, browser_session_id: str) -> None:
         super().__init__(f"Browser session {browser_session_id} does not have an address.")
@@ -61,7 +61,14 @@ from skyvern.forge.sdk.api.files import (
     wait_for_download_finished,
 )
 from skyvern.forge.sdk.api.llm.api_handler_factory import LLMAPIHandlerFactory, LLMCaller, LLMCallerManager
+from skyvern.forge.sdk.api.llm.models import LLMAPIHandler
+from skyvern.forge.sdk.api.llm.streaming import StreamedActions
 from skyvern.forge.sdk.api.llm.ui_tars_llm_caller import UITarsLLMCaller
+from skyvern.forge.sdk.artifact.capture_policy import (
+    ArtifactCapturePolicy,
+    get_action_capture,
+    get_artifact_capture_policy,
+)
 from skyvern.forge.sdk.artifact.models import ArtifactType
 from skyvern.forge.sdk.core import skyvern_context
 from skyvern.forge.sdk.core.security import generate_skyvern_webhook_headers
@@ -95,6 +102,8 @@ from skyvern.webeye.actions.actions import (
 )
 from skyvern.webeye.actions.caching import retrieve_action_plan
 from skyvern.webeye.actions.handler import ActionHandler, poll_verification_code
+from skyvern.webeye.actions.history import ActionHistoryStore
+from skyvern.webeye.actions.journal import ActionJournal
 from skyvern.webeye.actions.models import AgentStepOutput, DetailedAgentStepOutput
 from skyvern.webeye.actions.parse_actions import (
     parse_actions,
@@ -109,6 +118,9 @@ from skyvern.webeye.utils.page import SkyvernFrame
 
 LOG = structlog.get_logger()
 
+# actions that can run while the rest of a streamed extract-actions response is still being generated
+PRE_EXECUTABLE_ACTION_TYPES = [ActionType.CLICK, ActionType.INPUT_TEXT, ActionType.SELECT_OPTION, ActionType.CHECKBOX]
+
 
 class ActionLinkedNode:
     def __init__(self, action: Action) -> None:
@@ -886,6 +898,7 @@ class ForgeAgent:
             detailed_agent_step_output.extract_action_prompt = extract_action_prompt
             json_response = None
             actions: list[Action]
+            pre_executed_actions: list[tuple[Action, list[ActionResult]]] = []
 
             if engine == RunEngine.openai_cua:
                 actions, new_cua_response = await self._generate_cua_actions(
@@ -937,12 +950,26 @@ class ForgeAgent:
                     llm_api_handler = LLMAPIHandlerFactory.get_override_llm_api_handler(
                         llm_key_override, default=app.LLM_API_HANDLER
                     )
-                    json_response = await llm_api_handler(
-                        prompt=extract_action_prompt,
-                        prompt_name="extract-actions",
-                        step=step,
-                        screenshots=scraped_page.screenshots,
-                    )
+                    # the verification code check needs the whole response before any action can run
+                    if settings.ENABLE_LLM_ACTION_STREAMING and not (
+                        task.totp_verification_url or task.totp_identifier
+                    ):
+                        json_response, pre_executed_actions = await self._stream_and_pre_execute_actions(
+                            task=task,
+                            step=step,
+                            browser_state=browser_state,
+                            scraped_page=scraped_page,
+                            engine=engine,
+                            llm_api_handler=llm_api_handler,
+                            extract_action_prompt=extract_action_prompt,
+                        )
+                    else:
+                        json_response = await llm_api_handler(
+                            prompt=extract_action_prompt,
+                            prompt_name="extract-actions",
+                            step=step,
+                            screenshots=scraped_page.screenshots,
+                        )
                     try:
                         json_response = await self.handle_potential_verification_code(
                             task,
@@ -953,6 +980,10 @@ class ForgeAgent:
                         )
                         detailed_agent_step_output.llm_response = json_response
                         actions = parse_actions(task, step.step_id, step.order, scraped_page, json_response["actions"])
+                        # keep the already executed instances of the leading actions
+                        for action_idx, (pre_executed_action, _) in enumerate(pre_executed_actions):
+                            if action_idx < len(actions):
+                                actions[action_idx] = pre_executed_action
                     except NoTOTPVerificationCodeFound:
                         actions = [
                             TerminateAction(
@@ -1034,8 +1065,11 @@ class ForgeAgent:
 
             element_id_to_last_action: dict[str, int] = dict()
             for action_idx, action_node in enumerate(action_linked_list):
+                is_pre_executed = (
+                    action_idx < len(pre_executed_actions) and pre_executed_actions[action_idx][0] is action_node.action
+                )
                 context = skyvern_context.ensure_context()
-                if context.refresh_working_page:
+                if context.refresh_working_page and not is_pre_executed:
                     LOG.warning(
                         "Detected the signal to reload the page, going to reload and skip the rest of the actions",
                         task_id=task.task_id,
@@ -1058,7 +1092,7 @@ class ForgeAgent:
                         action_order=action_idx,
                     )
                     detailed_agent_step_output.actions_and_results[action_idx] = (action, [action_result])
-                    await app.DATABASE.create_action(action=action)
+                    await ActionJournal.record(action)
                     await self.record_artifacts_after_action(task, step, browser_state, engine)
                     break
 
@@ -1098,21 +1132,46 @@ class ForgeAgent:
 
                     element_id_to_last_action[action.element_id] = action_idx
 
-                if engine != RunEngine.openai_cua:
-                    self.async_operation_pool.run_operation(task.task_id, AgentPhase.action)
-                current_page = await browser_state.must_get_working_page()
-                if isinstance(action, CompleteAction) and not complete_verification:
-                    # Do not verify the complete action when complete_verification is False
-                    # set verified to True will skip the completion verification
-                    action.verified = True
-                results = await ActionHandler.handle_action(scraped_page, task, step, current_page, action)
-                detailed_agent_step_output.actions_and_results[action_idx] = (
-                    action,
-                    results,
-                )
-                # wait random time between actions to avoid detection
-                await asyncio.sleep(random.uniform(0.5, 1.0))
-                await self.record_artifacts_after_action(task, step, browser_state, engine)
+                if is_pre_executed:
+                    # executed while the rest of the actions were being streamed
+                    results = pre_executed_actions[action_idx][1]
+                    detailed_agent_step_output.actions_and_results[action_idx] = (action, results)
+                    # it was recorded before it was known to be the last action, the last action capture is done now
+                    if (
+                        results
+                        and results[-1].success
+                        and (action_idx == len(action_linked_list) - 1 or results[-1].skip_remaining_actions)
+                        and get_artifact_capture_policy(task) == ArtifactCapturePolicy.LAST_ACTION
+                    ):
+                        await self.record_artifacts_after_action(
+                            task, step, browser_state, engine, results=results, is_last_action=True
+                        )
+                else:
+                    if engine != RunEngine.openai_cua:
+                        self.async_operation_pool.run_operation(task.task_id, AgentPhase.action)
+                    current_page = await browser_state.must_get_working_page()
+                    if isinstance(action, CompleteAction) and not complete_verification:
+                        # Do not verify the complete action when complete_verification is False
+                        # set verified to True will skip the completion verification
+                        action.verified = True
+                    results = await ActionHandler.handle_action(scraped_page, task, step, current_page, action)
+                    detailed_agent_step_output.actions_and_results[action_idx] = (
+                        action,
+                        results,
+                    )
+                    # wait random time between actions to avoid detection
+                    await asyncio.sleep(
+                        random.uniform(settings.ACTION_DELAY_MIN_SECONDS, settings.ACTION_DELAY_MAX_SECONDS)
+                    )
+                    await self.record_artifacts_after_action(
+                        task,
+                        step,
+                        browser_state,
+                        engine,
+                        results=results,
+                        is_last_action=action_idx == len(action_linked_list) - 1
+                        or bool(results and results[-1].skip_remaining_actions),
+                    )
                 for result in results:
                     result.step_retry_number = step.retry_index
                     result.step_order = step.order
@@ -1249,7 +1308,9 @@ class ForgeAgent:
                             scraped_page, task, step, working_page, complete_action
                         )
                         detailed_agent_step_output.actions_and_results.append((complete_action, complete_results))
-                        await self.record_artifacts_after_action(task, step, browser_state, engine)
+                        await self.record_artifacts_after_action(
+                            task, step, browser_state, engine, results=complete_results
+                        )
 
             # if the last action is complete and is successful, check if there's a data extraction goal
             # if task has navigation goal and extraction goal at the same time, handle ExtractAction before marking step as completed
@@ -1314,6 +1375,9 @@ class ForgeAgent:
                 output=detailed_agent_step_output.to_agent_step_output(),
             )
             return failed_step, detailed_agent_step_output.get_clean_detailed_output()
+        finally:
+            # the steps that end with an exception aren't updated here
+            await ActionJournal.flush(step.step_id)
 
     async def _generate_cua_actions(
         self,
@@ -1628,7 +1692,7 @@ class ForgeAgent:
 
         actions_and_results_str = ""
         if task.include_action_history_in_verification:
-            actions_and_results_str = await self._get_action_results(task, current_step=step)
+            actions_and_results_str = await self._get_action_results(task, step, include_step=True)
 
         verification_prompt = load_prompt_with_elements(
             element_tree_builder=scraped_page_refreshed,
@@ -1690,17 +1754,43 @@ class ForgeAgent:
         step: Step,
         browser_state: BrowserState,
         engine: RunEngine,
+        results: list[ActionResult] | None = None,
+        is_last_action: bool = True,
     ) -> None:
+        """
+        The screenshot and the html are captured according to the artifact capture policy of the task, the recording
+        is always uploaded. The captures run concurrently.
+        """
         working_page = await browser_state.get_working_page()
         if not working_page:
             raise BrowserStateMissingPage()
 
+        action_failed = results is not None and not (results and results[-1].success)
+        action_capture = get_action_capture(get_artifact_capture_policy(task), action_failed, is_last_action)
+        captures = [self._record_video_after_action(task, step, browser_state)]
+        if action_capture.capture:
+            captures.append(
+                self._record_screenshot_after_action(
+                    task, step, browser_state, engine, viewport_only=action_capture.viewport_only
+                )
+            )
+            captures.append(self._record_html_after_action(task, step, working_page))
+        await asyncio.gather(*captures)
+
+    async def _record_screenshot_after_action(
+        self,
+        task: Task,
+        step: Step,
+        browser_state: BrowserState,
+        engine: RunEngine,
+        viewport_only: bool = False,
+    ) -> None:
         context = skyvern_context.ensure_context()
         scrolling_number = context.max_screenshot_scrolls
         if scrolling_number is None:
             scrolling_number = DEFAULT_MAX_SCREENSHOT_SCROLLS
 
-        if engine in CUA_ENGINES:
+        if engine in CUA_ENGINES or viewport_only:
             scrolling_number = 0
 
         try:
@@ -1725,6 +1815,7 @@ class ForgeAgent:
                 exc_info=True,
             )
 
+    async def _record_html_after_action(self, task: Task, step: Step, working_page: Page) -> None:
         try:
             skyvern_frame = await SkyvernFrame.create_instance(frame=working_page)
             html = await skyvern_frame.get_content()
@@ -1741,16 +1832,22 @@ class ForgeAgent:
                 exc_info=True,
             )
 
+    async def _record_video_after_action(self, task: Task, step: Step, browser_state: BrowserState) -> None:
         try:
-            video_artifacts = await app.BROWSER_MANAGER.get_video_artifacts(
-                task_id=task.task_id, browser_state=browser_state
-            )
-            for video_artifact in video_artifacts:
-                await app.ARTIFACT_MANAGER.update_artifact_data(
-                    artifact_id=video_artifact.video_artifact_id,
+            # the new part of the recording is appended as a segment, and the recording at the artifact uri is refreshed
+            # in the background
+            video_segments = await app.BROWSER_MANAGER.get_new_video_segments(
+                browser_state, min_size=settings.VIDEO_SEGMENT_MIN_SIZE_BYTES
+            )
+            for video_segment in video_segments:
+                if await app.ARTIFACT_MANAGER.append_artifact_segment_data(
+                    artifact_id=video_segment.video_artifact_id,
                     organization_id=task.organization_id,
-                    data=video_artifact.video_data,
-                )
+                    segment_index=video_segment.segment_index,
+                    data=video_segment.data,
+                    content=video_segment.recording,
+                ):
+                    video_segment.mark_uploaded()
         except Exception:
             LOG.error(
                 "Failed to record video after action",
@@ -1777,18 +1874,17 @@ class ForgeAgent:
                 task=task,
                 browser_session_id=browser_session_id,
             )
-        # Initialize video artifact for the task here, afterwards it'll only get updated
+        # Initialize video artifact for the task here, afterwards its segments are appended while the recording grows
         if browser_state and browser_state.browser_artifacts:
-            video_artifacts = await app.BROWSER_MANAGER.get_video_artifacts(
-                task_id=task.task_id, browser_state=browser_state
-            )
+            video_artifacts = browser_state.browser_artifacts.video_artifacts
             for idx, video_artifact in enumerate(video_artifacts):
                 if video_artifact.video_artifact_id:
                     continue
+                # created empty, the recording is stored as it grows
                 video_artifact_id = await app.ARTIFACT_MANAGER.create_artifact(
                     step=step,
                     artifact_type=ArtifactType.RECORDING,
-                    data=video_artifact.video_data,
+                    data=b"",
                 )
                 video_artifacts[idx].video_artifact_id = video_artifact_id
             app.BROWSER_MANAGER.set_video_artifact_for_task(task, video_artifacts)
@@ -1953,7 +2049,7 @@ class ForgeAgent:
         verification_code_check: bool = False,
         expire_verification_code: bool = False,
     ) -> str:
-        actions_and_results_str = await self._get_action_results(task)
+        actions_and_results_str = await self._get_action_results(task, step)
 
         # Generate the extract action prompt
         navigation_goal = task.navigation_goal
@@ -2049,47 +2145,14 @@ class ForgeAgent:
                 current_context.totp_codes.pop(task.task_id)
         return final_navigation_payload
 
-    async def _get_action_results(self, task: Task, current_step: Step | None = None) -> str:
+    async def _get_action_results(self, task: Task, step: Step, include_step: bool = False) -> str:
         """
-        Get the action results from the last app.SETTINGS.PROMPT_ACTION_HISTORY_WINDOW steps.
-        If current_step is provided, the current executing step will be included in the action history.
-        Default is excluding the current executing step from the action history.
+        Get the action results from the last app.SETTINGS.PROMPT_ACTION_HISTORY_WINDOW steps before step.
+        If include_step is set, the actions of step will be included in the action history too.
         """
-
-        # Get action results from the last app.SETTINGS.PROMPT_ACTION_HISTORY_WINDOW steps
-        steps = await app.DATABASE.get_task_steps(task_id=task.task_id, organization_id=task.organization_id)
-        # the last step is always the newly created one and it should be excluded from the history window
-        window_steps = steps[-1 - settings.PROMPT_ACTION_HISTORY_WINDOW : -1]
-        if current_step:
-            window_steps.append(current_step)
-
-        actions_and_results: list[tuple[Action, list[ActionResult]]] = []
-        for window_step in window_steps:
-            if window_step.output and window_step.output.actions_and_results:
-                actions_and_results.extend(window_step.output.actions_and_results)
-
-        # exclude successful action from history
-        action_history = [
-            {
-                "action": action.model_dump(
-                    exclude_none=True,
-                    include={"action_type", "element_id", "status", "reasoning", "option", "download"},
-                ),
-                "results": [
-                    result.model_dump(
-                        exclude_none=True,
-                        include={
-                            "success",
-                            "exception_type",
-                            "exception_message",
-                        },
-                    )
-                    for result in results
-                ],
-            }
-            for action, results in actions_and_results
-            if len(results) > 0
-        ]
+        action_history = await ActionHistoryStore.get_action_history(
+            task, step, app.DATABASE.get_last_task_steps, include_step=include_step
+        )
         return json.dumps(action_history)
 
     async def get_extracted_information_for_task(self, task: Task) -> dict[str, Any] | list | str | None:
@@ -2179,6 +2242,8 @@ class ForgeAgent:
             )
             raise TaskNotFound(task_id=task.task_id) from e
         task = refreshed_task
+        # reloaded from the DB if the task ever runs again
+        ActionHistoryStore.forget_task(task.task_id)
 
         # log the task status as an event
         analytics.capture("skyvern-oss-agent-task-status", {"status": task.status})
@@ -2537,14 +2602,19 @@ class ForgeAgent:
                 organization_id=step.organization_id,
             )
 
-        await save_step_logs(step.step_id)
+        await save_step_logs(step.step_id, final=status is not None and status.is_terminal())
+        # the actions of the step are written before the step itself
+        await ActionJournal.flush(step.step_id)
 
-        return await app.DATABASE.update_step(
+        updated_step = await app.DATABASE.update_step(
             task_id=step.task_id,
             step_id=step.step_id,
             organization_id=step.organization_id,
             **updates,
         )
+        if output is not None:
+            ActionHistoryStore.record_step(updated_step)
+        return updated_step
 
     async def update_task(
         self,
@@ -2585,7 +2655,7 @@ class ForgeAgent:
                 organization_id=task.organization_id,
             )
 
-        await save_task_logs(task.task_id)
+        await save_task_logs(task.task_id, final=status is not None and status.is_final())
         LOG.info("Updating task in db", task_id=task.task_id, diff=update_comparison)
         return await app.DATABASE.update_task(
             task.task_id,
@@ -2890,6 +2960,81 @@ class ForgeAgent:
                 )
             return None, None, next_step
 
+    async def _stream_and_pre_execute_actions(
+        self,
+        task: Task,
+        step: Step,
+        browser_state: BrowserState,
+        scraped_page: ScrapedPage,
+        engine: RunEngine,
+        llm_api_handler: LLMAPIHandler,
+        extract_action_prompt: str,
+    ) -> tuple[dict[str, Any], list[tuple[Action, list[ActionResult]]]]:
+        """
+        Stream the extract-actions response and execute its leading actions as soon as they are complete.
+
+        Only the actions that don't depend on the rest of the plan are executed early: a WAIT action is only dropped
+        once it's known whether other actions follow, and decisive actions, downloads and uploads need the whole
+        response. Early execution stops at the first of them, at the first failure or when the page needs a reload.
+        The remaining actions are executed once the whole response is parsed.
+        """
+        streamed_actions = StreamedActions()
+
+        async def request_actions() -> dict[str, Any]:
+            return await llm_api_handler(
+                prompt=extract_action_prompt,
+                prompt_name="extract-actions",
+                step=step,
+                screenshots=scraped_page.screenshots,
+                stream_handler=streamed_actions,
+            )
+
+        llm_request: asyncio.Task[dict[str, Any]] = asyncio.create_task(request_actions())
+        llm_request.add_done_callback(lambda _: streamed_actions.close())
+
+        pre_executed_actions: list[tuple[Action, list[ActionResult]]] = []
+        try:
+            async for raw_action in streamed_actions:
+                parsed_actions = parse_actions(task, step.step_id, step.order, scraped_page, [raw_action])
+                if not parsed_actions:
+                    break
+                action = parsed_actions[0]
+                action.action_order = len(pre_executed_actions)
+                if (
+                    action.action_type not in PRE_EXECUTABLE_ACTION_TYPES
+                    or getattr(action, "download", False)
+                    or skyvern_context.ensure_context().refresh_working_page
+                ):
+                    break
+
+                if engine != RunEngine.openai_cua:
+                    self.async_operation_pool.run_operation(task.task_id, AgentPhase.action)
+                current_page = await browser_state.must_get_working_page()
+                results = await ActionHandler.handle_action(scraped_page, task, step, current_page, action)
+                pre_executed_actions.append((action, results))
+                LOG.info(
+                    "Executed a streamed action before the end of the LLM response",
+                    task_id=task.task_id,
+                    step_id=step.step_id,
+                    action_idx=action.action_order,
+                    time_to_first_action=streamed_actions.time_to_first_action,
+                )
+                # wait random time between actions to avoid detection
+                await asyncio.sleep(
+                    random.uniform(settings.ACTION_DELAY_MIN_SECONDS, settings.ACTION_DELAY_MAX_SECONDS)
+                )
+                # whether it's the last action of the step is only known once the response is complete
+                await self.record_artifacts_after_action(
+                    task, step, browser_state, engine, results=results, is_last_action=False
+                )
+                if not results or not results[-1].success or results[-1].skip_remaining_actions:
+                    break
+
+            return await llm_request, pre_executed_actions
+        finally:
+            if not llm_request.done():
+                llm_request.cancel()
+
     async def handle_potential_verification_code(
         self,
         task: Task,
@@ -1,8 +1,10 @@
 import asyncio
 import copy
 import hashlib
+from collections import defaultdict, deque
+from dataclasses import dataclass
 from datetime import timedelta
-from typing import Dict, List
+from typing import Callable, Dict, List
 
 import structlog
 from playwright.async_api import Frame, Page
@@ -22,8 +24,7 @@ from skyvern.forge.sdk.trace import TraceManager
 from skyvern.forge.sdk.workflow.models.block import BlockTypeVar
 from skyvern.webeye.browser_factory import BrowserState
 from skyvern.webeye.scraper.scraper import ELEMENT_NODE_ATTRIBUTES, CleanupElementTreeFunc, json_to_html
-from skyvern.webeye.utils.dom import SkyvernElement
-from skyvern.webeye.utils.page import SkyvernFrame
+from skyvern.webeye.utils.page import ElementQuery, ElementQueryHelper, SkyvernFrame
 
 LOG = structlog.get_logger()
 
@@ -148,21 +149,22 @@ async def _check_svg_eligibility(
     element_id = element.get("id", "")
 
     try:
-        locater = skyvern_frame.get_frame().locator(f'[{SKYVERN_ID_ATTR}="{element_id}"]')
-        if await locater.count() == 0:
-            _mark_element_as_dropped(element, hashed_key=None)
-            return False
-
-        if not await locater.is_visible(timeout=settings.BROWSER_ACTION_TIMEOUT_MS):
+        # the presence, visibility and blocking checks in a single evaluation
+        selector = f'[{SKYVERN_ID_ATTR}="{element_id}"]'
+        visible_result, blocking_result = await skyvern_frame.query_elements(
+            [
+                ElementQuery(target=selector, helper=ElementQueryHelper.BOX_VISIBLE),
+                ElementQuery(target=selector, helper=ElementQueryHelper.BLOCKING_ELEMENT_ID),
+            ]
+        )
+        if not visible_result.found or not visible_result.value:
             _mark_element_as_dropped(element, hashed_key=None)
             return False
 
-        skyvern_element = SkyvernElement(locator=locater, frame=skyvern_frame.get_frame(), static_element=element)
-
-        _, blocked = await skyvern_frame.get_blocking_element_id(
-            await skyvern_element.get_element_handler(timeout=1000)
-        )
-        if not skyvern_element.is_interactable() and blocked:
+        if blocking_result.error:
+            raise Exception(blocking_result.error)
+        _, blocked = blocking_result.value
+        if not element.get("interactable", False) and blocked:
             _mark_element_as_dropped(element, hashed_key=None)
             return False
     except Exception:
@@ -176,34 +178,104 @@ async def _check_svg_eligibility(
     return True
 
 
-async def _convert_svg_to_string(
-    element: Dict,
+@dataclass
+class _ShapeCandidate:
+    element: Dict
+    skyvern_frame: SkyvernFrame
+    # html of the element without the skyvern attributes, and its cache key
+    html: str
+    cache_key: str
+
+
+def _build_shape_candidate(
+    element: Dict, skyvern_frame: SkyvernFrame, get_cache_key: Callable[[str], str]
+) -> _ShapeCandidate:
+    shape_html = json_to_html(_remove_skyvern_attributes(element))
+    shape_hash = hashlib.sha256(shape_html.encode("utf-8")).hexdigest()
+    return _ShapeCandidate(
+        element=element, skyvern_frame=skyvern_frame, html=shape_html, cache_key=get_cache_key(shape_hash)
+    )
+
+
+def _group_by_cache_key(candidates: list[_ShapeCandidate]) -> list[list[_ShapeCandidate]]:
+    groups: dict[str, list[_ShapeCandidate]] = defaultdict(list)
+    for candidate in candidates:
+        groups[candidate.cache_key].append(candidate)
+    return list(groups.values())
+
+
+async def _get_cached_shapes(
+    keys: list[str],
     task: Task | None = None,
     step: Step | None = None,
-) -> None:
-    """Convert an SVG element to a string description. Assumes element has already passed eligibility checks."""
+) -> dict[str, str | None]:
+    """
+    The recognized shapes are looked up in the durable shape store first, and the rest (including the shapes cached
+    as invalid for a while) in app.CACHE.
+    """
+    if not keys:
+        return {}
     task_id = task.task_id if task else None
     step_id = step.step_id if step else None
-    element_id = element.get("id", "")
 
-    svg_element = _remove_skyvern_attributes(element)
-    svg_html = json_to_html(svg_element)
-    hash_object = hashlib.sha256()
-    hash_object.update(svg_html.encode("utf-8"))
-    svg_hash = hash_object.hexdigest()
-    svg_key = _get_svg_cache_key(svg_hash)
+    cached_shapes: dict[str, str | None] = {}
+    if app.SHAPE_STORE:
+        try:
+            stored_shapes = await app.SHAPE_STORE.aget_many(keys)
+            cached_shapes = {key: shape for key, shape in zip(keys, stored_shapes) if shape}
+            LOG.debug(
+                "Shape store lookup",
+                task_id=task_id,
+                step_id=step_id,
+                keys_count=len(keys),
+                hits=len(cached_shapes),
+                hit_ratio=app.SHAPE_STORE.stats.hit_ratio,
+            )
+        except Exception:
+            LOG.warning("Failed to load the shape store", task_id=task_id, step_id=step_id, exc_info=True)
 
-    svg_shape: str | None = None
+    missing_keys = [key for key in keys if key not in cached_shapes]
+    if not missing_keys:
+        return cached_shapes
     try:
-        svg_shape = await app.CACHE.get(svg_key)
+        cached_shapes.update(zip(missing_keys, await app.CACHE.get_many(missing_keys)))
     except Exception:
         LOG.warning(
-            "Failed to loaded SVG cache",
+            "Failed to load the shape cache",
             task_id=task_id,
             step_id=step_id,
             exc_info=True,
-            key=svg_key,
+            keys_count=len(missing_keys),
         )
+    return cached_shapes
+
+
+async def _save_recognized_shape(key: str, shape: str) -> None:
+    await app.CACHE.set(key, shape)
+    if not app.SHAPE_STORE:
+        return
+    try:
+        await app.SHAPE_STORE.aset(key, shape)
+    except Exception:
+        LOG.warning("Failed to save the shape to the shape store", key=key, exc_info=True)
+
+
+async def _convert_svg_to_string(
+    candidate: _ShapeCandidate,
+    svg_shape: str | None,
+    task: Task | None = None,
+    step: Step | None = None,
+) -> str | None:
+    """
+    Convert an SVG element to a string description. Assumes element has already passed eligibility checks.
+    svg_shape is the cached description, if any. Returns the description applied to the element, None if it's dropped.
+    """
+    task_id = task.task_id if task else None
+    step_id = step.step_id if step else None
+    element = candidate.element
+    element_id = element.get("id", "")
+    svg_html = candidate.html
+    svg_key = candidate.cache_key
 
     if svg_shape:
         LOG.debug("SVG loaded from cache", element_id=element_id, key=svg_key, shape=svg_shape)
@@ -211,7 +283,7 @@ async def _convert_svg_to_string(
         if _is_element_already_dropped(svg_key):
             LOG.debug("SVG is already dropped, going to abort conversion", element_id=element_id, key=svg_key)
             _mark_element_as_dropped(element, hashed_key=svg_key)
-            return
+            return None
 
         if len(svg_html) > settings.SVG_MAX_LENGTH:
             # TODO: implement a fallback solution for "too large" case, maybe convert by screenshot
@@ -224,7 +296,7 @@ async def _convert_svg_to_string(
                 key=svg_key,
             )
             _mark_element_as_dropped(element, hashed_key=svg_key)
-            return
+            return None
 
         LOG.debug("call LLM to convert SVG to string shape", element_id=element_id)
         svg_convert_prompt = prompt_engine.load_prompt("svg-convert", svg_element=svg_html)
@@ -240,7 +312,7 @@ async def _convert_svg_to_string(
                 if not svg_shape or not recognized:
                     raise Exception("Empty or unrecognized SVG shape replied by secondary llm")
                 LOG.info("SVG converted by LLM", element_id=element_id, key=svg_key, shape=svg_shape)
-                await app.CACHE.set(svg_key, svg_shape)
+                await _save_recognized_shape(svg_key, svg_shape)
                 break
             except LLMProviderError:
                 LOG.info(
@@ -263,7 +335,7 @@ async def _convert_svg_to_string(
                     key=svg_key,
                 )
                 _mark_element_as_dropped(element, hashed_key=svg_key)
-                return
+                return None
             except Exception:
                 LOG.info(
                     "Failed to convert SVG to string shape by secondary llm. Will retry if haven't met the max try attempt after 3s.",
@@ -287,7 +359,7 @@ async def _convert_svg_to_string(
                 length=len(svg_html),
             )
             _mark_element_as_dropped(element, hashed_key=svg_key)
-            return
+            return None
 
     element["attributes"] = dict()
     if svg_shape != INVALID_SHAPE:
@@ -296,37 +368,28 @@ async def _convert_svg_to_string(
         element["attributes"]["alt"] = svg_shape
     if "children" in element:
         del element["children"]
-    return
+    return svg_shape
 
 
 async def _convert_css_shape_to_string(
-    skyvern_frame: SkyvernFrame,
-    element: Dict,
+    candidate: _ShapeCandidate,
+    css_shape: str | None,
+    screenshot_lock: asyncio.Lock,
     task: Task | None = None,
     step: Step | None = None,
-) -> None:
+) -> str | None:
+    """
+    css_shape is the cached description, if any. The screenshots scroll the page, so they're taken one at a time under
+    screenshot_lock while the LLM calls run concurrently. Returns the description applied to the element, None if the
+    conversion is aborted.
+    """
+    skyvern_frame = candidate.skyvern_frame
+    element = candidate.element
     element_id: str = element.get("id", "")
 
     task_id = task.task_id if task else None
     step_id = step.step_id if step else None
-    shape_element = _remove_skyvern_attributes(element)
-    svg_html = json_to_html(shape_element)
-    hash_object = hashlib.sha256()
-    hash_object.update(svg_html.encode("utf-8"))
-    shape_hash = hash_object.hexdigest()
-    shape_key = _get_shape_cache_key(shape_hash)
-
-    css_shape: str | None = None
-    try:
-        css_shape = await app.CACHE.get(shape_key)
-    except Exception:
-        LOG.warning(
-            "Failed to loaded CSS shape cache",
-            task_id=task_id,
-            step_id=step_id,
-            exc_info=True,
-            key=shape_key,
-        )
+    shape_key = candidate.cache_key
 
     if css_shape:
         LOG.debug("CSS shape loaded from cache", element_id=element_id, key=shape_key, shape=css_shape)
@@ -335,55 +398,65 @@ async def _convert_css_shape_to_string(
             LOG.debug("CSS shape is already dropped, going to abort conversion", element_id=element_id, key=shape_key)
             return None
         try:
-            locater = skyvern_frame.get_frame().locator(f'[{SKYVERN_ID_ATTR}="{element_id}"]')
-            if await locater.count() == 0:
-                LOG.info(
-                    "No locater found to convert css shape",
-                    task_id=task_id,
-                    step_id=step_id,
-                    element_id=element_id,
-                    key=shape_key,
-                )
-                return None
-
-            if not await locater.is_visible(timeout=settings.BROWSER_ACTION_TIMEOUT_MS):
-                LOG.info(
-                    "element is not visible on the page, going to abort conversion",
-                    task_id=task_id,
-                    step_id=step_id,
-                    element_id=element_id,
-                    key=shape_key,
+            selector = f'[{SKYVERN_ID_ATTR}="{element_id}"]'
+            locater = skyvern_frame.get_frame().locator(selector)
+
+            async with screenshot_lock:
+                # the presence, visibility and blocking checks in a single evaluation
+                visible_result, blocking_result = await skyvern_frame.query_elements(
+                    [
+                        ElementQuery(target=selector, helper=ElementQueryHelper.BOX_VISIBLE),
+                        ElementQuery(target=selector, helper=ElementQueryHelper.BLOCKING_ELEMENT_ID),
+                    ]
                 )
+                if not visible_result.found:
+                    LOG.info(
+                        "No locater found to convert css shape",
+                        task_id=task_id,
+                        step_id=step_id,
+                        element_id=element_id,
+                        key=shape_key,
+                    )
+                    return None
 
-            skyvern_element = SkyvernElement(locator=locater, frame=skyvern_frame.get_frame(), static_element=element)
+                if not visible_result.value:
+                    LOG.info(
+                        "element is not visible on the page, going to abort conversion",
+                        task_id=task_id,
+                        step_id=step_id,
+                        element_id=element_id,
+                        key=shape_key,
+                    )
 
-            _, blocked = await skyvern_frame.get_blocking_element_id(await skyvern_element.get_element_handler())
-            if blocked:
-                LOG.debug(
-                    "element is blocked by another element, going to abort conversion",
-                    task_id=task_id,
-                    step_id=step_id,
-                    element_id=element_id,
-                    key=shape_key,
-                )
-                return None
+                if blocking_result.error:
+                    raise Exception(blocking_result.error)
+                _, blocked = blocking_result.value
+                if blocked:
+                    LOG.debug(
+                        "element is blocked by another element, going to abort conversion",
+                        task_id=task_id,
+                        step_id=step_id,
+                        element_id=element_id,
+                        key=shape_key,
+                    )
+                    return None
 
-            try:
-                await locater.scroll_into_view_if_needed(timeout=settings.BROWSER_ACTION_TIMEOUT_MS)
-                await locater.wait_for(state="visible", timeout=settings.BROWSER_ACTION_TIMEOUT_MS)
-            except Exception:
-                LOG.info(
-                    "Failed to make the element visible, going to abort conversion",
-                    exc_info=True,
-                    task_id=task_id,
-                    step_id=step_id,
-                    element_id=element_id,
-                    key=shape_key,
-                )
-                return None
+                try:
+                    await locater.scroll_into_view_if_needed(timeout=settings.BROWSER_ACTION_TIMEOUT_MS)
+                    await locater.wait_for(state="visible", timeout=settings.BROWSER_ACTION_TIMEOUT_MS)
+                except Exception:
+                    LOG.info(
+                        "Failed to make the element visible, going to abort conversion",
+                        exc_info=True,
+                        task_id=task_id,
+                        step_id=step_id,
+                        element_id=element_id,
+                        key=shape_key,
+                    )
+                    return None
 
-            LOG.debug("call LLM to convert css shape to string shape", element_id=element_id)
-            screenshot = await locater.screenshot(timeout=settings.BROWSER_ACTION_TIMEOUT_MS, animations="disabled")
+                LOG.debug("call LLM to convert css shape to string shape", element_id=element_id)
+                screenshot = await locater.screenshot(timeout=settings.BROWSER_ACTION_TIMEOUT_MS, animations="disabled")
             prompt = prompt_engine.load_prompt("css-shape-convert")
 
             # TODO: we don't retry the css shape conversion today
@@ -398,7 +471,7 @@ async def _convert_css_shape_to_string(
                     if not css_shape or not recognized:
                         raise Exception("Empty or unrecognized css shape replied by secondary llm")
                     LOG.info("CSS Shape converted by LLM", element_id=element_id, key=shape_key, shape=css_shape)
-                    await app.CACHE.set(shape_key, css_shape)
+                    await _save_recognized_shape(shape_key, css_shape)
                     break
                 except LLMProviderError:
                     LOG.info(
@@ -464,7 +537,7 @@ async def _convert_css_shape_to_string(
         # refresh the cache expiration
         await app.CACHE.set(shape_key, css_shape)
         element["attributes"]["shape-description"] = css_shape
-    return None
+    return css_shape
 
 
 class AgentFunction:
@@ -551,18 +624,21 @@ class AgentFunction:
             """
             context = skyvern_context.ensure_context()
             # page won't be in the context.frame_index_map, so the index is going to be 0
-            skyvern_frame = await SkyvernFrame.create_instance(frame=frame)
-            current_frame_index = context.frame_index_map.get(frame, 0)
-
-            queue = []
-            element_cnt = 0
-            eligible_svgs = []  # List to store eligible SVGs and their frames
+            skyvern_frames = {context.frame_index_map.get(frame, 0): await SkyvernFrame.create_instance(frame=frame)}
 
-            for element in element_tree:
-                queue.append(element)
+            async def get_skyvern_frame(frame_index: int) -> SkyvernFrame:
+                if frame_index not in skyvern_frames:
+                    new_frame = next((k for k, v in context.frame_index_map.items() if v == frame_index), frame)
+                    skyvern_frames[frame_index] = await SkyvernFrame.create_instance(frame=new_frame)
+                return skyvern_frames[frame_index]
 
-            while queue:
-                queue_ele = queue.pop(0)
+            # phase one: a single pass over the tree collecting the shapes to convert, grouped with their frames
+            elements = deque(element_tree)
+            element_cnt = 0
+            svg_elements: list[tuple[dict, SkyvernFrame]] = []
+            css_shape_elements: list[tuple[dict, SkyvernFrame]] = []
+            while elements:
+                element = elements.popleft()
 
                 element_cnt += 1
                 if element_cnt == MAX_ELEMENT_CNT:
@@ -571,36 +647,72 @@ class AgentFunction:
                     )
                 element_exceeded = element_cnt > MAX_ELEMENT_CNT
 
-                if queue_ele.get("frame_index") != current_frame_index:
-                    new_frame = next(
-                        (k for k, v in context.frame_index_map.items() if v == queue_ele.get("frame_index")), frame
-                    )
-                    skyvern_frame = await SkyvernFrame.create_instance(frame=new_frame)
-                    current_frame_index = queue_ele.get("frame_index", 0)
+                _remove_rect(element)
 
-                _remove_rect(queue_ele)
+                if element.get("tagName") == "svg" and not element.get("isDropped", False):
+                    if element_exceeded:
+                        _mark_element_as_dropped(element, hashed_key=None)
+                    else:
+                        svg_elements.append((element, await get_skyvern_frame(element.get("frame_index", 0))))
 
-                # Check SVG eligibility and store for later conversion
-                if await _check_svg_eligibility(skyvern_frame, queue_ele, task, step, always_drop=element_exceeded):
-                    eligible_svgs.append((queue_ele, skyvern_frame))
-
-                if not element_exceeded and _should_css_shape_convert(element=queue_ele):
-                    await _convert_css_shape_to_string(
-                        skyvern_frame=skyvern_frame,
-                        element=queue_ele,
-                        task=task,
-                        step=step,
-                    )
+                if not element_exceeded and _should_css_shape_convert(element=element):
+                    css_shape_elements.append((element, await get_skyvern_frame(element.get("frame_index", 0))))
 
                 # TODO: we can come back to test removing the unique_id
                 # from element attributes to make sure this won't increase hallucination
-                # _remove_unique_id(queue_ele)
-                if "children" in queue_ele:
-                    queue.extend(queue_ele["children"])
+                # _remove_unique_id(element)
+                if "children" in element:
+                    elements.extend(element["children"])
+
+            # phase two: one cache lookup for every shape, and bounded concurrent conversions of the misses
+            semaphore = asyncio.Semaphore(settings.SHAPE_CONVERSION_CONCURRENCY)
+            screenshot_lock = asyncio.Lock()
 
-            # Convert all eligible SVGs in parallel
-            if eligible_svgs:
-                await asyncio.gather(*[_convert_svg_to_string(element, task, step) for element, frame in eligible_svgs])
+            async def check_svg_eligibility(element: dict, skyvern_frame: SkyvernFrame) -> bool:
+                async with semaphore:
+                    return await _check_svg_eligibility(skyvern_frame, element, task, step)
+
+            svg_eligibilities = await asyncio.gather(
+                *[check_svg_eligibility(element, skyvern_frame) for element, skyvern_frame in svg_elements]
+            )
+            svg_candidates = [
+                _build_shape_candidate(element, skyvern_frame, _get_svg_cache_key)
+                for (element, skyvern_frame), eligible in zip(svg_elements, svg_eligibilities)
+                if eligible
+            ]
+            css_shape_candidates = [
+                _build_shape_candidate(element, skyvern_frame, _get_shape_cache_key)
+                for element, skyvern_frame in css_shape_elements
+            ]
+            cached_shapes = await _get_cached_shapes(
+                [candidate.cache_key for candidate in svg_candidates + css_shape_candidates], task, step
+            )
+
+            # the identical shapes (icons repeated in a list) share a cache key, so a key is converted once and its
+            # shape applied to the other elements. An element that can't be converted (hidden, blocked) leaves the
+            # conversion to the next one, a shape dropped for its key is dropped for them all.
+            async def convert_svgs(candidates: list[_ShapeCandidate]) -> None:
+                svg_shape = cached_shapes.get(candidates[0].cache_key)
+                for candidate in candidates:
+                    if svg_shape:
+                        await _convert_svg_to_string(candidate, svg_shape, task, step)
+                        continue
+                    async with semaphore:
+                        svg_shape = await _convert_svg_to_string(candidate, None, task, step)
+
+            async def convert_css_shapes(candidates: list[_ShapeCandidate]) -> None:
+                css_shape = cached_shapes.get(candidates[0].cache_key)
+                for candidate in candidates:
+                    if css_shape:
+                        await _convert_css_shape_to_string(candidate, css_shape, screenshot_lock, task, step)
+                        continue
+                    async with semaphore:
+                        css_shape = await _convert_css_shape_to_string(candidate, None, screenshot_lock, task, step)
+
+            await asyncio.gather(
+                *[convert_svgs(candidates) for candidates in _group_by_cache_key(svg_candidates)],
+                *[convert_css_shapes(candidates) for candidates in _group_by_cache_key(css_shape_candidates)],
+            )
 
             return element_tree
 
@@ -12,6 +12,7 @@ from skyvern.forge.sdk.artifact.manager import ArtifactManager
 from skyvern.forge.sdk.artifact.storage.factory import StorageFactory
 from skyvern.forge.sdk.artifact.storage.s3 import S3Storage
 from skyvern.forge.sdk.cache.factory import CacheFactory
+from skyvern.forge.sdk.cache.shape_store import ShapeStore
 from skyvern.forge.sdk.db.client import AgentDB
 from skyvern.forge.sdk.experimentation.providers import BaseExperimentationProvider, NoOpExperimentationProvider
 from skyvern.forge.sdk.schemas.organizations import Organization
@@ -33,6 +34,11 @@ if SettingsManager.get_settings().SKYVERN_STORAGE_TYPE == "s3":
     StorageFactory.set_storage(S3Storage())
 STORAGE = StorageFactory.get_storage()
 CACHE = CacheFactory.get_cache()
+SHAPE_STORE = (
+    ShapeStore(SETTINGS_MANAGER.SHAPE_STORE_PATH, seed_path=SETTINGS_MANAGER.SHAPE_STORE_SEED_PATH)
+    if SETTINGS_MANAGER.SHAPE_STORE_PATH
+    else None
+)
 ARTIFACT_MANAGER = ArtifactManager()
 BROWSER_MANAGER = BrowserManager()
 EXPERIMENTATION_PROVIDER: BaseExperimentationProvider = NoOpExperimentationProvider()
@@ -234,16 +234,25 @@ class AsyncAWSClient:
                 LOG.exception("S3 metadata retrieval failed", uri=uri)
             return None
 
-    async def create_presigned_urls(self, uris: list[str]) -> list[str] | None:
+    async def create_presigned_urls(
+        self, uris: list[str], content_encodings: list[str | None] | None = None
+    ) -> list[str] | None:
+        """
+        content_encodings, when given, are the Content-Encoding headers of the responses, one per uri.
+        """
         # https://boto3.amazonaws.com/v1/documentation/api/latest/reference/services/s3/client/generate_presigned_url.html
         presigned_urls = []
         try:
             async with self._s3_client() as client:
-                for uri in uris:
+                for idx, uri in enumerate(uris):
                     parsed_uri = S3Uri(uri)
+                    params = {"Bucket": parsed_uri.bucket, "Key": parsed_uri.key}
+                    content_encoding = content_encodings[idx] if content_encodings else None
+                    if content_encoding:
+                        params["ResponseContentEncoding"] = content_encoding
                     url = await client.generate_presigned_url(
                         "get_object",
-                        Params={"Bucket": parsed_uri.bucket, "Key": parsed_uri.key},
+                        Params=params,
                         ExpiresIn=settings.PRESIGNED_URL_EXPIRATION,
                     )
                     presigned_urls.append(url)
@@ -266,6 +275,26 @@ class AsyncAWSClient:
                         object_keys.append(obj["Key"])
             return object_keys
 
+    async def delete_files(self, uris: list[str]) -> bool:
+        # https://boto3.amazonaws.com/v1/documentation/api/latest/reference/services/s3/client/delete_objects.html
+        keys_by_bucket: dict[str, list[str]] = {}
+        for uri in uris:
+            parsed_uri = S3Uri(uri)
+            keys_by_bucket.setdefault(parsed_uri.bucket, []).append(parsed_uri.key)
+        try:
+            async with self._s3_client() as client:
+                for bucket, keys in keys_by_bucket.items():
+                    # delete_objects accepts at most 1000 keys per request
+                    for i in range(0, len(keys), 1000):
+                        await client.delete_objects(
+                            Bucket=bucket,
+                            Delete={"Objects": [{"Key": key} for key in keys[i : i + 1000]], "Quiet": True},
+                        )
+            return True
+        except Exception:
+            LOG.exception("S3 delete failed.", uris=uris)
+            return False
+
     async def run_task(
         self,
         cluster: str,
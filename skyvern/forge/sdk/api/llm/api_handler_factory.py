@@ -1,8 +1,11 @@
+import asyncio
 import dataclasses
 import json
 import time
 from asyncio import CancelledError
-from typing import Any, AsyncIterator
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, AsyncIterator, Awaitable, Callable
 
 import litellm
 import structlog
@@ -19,11 +22,18 @@ from skyvern.forge import app
 from skyvern.forge.sdk.api.llm.config_registry import LLMConfigRegistry
 from skyvern.forge.sdk.api.llm.exceptions import (
     DuplicateCustomLLMProviderError,
+    EmptyLLMResponseError,
     InvalidLLMConfigError,
     LLMProviderError,
     LLMProviderErrorRetryableTask,
 )
+from skyvern.forge.sdk.api.llm.hedging import LLMLatencyTracker, hedged_call
 from skyvern.forge.sdk.api.llm.models import LLMAPIHandler, LLMConfig, LLMRouterConfig, dummy_llm_api_handler
+from skyvern.forge.sdk.api.llm.prompt_caching import PromptCache
+from skyvern.forge.sdk.api.llm.response_cache import CachedLLMResponse, LLMResponseCache
+from skyvern.forge.sdk.api.llm.scheduler import LLMScheduler
+from skyvern.forge.sdk.api.llm.screenshot_encoding import get_screenshot_encoding_options
+from skyvern.forge.sdk.api.llm.streaming import LLMStreamHandler
 from skyvern.forge.sdk.api.llm.ui_tars_response import UITarsResponse
 from skyvern.forge.sdk.api.llm.utils import llm_messages_builder, llm_messages_builder_with_history, parse_api_response
 from skyvern.forge.sdk.artifact.models import ArtifactType
@@ -45,8 +55,83 @@ class LLMCallStats(BaseModel):
     llm_cost: float | None = None
 
 
+class LLMRouterStats(BaseModel):
+    requests: int = 0
+    failures: int = 0
+    total_latency_seconds: float = 0
+    max_latency_seconds: float = 0
+    last_failure_at: datetime | None = None
+    last_failure_reason: str | None = None
+
+    @property
+    def average_latency_seconds(self) -> float:
+        return self.total_latency_seconds / self.requests if self.requests else 0
+
+    def record(self, latency_seconds: float, error: Exception | None = None) -> None:
+        self.requests += 1
+        self.total_latency_seconds += latency_seconds
+        self.max_latency_seconds = max(self.max_latency_seconds, latency_seconds)
+        if error is not None:
+            self.failures += 1
+            self.last_failure_at = datetime.utcnow()
+            self.last_failure_reason = type(error).__name__
+
+
+def build_cached_llm_response(parsed_response: dict[str, Any], response: ModelResponse) -> CachedLLMResponse:
+    try:
+        llm_cost = litellm.completion_cost(completion_response=response)
+    except Exception:
+        llm_cost = None
+    usage = response.get("usage", {})
+    return CachedLLMResponse(
+        parsed_response=parsed_response,
+        input_tokens=usage.get("prompt_tokens"),
+        output_tokens=usage.get("completion_tokens"),
+        llm_cost=llm_cost,
+    )
+
+
+async def use_cached_llm_response(
+    cached_response: CachedLLMResponse,
+    step: Step | None = None,
+    task_v2: TaskV2 | None = None,
+    thought: Thought | None = None,
+    ai_suggestion: AISuggestion | None = None,
+) -> dict[str, Any]:
+    """
+    Cache hits skip the LLM call and its token/cost accounting, the parsed response goes through the same
+    post-processing as a fresh one.
+    """
+    parsed_response = cached_response.parsed_response
+    await app.ARTIFACT_MANAGER.create_llm_artifact(
+        data=json.dumps(parsed_response, indent=2).encode("utf-8"),
+        artifact_type=ArtifactType.LLM_RESPONSE_PARSED,
+        step=step,
+        task_v2=task_v2,
+        thought=thought,
+        ai_suggestion=ai_suggestion,
+    )
+    context = skyvern_context.current()
+    if context and len(context.hashed_href_map) > 0:
+        rendered_content = Template(json.dumps(parsed_response)).render(context.hashed_href_map)
+        parsed_response = json.loads(rendered_content)
+        await app.ARTIFACT_MANAGER.create_llm_artifact(
+            data=json.dumps(parsed_response, indent=2).encode("utf-8"),
+            artifact_type=ArtifactType.LLM_RESPONSE_RENDERED,
+            step=step,
+            task_v2=task_v2,
+            thought=thought,
+            ai_suggestion=ai_suggestion,
+        )
+    return parsed_response
+
+
 class LLMAPIHandlerFactory:
     _custom_handlers: dict[str, LLMAPIHandler] = {}
+    # handlers and routers are built once per llm key, so the router cooldown and retry state is shared by all tasks
+    _llm_api_handlers: dict[str, LLMAPIHandler] = {}
+    _routers: dict[str, litellm.Router] = {}
+    router_stats: dict[str, LLMRouterStats] = defaultdict(LLMRouterStats)
 
     @staticmethod
     def get_override_llm_api_handler(override_llm_key: str | None, *, default: LLMAPIHandler) -> LLMAPIHandler:
@@ -63,10 +148,10 @@ class LLMAPIHandlerFactory:
             return default
 
     @staticmethod
-    def get_llm_api_handler_with_router(llm_key: str) -> LLMAPIHandler:
-        llm_config = LLMConfigRegistry.get_config(llm_key)
-        if not isinstance(llm_config, LLMRouterConfig):
-            raise InvalidLLMConfigError(llm_key)
+    def get_router(llm_key: str, llm_config: LLMRouterConfig) -> litellm.Router:
+        router = LLMAPIHandlerFactory._routers.get(llm_key)
+        if router is not None:
+            return router
 
         router = litellm.Router(
             model_list=[dataclasses.asdict(model) for model in llm_config.model_list],
@@ -88,7 +173,81 @@ class LLMAPIHandlerFactory:
             set_verbose=(False if settings.is_cloud_environment() else llm_config.set_verbose),
             enable_pre_call_checks=True,
         )
+        LLMAPIHandlerFactory._routers[llm_key] = router
+        return router
+
+    @staticmethod
+    def get_router_health(llm_key: str) -> dict[str, Any]:
+        """
+        Latency and failure stats of the router of an llm key, as seen by this process.
+        """
+        router = LLMAPIHandlerFactory._routers.get(llm_key)
+        stats = LLMAPIHandlerFactory.router_stats[llm_key]
+        return {
+            "llm_key": llm_key,
+            "initialized": router is not None,
+            "model_names": router.get_model_names() if router else [],
+            "average_latency_seconds": stats.average_latency_seconds,
+            **stats.model_dump(mode="json"),
+        }
+
+    @staticmethod
+    async def _stream_completion(
+        completion: Callable[..., Awaitable[Any]],
+        stream_handler: LLMStreamHandler,
+        add_assistant_prefix: bool = False,
+        **kwargs: Any,
+    ) -> ModelResponse:
+        """
+        Stream the completion to the handler and rebuild the full response from the chunks, so the response is
+        accounted and parsed the same way as a non streamed one.
+        """
+        if add_assistant_prefix:
+            stream_handler.on_text("{")
+        chunks = []
+        # the usage, cached tokens included, is only sent in a final chunk when requested. litellm drops the option
+        # for the providers that always send it
+        async for chunk in await completion(stream=True, stream_options={"include_usage": True}, **kwargs):
+            chunks.append(chunk)
+            if chunk.choices and chunk.choices[0].delta.content:
+                stream_handler.on_text(chunk.choices[0].delta.content)
+        response = litellm.stream_chunk_builder(chunks, messages=kwargs.get("messages"))
+        if response is None:
+            raise EmptyLLMResponseError(str(chunks))
+        return response
+
+    @staticmethod
+    async def _router_acompletion(
+        router: litellm.Router,
+        router_stats: LLMRouterStats,
+        stream_handler: LLMStreamHandler | None = None,
+        add_assistant_prefix: bool = False,
+        **kwargs: Any,
+    ) -> Any:
+        t_llm_request = time.perf_counter()
+        try:
+            if stream_handler:
+                response = await LLMAPIHandlerFactory._stream_completion(
+                    router.acompletion, stream_handler, add_assistant_prefix, **kwargs
+                )
+            else:
+                response = await router.acompletion(**kwargs)
+        except Exception as e:
+            router_stats.record(time.perf_counter() - t_llm_request, error=e)
+            raise
+        router_stats.record(time.perf_counter() - t_llm_request)
+        return response
+
+    @staticmethod
+    def get_llm_api_handler_with_router(llm_key: str) -> LLMAPIHandler:
+        llm_config = LLMConfigRegistry.get_config(llm_key)
+        if not isinstance(llm_config, LLMRouterConfig):
+            raise InvalidLLMConfigError(llm_key)
+
+        router = LLMAPIHandlerFactory.get_router(llm_key, llm_config)
+        router_stats = LLMAPIHandlerFactory.router_stats[llm_key]
         main_model_group = llm_config.main_model_group
+        hedge_model_group = llm_config.hedge_model_group
 
         @TraceManager.traced_async(tags=[llm_key], ignore_inputs=["prompt", "screenshots", "parameters"])
         async def llm_api_handler_with_router_and_fallback(
@@ -100,6 +259,7 @@ class LLMAPIHandlerFactory:
             ai_suggestion: AISuggestion | None = None,
             screenshots: list[bytes] | None = None,
             parameters: dict[str, Any] | None = None,
+            stream_handler: LLMStreamHandler | None = None,
         ) -> dict[str, Any]:
             """
             Custom LLM API handler that utilizes the LiteLLM router and fallbacks to OpenAI GPT-4 Vision.
@@ -109,6 +269,7 @@ class LLMAPIHandlerFactory:
                 step: The step object associated with the prompt.
                 screenshots: The screenshots associated with the prompt.
                 parameters: Additional parameters to be passed to the LLM router.
+                stream_handler: Streams the completion and receives its text as it arrives.
 
             Returns:
                 The response from the LLM router.
@@ -130,14 +291,20 @@ class LLMAPIHandlerFactory:
                 )
 
             await app.ARTIFACT_MANAGER.create_llm_artifact(
-                data=prompt.encode("utf-8"),
+                data=PromptCache.strip_breakpoint(prompt).encode("utf-8"),
                 artifact_type=ArtifactType.LLM_PROMPT,
                 screenshots=screenshots,
                 step=step,
                 task_v2=task_v2,
                 thought=thought,
             )
-            messages = await llm_messages_builder(prompt, screenshots, llm_config.add_assistant_prefix)
+            messages = await llm_messages_builder(
+                prompt,
+                screenshots,
+                llm_config.add_assistant_prefix,
+                screenshot_encoding=get_screenshot_encoding_options(llm_config.model_name),
+                prompt_cache_control=PromptCache.uses_cache_control(llm_config.model_name),
+            )
 
             await app.ARTIFACT_MANAGER.create_llm_artifact(
                 data=json.dumps(
@@ -153,10 +320,55 @@ class LLMAPIHandlerFactory:
                 thought=thought,
                 ai_suggestion=ai_suggestion,
             )
-            try:
-                response = await router.acompletion(
-                    model=main_model_group, messages=messages, timeout=settings.LLM_CONFIG_TIMEOUT, **parameters
+            cache_key = None
+            if LLMResponseCache.is_cacheable(prompt_name):
+                cache_key = LLMResponseCache.build_key(
+                    model=llm_key,
+                    prompt_name=prompt_name,
+                    prompt=prompt,
+                    screenshots=screenshots,
+                    parameters=parameters,
                 )
+                cached_response = await LLMResponseCache.get(cache_key, prompt_name)
+                if cached_response:
+                    return await use_cached_llm_response(cached_response, step, task_v2, thought, ai_suggestion)
+
+            def router_completion(model_group: str) -> Awaitable[Any]:
+                return LLMScheduler.run(
+                    model_group,
+                    prompt_name,
+                    messages,
+                    lambda: LLMAPIHandlerFactory._router_acompletion(
+                        router,
+                        router_stats,
+                        stream_handler=stream_handler,
+                        add_assistant_prefix=llm_config.add_assistant_prefix,
+                        model=model_group,
+                        messages=messages,
+                        timeout=settings.LLM_CONFIG_TIMEOUT,
+                        **parameters,
+                    ),
+                    # the router cools down the rate limited deployments and retries on its own
+                    retry_rate_limited=False,
+                )
+
+            extra_responses: list[Any] = []
+            try:
+                # a streamed response can't be hedged, both requests would stream to the same handler
+                if hedge_model_group and not stream_handler:
+                    hedge_delay_seconds = LLMLatencyTracker.get_quantile(
+                        llm_key, prompt_name, llm_config.hedge_quantile
+                    )
+                    hedged_response = await hedged_call(
+                        lambda: router_completion(main_model_group),
+                        lambda: router_completion(hedge_model_group),
+                        hedge_delay_seconds=hedge_delay_seconds or llm_config.hedge_delay_seconds,
+                        on_primary_latency=lambda latency: LLMLatencyTracker.record(llm_key, prompt_name, latency),
+                    )
+                    response = hedged_response.response
+                    extra_responses = hedged_response.extra_responses
+                else:
+                    response = await router_completion(main_model_group)
             except litellm.exceptions.APIError as e:
                 raise LLMProviderErrorRetryableTask(llm_key) from e
             except litellm.exceptions.ContextWindowExceededError as e:
@@ -215,6 +427,15 @@ class LLMAPIHandlerFactory:
                 cached_token_detail = response.get("usage", {}).get("prompt_tokens_details")
                 if cached_token_detail:
                     cached_tokens = cached_token_detail.cached_tokens or 0
+                for extra_response in extra_responses:
+                    # both requests of a hedged call completed, the loser is billed too
+                    try:
+                        llm_cost += litellm.completion_cost(completion_response=extra_response)
+                    except Exception as e:
+                        LOG.debug("Failed to calculate LLM cost", error=str(e), exc_info=True)
+                    prompt_tokens += extra_response.get("usage", {}).get("prompt_tokens", 0)
+                    completion_tokens += extra_response.get("usage", {}).get("completion_tokens", 0)
+                PromptCache.record(prompt_name, prompt_tokens, cached_tokens)
                 if step:
                     await app.DATABASE.update_step(
                         task_id=step.task_id,
@@ -245,6 +466,8 @@ class LLMAPIHandlerFactory:
                 thought=thought,
                 ai_suggestion=ai_suggestion,
             )
+            if cache_key:
+                await LLMResponseCache.set(cache_key, build_cached_llm_response(parsed_response, response))
 
             if context and len(context.hashed_href_map) > 0:
                 llm_content = json.dumps(parsed_response)
@@ -278,6 +501,21 @@ class LLMAPIHandlerFactory:
 
     @staticmethod
     def get_llm_api_handler(llm_key: str, base_parameters: dict[str, Any] | None = None) -> LLMAPIHandler:
+        handler_key = llm_key
+        if base_parameters:
+            handler_key = f"{llm_key}:{json.dumps(base_parameters, sort_keys=True, default=str)}"
+        handler = LLMAPIHandlerFactory._llm_api_handlers.get(handler_key)
+        if handler is not None:
+            return handler
+
+        handler = LLMAPIHandlerFactory._create_llm_api_handler(llm_key, base_parameters)
+        # the config may be registered later, don't memoize the fallback handler
+        if handler is not dummy_llm_api_handler:
+            LLMAPIHandlerFactory._llm_api_handlers[handler_key] = handler
+        return handler
+
+    @staticmethod
+    def _create_llm_api_handler(llm_key: str, base_parameters: dict[str, Any] | None = None) -> LLMAPIHandler:
         try:
             llm_config = LLMConfigRegistry.get_config(llm_key)
         except InvalidLLMConfigError:
@@ -298,9 +536,11 @@ class LLMAPIHandlerFactory:
             ai_suggestion: AISuggestion | None = None,
             screenshots: list[bytes] | None = None,
             parameters: dict[str, Any] | None = None,
+            stream_handler: LLMStreamHandler | None = None,
         ) -> dict[str, Any]:
             start_time = time.time()
-            active_parameters = base_parameters or {}
+            # copy, the handler is shared by every caller of this llm key
+            active_parameters = dict(base_parameters or {})
             if parameters is None:
                 parameters = LLMAPIHandlerFactory.get_api_parameters(llm_config)
 
@@ -320,7 +560,7 @@ class LLMAPIHandlerFactory:
                 )
 
             await app.ARTIFACT_MANAGER.create_llm_artifact(
-                data=prompt.encode("utf-8"),
+                data=PromptCache.strip_breakpoint(prompt).encode("utf-8"),
                 artifact_type=ArtifactType.LLM_PROMPT,
                 screenshots=screenshots,
                 step=step,
@@ -334,7 +574,13 @@ class LLMAPIHandlerFactory:
 
             model_name = llm_config.model_name
 
-            messages = await llm_messages_builder(prompt, screenshots, llm_config.add_assistant_prefix)
+            messages = await llm_messages_builder(
+                prompt,
+                screenshots,
+                llm_config.add_assistant_prefix,
+                screenshot_encoding=get_screenshot_encoding_options(model_name),
+                prompt_cache_control=PromptCache.uses_cache_control(model_name),
+            )
             await app.ARTIFACT_MANAGER.create_llm_artifact(
                 data=json.dumps(
                     {
@@ -350,16 +596,46 @@ class LLMAPIHandlerFactory:
                 thought=thought,
                 ai_suggestion=ai_suggestion,
             )
+            cache_key = None
+            if LLMResponseCache.is_cacheable(prompt_name):
+                cache_key = LLMResponseCache.build_key(
+                    model=model_name,
+                    prompt_name=prompt_name,
+                    prompt=prompt,
+                    screenshots=screenshots,
+                    parameters=active_parameters,
+                )
+                cached_response = await LLMResponseCache.get(cache_key, prompt_name)
+                if cached_response:
+                    return await use_cached_llm_response(cached_response, step, task_v2, thought, ai_suggestion)
+
             t_llm_request = time.perf_counter()
             try:
                 # TODO (kerem): add a timeout to this call
                 # TODO (kerem): add a retry mechanism to this call (acompletion_with_retries)
                 # TODO (kerem): use litellm fallbacks? https://litellm.vercel.app/docs/tutorials/fallbacks#how-does-completion_with_fallbacks-work
-                response = await litellm.acompletion(
-                    model=model_name,
-                    messages=messages,
-                    timeout=settings.LLM_CONFIG_TIMEOUT,
-                    **active_parameters,
+                response = await LLMScheduler.run(
+                    model_name,
+                    prompt_name,
+                    messages,
+                    lambda: (
+                        LLMAPIHandlerFactory._stream_completion(
+                            litellm.acompletion,
+                            stream_handler,
+                            llm_config.add_assistant_prefix,
+                            model=model_name,
+                            messages=messages,
+                            timeout=settings.LLM_CONFIG_TIMEOUT,
+                            **active_parameters,
+                        )
+                        if stream_handler
+                        else litellm.acompletion(
+                            model=model_name,
+                            messages=messages,
+                            timeout=settings.LLM_CONFIG_TIMEOUT,
+                            **active_parameters,
+                        )
+                    ),
                 )
             except litellm.exceptions.APIError as e:
                 raise LLMProviderErrorRetryableTask(llm_key) from e
@@ -420,6 +696,7 @@ class LLMAPIHandlerFactory:
                 cached_token_detail = response.get("usage", {}).get("prompt_tokens_details")
                 if cached_token_detail:
                     cached_tokens = cached_token_detail.cached_tokens or 0
+                PromptCache.record(prompt_name, prompt_tokens, cached_tokens)
                 if step:
                     await app.DATABASE.update_step(
                         task_id=step.task_id,
@@ -450,6 +727,8 @@ class LLMAPIHandlerFactory:
                 thought=thought,
                 ai_suggestion=ai_suggestion,
             )
+            if cache_key:
+                await LLMResponseCache.set(cache_key, build_cached_llm_response(parsed_response, response))
 
             if context and len(context.hashed_href_map) > 0:
                 llm_content = json.dumps(parsed_response)
@@ -587,11 +866,11 @@ class LLMCaller:
                         tool["display_height_px"] = target_dimension["height"]
                     if "display_width_px" in tool:
                         tool["display_width_px"] = target_dimension["width"]
-            screenshots = resize_screenshots(screenshots, target_dimension)
+            screenshots = await asyncio.to_thread(resize_screenshots, screenshots, target_dimension)
 
         if prompt:
             await app.ARTIFACT_MANAGER.create_llm_artifact(
-                data=prompt.encode("utf-8"),
+                data=PromptCache.strip_breakpoint(prompt).encode("utf-8"),
                 artifact_type=ArtifactType.LLM_PROMPT,
                 screenshots=screenshots,
                 step=step,
@@ -636,13 +915,36 @@ class LLMCaller:
             thought=thought,
             ai_suggestion=ai_suggestion,
         )
+        cache_key = None
+        # tool calls, chat history and raw responses depend on more than the prompt, they are never cached
+        if (
+            prompt_name
+            and LLMResponseCache.is_cacheable(prompt_name)
+            and not (tools or use_message_history or raw_response)
+        ):
+            cache_key = LLMResponseCache.build_key(
+                model=self.llm_config.model_name,
+                prompt_name=prompt_name,
+                prompt=prompt,
+                screenshots=screenshots,
+                parameters=active_parameters,
+            )
+            cached_response = await LLMResponseCache.get(cache_key, prompt_name)
+            if cached_response:
+                return await use_cached_llm_response(cached_response, step, task_v2, thought, ai_suggestion)
+
         t_llm_request = time.perf_counter()
         try:
-            response = await self._dispatch_llm_call(
-                messages=messages,
-                tools=tools,
-                timeout=settings.LLM_CONFIG_TIMEOUT,
-                **active_parameters,
+            response = await LLMScheduler.run(
+                self.llm_config.model_name,
+                prompt_name,
+                messages,
+                lambda: self._dispatch_llm_call(
+                    messages=messages,
+                    tools=tools,
+                    timeout=settings.LLM_CONFIG_TIMEOUT,
+                    **active_parameters,
+                ),
             )
             if use_message_history:
                 # only update message_history when the request is successful
@@ -680,6 +982,7 @@ class LLMCaller:
 
         if step or thought:
             call_stats = await self.get_call_stats(response)
+            PromptCache.record(prompt_name, call_stats.input_tokens or 0, call_stats.cached_tokens or 0)
             if step:
                 await app.DATABASE.update_step(
                     task_id=step.task_id,
@@ -725,6 +1028,17 @@ class LLMCaller:
             thought=thought,
             ai_suggestion=ai_suggestion,
         )
+        if cache_key:
+            call_stats = await self.get_call_stats(response)
+            await LLMResponseCache.set(
+                cache_key,
+                CachedLLMResponse(
+                    parsed_response=parsed_response,
+                    input_tokens=call_stats.input_tokens,
+                    output_tokens=call_stats.output_tokens,
+                    llm_cost=call_stats.llm_cost,
+                ),
+            )
 
         if context and len(context.hashed_href_map) > 0:
             llm_content = json.dumps(parsed_response)
@@ -0,0 +1,58 @@
+"""
+Tests for the memoization and the streamed completions of the LLM API handlers
+"""
+
+from typing import Any
+
+import litellm
+import pytest
+
+from skyvern.forge.sdk.api.llm.api_handler_factory import LLMAPIHandlerFactory, LLMRouterStats
+from skyvern.forge.sdk.api.llm.config_registry import LLMConfigRegistry
+from skyvern.forge.sdk.api.llm.models import LLMConfig
+
+
+def test_handlers_are_built_once_per_llm_key() -> None:
+    LLMConfigRegistry.register_config(
+        "TEST_MEMOIZED_LLM",
+        LLMConfig("gpt-4o-mini", [], supports_vision=True, add_assistant_prefix=False),
+    )
+
+    handler = LLMAPIHandlerFactory.get_llm_api_handler("TEST_MEMOIZED_LLM")
+    assert LLMAPIHandlerFactory.get_llm_api_handler("TEST_MEMOIZED_LLM") is handler
+    assert LLMAPIHandlerFactory.get_llm_api_handler("TEST_MEMOIZED_LLM", base_parameters={"seed": 1}) is not handler
+
+
+def test_router_stats() -> None:
+    stats = LLMRouterStats()
+    stats.record(1.0)
+    stats.record(3.0, error=TimeoutError())
+
+    assert stats.requests == 2
+    assert stats.failures == 1
+    assert stats.average_latency_seconds == 2.0
+    assert stats.max_latency_seconds == 3.0
+    assert stats.last_failure_reason == "TimeoutError"
+
+
+@pytest.mark.asyncio
+async def test_streamed_completion_requests_the_usage() -> None:
+    completion_kwargs: dict[str, Any] = {}
+    streamed_text: list[str] = []
+
+    async def completion(**kwargs: Any) -> Any:
+        completion_kwargs.update(kwargs)
+        return await litellm.acompletion(**kwargs, mock_response='{"actions": []}')
+
+    class StreamHandler:
+        def on_text(self, text: str) -> None:
+            streamed_text.append(text)
+
+    response = await LLMAPIHandlerFactory._stream_completion(
+        completion, StreamHandler(), model="gpt-4o-mini", messages=[{"role": "user", "content": "act"}]
+    )
+
+    # the usage isn't estimated from the streamed text
+    assert completion_kwargs["stream_options"] == {"include_usage": True}
+    assert "".join(streamed_text) == '{"actions": []}'
+    assert response.choices[0].message.content == '{"actions": []}'
@@ -0,0 +1,112 @@
+import asyncio
+import time
+from collections import defaultdict, deque
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable
+
+import structlog
+
+LOG = structlog.get_logger()
+
+# latencies kept per llm key and prompt name to compute the hedging deadline
+LATENCY_SAMPLE_SIZE = 200
+# the deadline falls back to the configured delay until there are enough samples
+MIN_LATENCY_SAMPLES = 20
+
+
+class LLMLatencyTracker:
+    """
+    Recent latencies of the primary requests, per llm key and prompt name.
+    """
+
+    _samples: dict[tuple[str, str], deque[float]] = defaultdict(lambda: deque(maxlen=LATENCY_SAMPLE_SIZE))
+
+    @classmethod
+    def record(cls, llm_key: str, prompt_name: str, latency_seconds: float) -> None:
+        cls._samples[(llm_key, prompt_name)].append(latency_seconds)
+
+    @classmethod
+    def get_quantile(cls, llm_key: str, prompt_name: str, quantile: float) -> float | None:
+        samples = cls._samples.get((llm_key, prompt_name))
+        if not samples or len(samples) < MIN_LATENCY_SAMPLES:
+            return None
+        ordered_samples = sorted(samples)
+        return ordered_samples[min(int(quantile * len(ordered_samples)), len(ordered_samples) - 1)]
+
+
+@dataclass
+class HedgedResponse:
+    response: Any
+    hedged: bool = False
+    # responses of the loser that completed before it could be cancelled. They're billed, so they're accounted too
+    extra_responses: list[Any] = field(default_factory=list)
+
+
+async def hedged_call(
+    primary: Callable[[], Awaitable[Any]],
+    secondary: Callable[[], Awaitable[Any]],
+    hedge_delay_seconds: float,
+    on_primary_latency: Callable[[float], None] | None = None,
+) -> HedgedResponse:
+    """
+    Run primary, and fire secondary too when primary hasn't returned after hedge_delay_seconds, or as soon as it
+    failed. The first successful response wins and the other request is cancelled. An error only propagates when both
+    requests failed. on_primary_latency receives the latency of the successful primary requests.
+    """
+    t_start = time.perf_counter()
+
+    async def run(request: Callable[[], Awaitable[Any]]) -> Any:
+        return await request()
+
+    primary_task: asyncio.Task[Any] = asyncio.create_task(run(primary))
+
+    def record_primary_latency(task: asyncio.Task) -> None:
+        # the fast failures and the cancelled losers would skew the latency distribution
+        if on_primary_latency and not task.cancelled() and task.exception() is None:
+            on_primary_latency(time.perf_counter() - t_start)
+
+    primary_task.add_done_callback(record_primary_latency)
+
+    try:
+        done, _ = await asyncio.wait({primary_task}, timeout=hedge_delay_seconds)
+    except asyncio.CancelledError:
+        primary_task.cancel()
+        raise
+    errors: list[BaseException] = []
+    if done:
+        if (primary_error := primary_task.exception()) is None:
+            return HedgedResponse(response=primary_task.result())
+        LOG.info(
+            "Primary LLM request failed before the hedge delay, falling back to the secondary", exc_info=primary_error
+        )
+        errors.append(primary_error)
+
+    secondary_task: asyncio.Task[Any] = asyncio.create_task(run(secondary))
+    pending = {secondary_task} if done else {primary_task, secondary_task}
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            succeeded = [task for task in done if not task.cancelled() and task.exception() is None]
+            for task in done:
+                if not task.cancelled() and (error := task.exception()) is not None:
+                    errors.append(error)
+            if not succeeded:
+                continue
+
+            winner = primary_task if primary_task in succeeded else secondary_task
+            LOG.info(
+                "Hedged LLM request completed",
+                winner="primary" if winner is primary_task else "secondary",
+                duration_seconds=time.perf_counter() - t_start,
+                hedge_delay_seconds=hedge_delay_seconds,
+            )
+            return HedgedResponse(
+                response=winner.result(),
+                hedged=True,
+                extra_responses=[task.result() for task in succeeded if task is not winner],
+            )
+    finally:
+        for task in pending:
+            task.cancel()
+
+    raise errors[0]
@@ -0,0 +1,98 @@
+"""
+Tests for the hedged LLM requests
+"""
+
+import asyncio
+
+import pytest
+
+from skyvern.forge.sdk.api.llm.hedging import hedged_call
+
+
+@pytest.mark.asyncio
+async def test_fast_primary_is_not_hedged() -> None:
+    async def primary() -> str:
+        return "primary"
+
+    async def secondary() -> str:
+        raise AssertionError("the secondary request shouldn't be sent")
+
+    hedged_response = await hedged_call(primary, secondary, hedge_delay_seconds=1)
+
+    assert hedged_response.response == "primary"
+    assert not hedged_response.hedged
+
+
+@pytest.mark.asyncio
+async def test_slow_primary_is_hedged_and_cancelled() -> None:
+    primary_cancelled = asyncio.Event()
+    latencies: list[float] = []
+
+    async def primary() -> str:
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            primary_cancelled.set()
+            raise
+        return "primary"
+
+    async def secondary() -> str:
+        return "secondary"
+
+    hedged_response = await hedged_call(
+        primary, secondary, hedge_delay_seconds=0.01, on_primary_latency=latencies.append
+    )
+    # let the cancellation and the done callbacks of the primary request run
+    await asyncio.sleep(0.01)
+
+    assert hedged_response.response == "secondary"
+    assert hedged_response.hedged
+    assert hedged_response.extra_responses == []
+    assert primary_cancelled.is_set()
+    # the cancelled loser isn't a latency sample
+    assert latencies == []
+
+
+@pytest.mark.asyncio
+async def test_error_of_one_request_falls_back_to_the_other() -> None:
+    async def primary() -> str:
+        await asyncio.sleep(0.05)
+        raise ValueError("primary failed")
+
+    async def secondary() -> str:
+        await asyncio.sleep(0.1)
+        return "secondary"
+
+    hedged_response = await hedged_call(primary, secondary, hedge_delay_seconds=0.01)
+
+    assert hedged_response.response == "secondary"
+
+
+@pytest.mark.asyncio
+async def test_fast_primary_failure_falls_back_to_the_secondary() -> None:
+    latencies: list[float] = []
+
+    async def primary() -> str:
+        raise ValueError("primary failed")
+
+    async def secondary() -> str:
+        return "secondary"
+
+    hedged_response = await hedged_call(primary, secondary, hedge_delay_seconds=1, on_primary_latency=latencies.append)
+
+    assert hedged_response.response == "secondary"
+    assert hedged_response.hedged
+    # the failure isn't a latency sample
+    assert latencies == []
+
+
+@pytest.mark.asyncio
+async def test_both_failures_propagate_the_primary_error() -> None:
+    async def primary() -> str:
+        raise ValueError("primary failed")
+
+    async def secondary() -> str:
+        raise ValueError("secondary failed")
+
+    with pytest.raises(ValueError, match="primary failed"):
+        await hedged_call(primary, secondary, hedge_delay_seconds=1)
@@ -3,6 +3,7 @@ from typing import Any, Awaitable, Literal, Optional, Protocol, TypedDict
 
 from litellm import AllowedFailsPolicy
 
+from skyvern.forge.sdk.api.llm.streaming import LLMStreamHandler
 from skyvern.forge.sdk.models import Step
 from skyvern.forge.sdk.schemas.ai_suggestions import AISuggestion
 from skyvern.forge.sdk.schemas.task_v2 import TaskV2, Thought
@@ -63,6 +64,12 @@ class LLMRouterConfig(LLMConfigBase):
     redis_port: int | None = None
     redis_password: str | None = None
     fallback_model_group: str | None = None
+    # Hedging: when the main model group hasn't answered after the hedge_quantile latency of the prompt (or
+    # hedge_delay_seconds until there is enough history), the same request is sent to hedge_model_group too. The
+    # first response wins and the other request is cancelled.
+    hedge_model_group: str | None = None
+    hedge_quantile: float = 0.95
+    hedge_delay_seconds: float = 10
     routing_strategy: Literal[
         "simple-shuffle",
         "least-busy",
@@ -94,6 +101,7 @@ class LLMAPIHandler(Protocol):
         ai_suggestion: AISuggestion | None = None,
         screenshots: list[bytes] | None = None,
         parameters: dict[str, Any] | None = None,
+        stream_handler: LLMStreamHandler | None = None,
     ) -> Awaitable[dict[str, Any]]: ...
 
 
@@ -106,5 +114,6 @@ async def dummy_llm_api_handler(
     ai_suggestion: AISuggestion | None = None,
     screenshots: list[bytes] | None = None,
     parameters: dict[str, Any] | None = None,
+    stream_handler: LLMStreamHandler | None = None,
 ) -> dict[str, Any]:
     raise NotImplementedError("Your LLM provider is not configured. Please configure it in the .env file.")
@@ -0,0 +1,81 @@
+from collections import defaultdict
+from typing import Any
+
+import structlog
+from pydantic import BaseModel
+
+from skyvern.config import settings
+from skyvern.forge.sdk.prompting import PROMPT_CACHE_BREAKPOINT
+
+LOG = structlog.get_logger()
+
+
+class PromptCacheStats(BaseModel):
+    requests: int = 0
+    prompt_tokens: int = 0
+    cached_tokens: int = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        if not self.prompt_tokens:
+            return 0
+        return self.cached_tokens / self.prompt_tokens
+
+
+class PromptCache:
+    """
+    Layout of the prompts for the provider-side prompt caching.
+
+    Prompts rendered with a cache breakpoint are sent as a static prefix block followed by the per-call content, so the
+    prefix stays byte-identical across the steps of a run. OpenAI caches the longest stable prefix on its own, the
+    providers listed in LLM_PROMPT_CACHE_CONTROL_PROVIDERS also get an explicit `cache_control` marker on the prefix.
+    """
+
+    # prompt name -> stats of this process
+    stats: dict[str, PromptCacheStats] = defaultdict(PromptCacheStats)
+
+    @staticmethod
+    def split_prompt(prompt: str) -> tuple[str | None, str]:
+        if PROMPT_CACHE_BREAKPOINT not in prompt:
+            return None, prompt
+        prefix, suffix = prompt.split(PROMPT_CACHE_BREAKPOINT, 1)
+        return prefix, suffix.replace(PROMPT_CACHE_BREAKPOINT, "")
+
+    @staticmethod
+    def strip_breakpoint(prompt: str) -> str:
+        return prompt.replace(PROMPT_CACHE_BREAKPOINT, "")
+
+    @staticmethod
+    def uses_cache_control(model_name: str) -> bool:
+        provider = model_name.split("/", 1)[0] if "/" in model_name else "openai"
+        return provider in settings.LLM_PROMPT_CACHE_CONTROL_PROVIDERS
+
+    @classmethod
+    def build_text_messages(cls, prompt: str, cache_control: bool = False) -> list[dict[str, Any]]:
+        prefix, suffix = cls.split_prompt(prompt)
+        if not prefix:
+            return [{"type": "text", "text": suffix}]
+
+        prefix_message: dict[str, Any] = {"type": "text", "text": prefix}
+        if cache_control:
+            prefix_message["cache_control"] = {"type": "ephemeral"}
+        messages = [prefix_message]
+        if suffix:
+            messages.append({"type": "text", "text": suffix})
+        return messages
+
+    @classmethod
+    def record(cls, prompt_name: str | None, prompt_tokens: int, cached_tokens: int) -> None:
+        if not prompt_name or not prompt_tokens:
+            return
+        stats = cls.stats[prompt_name]
+        stats.requests += 1
+        stats.prompt_tokens += prompt_tokens
+        stats.cached_tokens += cached_tokens
+        LOG.debug(
+            "LLM prompt cache usage",
+            prompt_name=prompt_name,
+            prompt_tokens=prompt_tokens,
+            cached_tokens=cached_tokens,
+            hit_ratio=stats.hit_ratio,
+        )
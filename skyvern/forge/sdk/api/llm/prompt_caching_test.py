@@ -0,0 +1,42 @@
+"""
+Tests for the prompt layout used by the provider-side prompt caching
+"""
+
+import pytest
+
+from skyvern.forge.sdk.api.llm.prompt_caching import PromptCache
+from skyvern.forge.sdk.api.llm.utils import llm_messages_builder
+from skyvern.forge.sdk.prompting import PROMPT_CACHE_BREAKPOINT, PromptEngine
+
+
+def test_templates_render_the_breakpoint_between_static_and_dynamic_content() -> None:
+    prompt = PromptEngine("skyvern").load_prompt(
+        "task_v2_check_completion", user_goal="find the price", task_history=[], local_datetime="now"
+    )
+    prefix, suffix = PromptCache.split_prompt(prompt)
+
+    assert prefix is not None
+    assert "find the price" not in prefix
+    assert "find the price" in suffix
+    assert prefix + suffix == PromptCache.strip_breakpoint(prompt)
+
+
+@pytest.mark.asyncio
+async def test_messages_mark_the_static_prefix() -> None:
+    prompt = f"static instructions{PROMPT_CACHE_BREAKPOINT}dynamic content"
+
+    messages = await llm_messages_builder(prompt, prompt_cache_control=True)
+    content = messages[0]["content"]
+    assert content[0] == {"type": "text", "text": "static instructions", "cache_control": {"type": "ephemeral"}}
+    assert content[1] == {"type": "text", "text": "dynamic content"}
+
+    messages = await llm_messages_builder("no breakpoint", prompt_cache_control=True)
+    assert messages[0]["content"] == [{"type": "text", "text": "no breakpoint"}]
+
+
+def test_hit_ratio_per_prompt_name() -> None:
+    PromptCache.record("prompt-caching-test", prompt_tokens=1000, cached_tokens=0)
+    PromptCache.record("prompt-caching-test", prompt_tokens=1000, cached_tokens=800)
+
+    assert PromptCache.stats["prompt-caching-test"].requests == 2
+    assert PromptCache.stats["prompt-caching-test"].hit_ratio == 0.4
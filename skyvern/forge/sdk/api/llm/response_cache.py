@@ -0,0 +1,110 @@
+import hashlib
+import json
+from collections import defaultdict
+from typing import Any
+
+import structlog
+from pydantic import BaseModel
+
+from skyvern.config import settings
+from skyvern.forge.sdk.cache.factory import CacheFactory
+
+LOG = structlog.get_logger()
+
+LLM_RESPONSE_CACHE_KEY_PREFIX = "llm_response"
+
+
+class CachedLLMResponse(BaseModel):
+    parsed_response: dict[str, Any]
+    # usage of the original call. Hits don't cost anything, these are only reported as savings
+    input_tokens: int | None = None
+    output_tokens: int | None = None
+    llm_cost: float | None = None
+
+
+class LLMResponseCacheStats(BaseModel):
+    hits: int = 0
+    misses: int = 0
+    saved_input_tokens: int = 0
+    saved_output_tokens: int = 0
+    saved_cost: float = 0
+
+
+class LLMResponseCache:
+    """
+    Opt-in cache of parsed LLM responses for the prompts whose output only depends on their inputs.
+
+    The key is a hash of the model, the rendered prompt, the screenshot digests and the request parameters. Only the
+    prompt names listed in LLM_RESPONSE_CACHE_PROMPT_NAMES are cached, prompts driving the agent are never cache-safe.
+    """
+
+    # prompt name -> stats of this process
+    stats: dict[str, LLMResponseCacheStats] = defaultdict(LLMResponseCacheStats)
+
+    @staticmethod
+    def is_cacheable(prompt_name: str | None) -> bool:
+        return (
+            settings.ENABLE_LLM_RESPONSE_CACHE
+            and prompt_name is not None
+            and prompt_name in settings.LLM_RESPONSE_CACHE_PROMPT_NAMES
+        )
+
+    @staticmethod
+    def build_key(
+        *,
+        model: str,
+        prompt_name: str,
+        prompt: str | None,
+        screenshots: list[bytes] | None,
+        parameters: dict[str, Any] | None,
+    ) -> str:
+        payload = json.dumps(
+            {
+                "model": model,
+                "prompt": prompt,
+                "screenshots": [hashlib.sha256(screenshot).hexdigest() for screenshot in screenshots or []],
+                "parameters": parameters or {},
+            },
+            sort_keys=True,
+            default=str,
+        )
+        digest = hashlib.sha256(payload.encode("utf-8")).hexdigest()
+        return f"{LLM_RESPONSE_CACHE_KEY_PREFIX}:{prompt_name}:{digest}"
+
+    @classmethod
+    async def get(cls, key: str, prompt_name: str) -> CachedLLMResponse | None:
+        try:
+            value = await CacheFactory.get_cache().get(key)
+        except Exception:
+            LOG.warning("Failed to read the LLM response cache", prompt_name=prompt_name, exc_info=True)
+            value = None
+
+        stats = cls.stats[prompt_name]
+        if value is None:
+            stats.misses += 1
+            return None
+
+        cached_response = CachedLLMResponse.model_validate_json(value)
+        stats.hits += 1
+        stats.saved_input_tokens += cached_response.input_tokens or 0
+        stats.saved_output_tokens += cached_response.output_tokens or 0
+        stats.saved_cost += cached_response.llm_cost or 0
+        LOG.info(
+            "LLM response cache hit",
+            prompt_name=prompt_name,
+            saved_input_tokens=cached_response.input_tokens,
+            saved_output_tokens=cached_response.output_tokens,
+            saved_cost=cached_response.llm_cost,
+            hits=stats.hits,
+            misses=stats.misses,
+        )
+        return cached_response
+
+    @staticmethod
+    async def set(key: str, cached_response: CachedLLMResponse) -> None:
+        try:
+            await CacheFactory.get_cache().set(
+                key, cached_response.model_dump_json(), ex=settings.LLM_RESPONSE_CACHE_TTL_SECONDS
+            )
+        except Exception:
+            LOG.warning("Failed to write the LLM response cache", key=key, exc_info=True)
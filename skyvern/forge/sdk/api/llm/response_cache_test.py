@@ -0,0 +1,61 @@
+"""
+Tests for the LLM response cache
+"""
+
+import pytest
+
+from skyvern.config import settings
+from skyvern.forge.sdk.api.llm.response_cache import CachedLLMResponse, LLMResponseCache
+from skyvern.forge.sdk.cache.factory import CacheFactory
+from skyvern.forge.sdk.cache.local import LocalCache
+
+
+class TestLLMResponseCache:
+    def _build_key(self, prompt: str = "prompt", screenshots: list[bytes] | None = None) -> str:
+        return LLMResponseCache.build_key(
+            model="gpt-4o",
+            prompt_name="svg-convert",
+            prompt=prompt,
+            screenshots=screenshots,
+            parameters={"temperature": 0},
+        )
+
+    def test_key_depends_on_prompt_and_screenshots(self) -> None:
+        assert self._build_key() == self._build_key()
+        assert self._build_key() != self._build_key(prompt="other prompt")
+        assert self._build_key(screenshots=[b"a"]) != self._build_key(screenshots=[b"b"])
+
+    def test_only_cache_safe_prompts_are_cacheable(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(settings, "ENABLE_LLM_RESPONSE_CACHE", True)
+        assert LLMResponseCache.is_cacheable("svg-convert")
+        assert not LLMResponseCache.is_cacheable("extract-actions")
+
+        monkeypatch.setattr(settings, "ENABLE_LLM_RESPONSE_CACHE", False)
+        assert not LLMResponseCache.is_cacheable("svg-convert")
+
+    @pytest.mark.asyncio
+    async def test_hits_are_accounted_separately(self) -> None:
+        CacheFactory.set_cache(LocalCache())
+        key = self._build_key(prompt="stats prompt")
+
+        assert await LLMResponseCache.get(key, "svg-convert") is None
+        await LLMResponseCache.set(
+            key, CachedLLMResponse(parsed_response={"shape": "arrow"}, input_tokens=100, output_tokens=10)
+        )
+        cached_response = await LLMResponseCache.get(key, "svg-convert")
+
+        assert cached_response is not None
+        assert cached_response.parsed_response == {"shape": "arrow"}
+        stats = LLMResponseCache.stats["svg-convert"]
+        assert stats.hits >= 1
+        assert stats.saved_input_tokens >= 100
+
+
+@pytest.mark.asyncio
+async def test_local_cache_item_expiration() -> None:
+    cache = LocalCache()
+    await cache.set("key", "value", ex=0)
+    await cache.set("other_key", "value", ex=60)
+
+    assert await cache.get("key") is None
+    assert await cache.get("other_key") == "value"
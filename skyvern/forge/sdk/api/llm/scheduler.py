@@ -0,0 +1,265 @@
+import asyncio
+import heapq
+import itertools
+import time
+from collections import defaultdict, deque
+from dataclasses import dataclass, field
+from enum import IntEnum
+from typing import Any, Awaitable, Callable, TypeVar
+
+import litellm
+import structlog
+from pydantic import BaseModel
+
+from skyvern.config import settings
+
+LOG = structlog.get_logger()
+
+T = TypeVar("T")
+
+RATE_LIMIT_WINDOW_SECONDS = 60
+# rough token cost of a screenshot, only used to reserve the budget before the real usage is known
+ESTIMATED_IMAGE_TOKENS = 1000
+
+
+class LLMRequestPriority(IntEnum):
+    HIGH = 0
+    NORMAL = 1
+    LOW = 2
+
+
+class LLMSchedulerStats(BaseModel):
+    requests: int = 0
+    rate_limited: int = 0
+    total_queue_wait_seconds: float = 0
+    max_queue_wait_seconds: float = 0
+
+    def record(self, queue_wait_seconds: float) -> None:
+        self.requests += 1
+        self.total_queue_wait_seconds += queue_wait_seconds
+        self.max_queue_wait_seconds = max(self.max_queue_wait_seconds, queue_wait_seconds)
+
+
+@dataclass
+class _Reservation:
+    timestamp: float
+    tokens: int
+
+
+@dataclass(order=True)
+class _Waiter:
+    priority: int
+    sequence: int
+    tokens: int = field(compare=False)
+    event: asyncio.Event | None = field(default=None, compare=False)
+
+
+class ModelRateLimiter:
+    """
+    Requests and tokens per minute budget of a model, over a sliding window.
+
+    Waiters are served by priority and then in arrival order. Only the head of the queue waits for the budget, the
+    other waiters are woken up when they reach the head.
+    """
+
+    def __init__(
+        self, model: str, requests_per_minute: int | None = None, tokens_per_minute: int | None = None
+    ) -> None:
+        self.model = model
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self._reservations: deque[_Reservation] = deque()
+        self._waiters: list[_Waiter] = []
+        self._sequence = itertools.count()
+        self._paused_until = 0.0
+
+    @property
+    def queue_size(self) -> int:
+        return len(self._waiters)
+
+    def pause(self, seconds: float) -> None:
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    async def acquire(self, priority: LLMRequestPriority, tokens: int) -> _Reservation:
+        waiter = _Waiter(priority=priority, sequence=next(self._sequence), tokens=tokens)
+        heapq.heappush(self._waiters, waiter)
+        try:
+            while True:
+                delay = self._get_delay(waiter)
+                if delay == 0:
+                    heapq.heappop(self._waiters)
+                    reservation = _Reservation(timestamp=time.monotonic(), tokens=tokens)
+                    self._reservations.append(reservation)
+                    return reservation
+                waiter.event = asyncio.Event()
+                try:
+                    await asyncio.wait_for(waiter.event.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+                heapq.heapify(self._waiters)
+            self._wake_head()
+
+    def record_usage(self, reservation: _Reservation, tokens: int) -> None:
+        reservation.tokens = tokens
+        self._wake_head()
+
+    def _get_delay(self, waiter: _Waiter) -> float | None:
+        """
+        0 when the waiter can go now, the seconds until the budget frees up when it is the head of the queue, None
+        when it has to wait for its turn.
+        """
+        if self._waiters[0] is not waiter:
+            return None
+        now = time.monotonic()
+        if now < self._paused_until:
+            return self._paused_until - now
+
+        while self._reservations and self._reservations[0].timestamp + RATE_LIMIT_WINDOW_SECONDS <= now:
+            self._reservations.popleft()
+        if not self._reservations:
+            return 0
+
+        window_freed_in = self._reservations[0].timestamp + RATE_LIMIT_WINDOW_SECONDS - now
+        if self.requests_per_minute and len(self._reservations) >= self.requests_per_minute:
+            return window_freed_in
+        used_tokens = sum(reservation.tokens for reservation in self._reservations)
+        if self.tokens_per_minute and used_tokens + waiter.tokens > self.tokens_per_minute:
+            return window_freed_in
+        return 0
+
+    def _wake_head(self) -> None:
+        if self._waiters and self._waiters[0].event:
+            self._waiters[0].event.set()
+
+
+def is_rate_limit_error(error: Exception) -> bool:
+    return isinstance(error, litellm.exceptions.RateLimitError) or getattr(error, "status_code", None) == 429
+
+
+def get_retry_after_seconds(error: Exception, attempt: int) -> float:
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        retry_after = float(headers.get("retry-after", ""))
+    except (TypeError, ValueError):
+        retry_after = 0
+    return max(retry_after, settings.LLM_RATE_LIMIT_BACKOFF_SECONDS * 2**attempt)
+
+
+def estimate_request_tokens(messages: list[dict[str, Any]]) -> int:
+    tokens = 0
+    for message in messages:
+        content = message.get("content")
+        if isinstance(content, str):
+            tokens += len(content) // 4
+            continue
+        for block in content or []:
+            if block.get("type") == "text":
+                tokens += len(block.get("text", "")) // 4
+            elif block.get("type") in ("image", "image_url"):
+                tokens += ESTIMATED_IMAGE_TOKENS
+    return tokens
+
+
+def get_response_tokens(response: Any) -> int:
+    usage = getattr(response, "usage", None)
+    if usage is None:
+        return 0
+    total_tokens = getattr(usage, "total_tokens", None)
+    if total_tokens:
+        return total_tokens
+    return (getattr(usage, "input_tokens", 0) or 0) + (getattr(usage, "output_tokens", 0) or 0)
+
+
+class LLMScheduler:
+    """
+    Process wide scheduler of the LLM requests.
+
+    Each model gets the requests and tokens per minute budget configured in LLM_RATE_LIMITS. Requests queue up when
+    the budget is used, the prompts driving the agent going before the background ones, and provider rate limit
+    errors pause the model and put the request back in the queue instead of failing the step, unless the caller
+    handles them itself (the litellm router has its own cooldowns and retries).
+    """
+
+    _limiters: dict[str, ModelRateLimiter] = {}
+    stats: dict[str, LLMSchedulerStats] = defaultdict(LLMSchedulerStats)
+
+    @classmethod
+    def get_limiter(cls, model: str) -> ModelRateLimiter:
+        if model not in cls._limiters:
+            limits = settings.LLM_RATE_LIMITS.get(model, {})
+            cls._limiters[model] = ModelRateLimiter(
+                model,
+                requests_per_minute=limits.get("requests_per_minute"),
+                tokens_per_minute=limits.get("tokens_per_minute"),
+            )
+        return cls._limiters[model]
+
+    @staticmethod
+    def get_priority(prompt_name: str | None) -> LLMRequestPriority:
+        if prompt_name in settings.LLM_HIGH_PRIORITY_PROMPT_NAMES:
+            return LLMRequestPriority.HIGH
+        if prompt_name in settings.LLM_LOW_PRIORITY_PROMPT_NAMES:
+            return LLMRequestPriority.LOW
+        return LLMRequestPriority.NORMAL
+
+    @classmethod
+    async def run(
+        cls,
+        model: str,
+        prompt_name: str | None,
+        messages: list[dict[str, Any]],
+        call: Callable[[], Awaitable[T]],
+        retry_rate_limited: bool = True,
+    ) -> T:
+        if not settings.ENABLE_LLM_SCHEDULER:
+            return await call()
+
+        limiter = cls.get_limiter(model)
+        priority = cls.get_priority(prompt_name)
+        estimated_tokens = estimate_request_tokens(messages)
+        stats = cls.stats[model]
+        attempt = 0
+        while True:
+            t_queued = time.perf_counter()
+            reservation = await limiter.acquire(priority, estimated_tokens)
+            queue_wait_seconds = time.perf_counter() - t_queued
+            stats.record(queue_wait_seconds)
+            LOG.debug(
+                "LLM request queue wait metrics",
+                model=model,
+                prompt_name=prompt_name,
+                priority=priority.name,
+                queue_wait_seconds=queue_wait_seconds,
+                queue_size=limiter.queue_size,
+                attempt=attempt,
+            )
+            try:
+                response = await call()
+            except Exception as e:
+                if (
+                    not retry_rate_limited
+                    or not is_rate_limit_error(e)
+                    or attempt >= settings.LLM_RATE_LIMIT_MAX_RETRIES
+                ):
+                    raise
+                retry_after_seconds = get_retry_after_seconds(e, attempt)
+                stats.rate_limited += 1
+                LOG.warning(
+                    "LLM provider rate limited the request, requeueing it",
+                    model=model,
+                    prompt_name=prompt_name,
+                    retry_after_seconds=retry_after_seconds,
+                    attempt=attempt,
+                )
+                limiter.pause(retry_after_seconds)
+                attempt += 1
+                continue
+
+            response_tokens = get_response_tokens(response)
+            if response_tokens:
+                limiter.record_usage(reservation, response_tokens)
+            return response
@@ -0,0 +1,72 @@
+"""
+Tests for the LLM request scheduler
+"""
+
+import asyncio
+
+import pytest
+
+from skyvern.config import settings
+from skyvern.forge.sdk.api.llm.scheduler import LLMRequestPriority, LLMScheduler, ModelRateLimiter
+
+
+class RateLimitedError(Exception):
+    status_code = 429
+
+
+@pytest.mark.asyncio
+async def test_waiters_are_served_by_priority() -> None:
+    limiter = ModelRateLimiter("test-model", requests_per_minute=1)
+    await limiter.acquire(LLMRequestPriority.NORMAL, tokens=10)
+    # the budget is used, the next requests queue up until the window frees up
+    limiter._reservations[0].timestamp -= 59.95
+
+    served: list[str] = []
+
+    async def acquire(name: str, priority: LLMRequestPriority) -> None:
+        await limiter.acquire(priority, tokens=10)
+        served.append(name)
+        # free the budget for the next waiter
+        limiter._reservations.clear()
+
+    await asyncio.gather(
+        acquire("background", LLMRequestPriority.LOW),
+        acquire("main step", LLMRequestPriority.HIGH),
+    )
+    assert served == ["main step", "background"]
+
+
+@pytest.mark.asyncio
+async def test_rate_limited_requests_are_requeued(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "ENABLE_LLM_SCHEDULER", True)
+    monkeypatch.setattr(settings, "LLM_RATE_LIMIT_BACKOFF_SECONDS", 0.01)
+    calls = 0
+
+    async def call() -> str:
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            raise RateLimitedError()
+        return "response"
+
+    response = await LLMScheduler.run("rate-limited-model", "extract-action", [], call)
+
+    assert response == "response"
+    assert calls == 2
+    assert LLMScheduler.stats["rate-limited-model"].rate_limited == 1
+
+
+@pytest.mark.asyncio
+async def test_rate_limited_requests_are_not_requeued_when_the_caller_retries(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "ENABLE_LLM_SCHEDULER", True)
+    calls = 0
+
+    async def call() -> str:
+        nonlocal calls
+        calls += 1
+        raise RateLimitedError()
+
+    with pytest.raises(RateLimitedError):
+        await LLMScheduler.run("router-model-group", "extract-action", [], call, retry_rate_limited=False)
+
+    assert calls == 1
@@ -0,0 +1,106 @@
+import asyncio
+import base64
+import hashlib
+import io
+import threading
+from dataclasses import dataclass
+from enum import StrEnum
+
+from cachetools import LRUCache
+from PIL import Image
+
+from skyvern.config import settings
+
+
+class ScreenshotFormat(StrEnum):
+    PNG = "png"
+    JPEG = "jpeg"
+    WEBP = "webp"
+
+
+@dataclass(frozen=True)
+class ScreenshotEncodingOptions:
+    format: ScreenshotFormat = ScreenshotFormat.PNG
+    # quality of the lossy formats
+    quality: int = 80
+    # the longest side of the image is capped to this size, the aspect ratio is kept
+    max_dimension: int | None = None
+
+    @property
+    def is_passthrough(self) -> bool:
+        return self.format == ScreenshotFormat.PNG and self.max_dimension is None
+
+
+@dataclass(frozen=True)
+class EncodedScreenshot:
+    media_type: str
+    # base64 encoded image
+    data: str
+
+    @property
+    def data_url(self) -> str:
+        return f"data:{self.media_type};base64,{self.data}"
+
+
+PNG_PASSTHROUGH = ScreenshotEncodingOptions()
+
+# screenshots are sent to several prompts in a row (and retried), keep the encoded payloads of the latest ones
+_encoded_screenshots: LRUCache[tuple[str, ScreenshotEncodingOptions], EncodedScreenshot] = LRUCache(
+    maxsize=settings.LLM_SCREENSHOT_CACHE_SIZE
+)
+# the screenshots are encoded in worker threads, and the cache isn't thread-safe
+_encoded_screenshots_lock = threading.Lock()
+
+
+def get_screenshot_encoding_options(model_name: str) -> ScreenshotEncodingOptions:
+    """
+    Screenshot format of a model. The provider is the litellm prefix of the model name, openai when there is none.
+    """
+    provider = model_name.split("/", 1)[0] if "/" in model_name else "openai"
+    screenshot_format = settings.LLM_SCREENSHOT_FORMATS.get(provider, settings.LLM_SCREENSHOT_FORMAT)
+    return ScreenshotEncodingOptions(
+        format=ScreenshotFormat(screenshot_format),
+        quality=settings.LLM_SCREENSHOT_QUALITY,
+        max_dimension=settings.LLM_SCREENSHOT_MAX_DIMENSION,
+    )
+
+
+def encode_screenshot(screenshot: bytes, options: ScreenshotEncodingOptions = PNG_PASSTHROUGH) -> EncodedScreenshot:
+    cache_key = (hashlib.blake2b(screenshot, digest_size=16).hexdigest(), options)
+    with _encoded_screenshots_lock:
+        encoded_screenshot = _encoded_screenshots.get(cache_key)
+    if encoded_screenshot is not None:
+        return encoded_screenshot
+
+    if options.is_passthrough:
+        encoded_screenshot = EncodedScreenshot(
+            media_type="image/png", data=base64.b64encode(screenshot).decode("utf-8")
+        )
+    else:
+        # decode once, downscale and encode straight to the target format
+        img = Image.open(io.BytesIO(screenshot))
+        if options.max_dimension and max(img.size) > options.max_dimension:
+            img.thumbnail((options.max_dimension, options.max_dimension), Image.Resampling.LANCZOS)
+        if options.format == ScreenshotFormat.JPEG and img.mode != "RGB":
+            img = img.convert("RGB")
+        img_byte_arr = io.BytesIO()
+        if options.format == ScreenshotFormat.PNG:
+            img.save(img_byte_arr, format="PNG")
+        else:
+            img.save(img_byte_arr, format=options.format.upper(), quality=options.quality)
+        encoded_screenshot = EncodedScreenshot(
+            media_type=f"image/{options.format}", data=base64.b64encode(img_byte_arr.getvalue()).decode("utf-8")
+        )
+
+    with _encoded_screenshots_lock:
+        _encoded_screenshots[cache_key] = encoded_screenshot
+    return encoded_screenshot
+
+
+async def encode_screenshots(
+    screenshots: list[bytes], options: ScreenshotEncodingOptions = PNG_PASSTHROUGH
+) -> list[EncodedScreenshot]:
+    # decoding and encoding images is CPU bound, keep it off the event loop
+    return await asyncio.gather(
+        *[asyncio.to_thread(encode_screenshot, screenshot, options) for screenshot in screenshots]
+    )
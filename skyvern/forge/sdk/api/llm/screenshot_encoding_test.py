@@ -0,0 +1,59 @@
+"""
+Tests for the screenshot encoding of the LLM requests
+"""
+
+import base64
+import io
+
+import pytest
+from PIL import Image
+
+from skyvern.config import settings
+from skyvern.forge.sdk.api.llm.screenshot_encoding import (
+    ScreenshotEncodingOptions,
+    ScreenshotFormat,
+    encode_screenshot,
+    get_screenshot_encoding_options,
+)
+from skyvern.forge.sdk.api.llm.utils import llm_messages_builder
+
+
+def _png(width: int = 400, height: int = 200) -> bytes:
+    img_byte_arr = io.BytesIO()
+    Image.new("RGBA", (width, height), (255, 0, 0, 255)).save(img_byte_arr, format="PNG")
+    return img_byte_arr.getvalue()
+
+
+def test_png_passthrough_keeps_the_screenshot() -> None:
+    screenshot = _png()
+    encoded_screenshot = encode_screenshot(screenshot)
+
+    assert encoded_screenshot.media_type == "image/png"
+    assert base64.b64decode(encoded_screenshot.data) == screenshot
+
+
+def test_downscale_and_convert_to_jpeg() -> None:
+    options = ScreenshotEncodingOptions(format=ScreenshotFormat.JPEG, quality=70, max_dimension=100)
+    encoded_screenshot = encode_screenshot(_png(), options)
+
+    assert encoded_screenshot.media_type == "image/jpeg"
+    img = Image.open(io.BytesIO(base64.b64decode(encoded_screenshot.data)))
+    assert img.format == "JPEG"
+    assert img.size == (100, 50)
+    assert encode_screenshot(_png(), options) is encoded_screenshot
+
+
+def test_per_provider_format(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "LLM_SCREENSHOT_FORMAT", "png")
+    monkeypatch.setattr(settings, "LLM_SCREENSHOT_FORMATS", {"anthropic": "webp"})
+
+    assert get_screenshot_encoding_options("anthropic/claude-3-7-sonnet").format == ScreenshotFormat.WEBP
+    assert get_screenshot_encoding_options("gpt-4o").format == ScreenshotFormat.PNG
+
+
+@pytest.mark.asyncio
+async def test_messages_use_the_encoded_media_type() -> None:
+    options = ScreenshotEncodingOptions(format=ScreenshotFormat.WEBP)
+    messages = await llm_messages_builder("prompt", [_png()], message_pattern="anthropic", screenshot_encoding=options)
+
+    assert messages[0]["content"][1]["source"]["media_type"] == "image/webp"
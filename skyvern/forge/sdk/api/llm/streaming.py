@@ -0,0 +1,119 @@
+import asyncio
+import json
+import time
+from typing import Any, AsyncIterator, Protocol
+
+import json_repair
+import structlog
+from jinja2 import Template
+
+from skyvern.forge.sdk.core import skyvern_context
+
+LOG = structlog.get_logger()
+
+
+class LLMStreamHandler(Protocol):
+    def on_text(self, text: str) -> None: ...
+
+
+class StreamingActionsParser:
+    """
+    Incremental parser of a streamed JSON response. It returns the objects of the top level array under array_key
+    as soon as their closing brace is received, the rest of the response is only scanned.
+    """
+
+    def __init__(self, array_key: str = "actions") -> None:
+        self.array_key = array_key
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._key_chars: list[str] = []
+        self._last_key: str | None = None
+        self._in_array = False
+        self._object_chars: list[str] | None = None
+
+    def feed(self, text: str) -> list[dict[str, Any]]:
+        completed_objects: list[dict[str, Any]] = []
+        for char in text:
+            if self._object_chars is not None:
+                self._object_chars.append(char)
+
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                    if self._depth == 1:
+                        self._last_key = "".join(self._key_chars)
+                    continue
+                if self._depth == 1:
+                    self._key_chars.append(char)
+                continue
+
+            if char == '"':
+                self._in_string = True
+                self._key_chars = []
+            elif char in "{[":
+                self._depth += 1
+                if char == "[" and self._depth == 2 and self._last_key == self.array_key:
+                    self._in_array = True
+                elif char == "{" and self._in_array and self._depth == 3:
+                    self._object_chars = ["{"]
+            elif char in "}]":
+                if char == "}" and self._object_chars is not None and self._depth == 3:
+                    completed_object = self._parse_object("".join(self._object_chars))
+                    if completed_object is not None:
+                        completed_objects.append(completed_object)
+                    self._object_chars = None
+                elif char == "]" and self._in_array and self._depth == 2:
+                    self._in_array = False
+                self._depth -= 1
+            elif char == "," and self._depth == 1:
+                self._last_key = None
+        return completed_objects
+
+    @staticmethod
+    def _parse_object(text: str) -> dict[str, Any] | None:
+        try:
+            parsed_object = json.loads(text)
+        except json.JSONDecodeError:
+            parsed_object = json_repair.loads(text)
+        return parsed_object if isinstance(parsed_object, dict) else None
+
+
+class StreamedActions:
+    """
+    Stream handler of an extract-actions request. The completed actions are queued as soon as they are streamed, and
+    the iteration ends once the request is over and close() has been called.
+    """
+
+    def __init__(self) -> None:
+        self._parser = StreamingActionsParser()
+        self._queue: asyncio.Queue[dict[str, Any] | None] = asyncio.Queue()
+        self._started_at = time.perf_counter()
+        self.action_count = 0
+        self.time_to_first_action: float | None = None
+
+    def on_text(self, text: str) -> None:
+        for action in self._parser.feed(text):
+            if self.time_to_first_action is None:
+                self.time_to_first_action = time.perf_counter() - self._started_at
+            self.action_count += 1
+            self._queue.put_nowait(self._render_hashed_hrefs(action))
+
+    def close(self) -> None:
+        self._queue.put_nowait(None)
+
+    async def __aiter__(self) -> AsyncIterator[dict[str, Any]]:
+        while (action := await self._queue.get()) is not None:
+            yield action
+
+    @staticmethod
+    def _render_hashed_hrefs(action: dict[str, Any]) -> dict[str, Any]:
+        # same rendering as the one applied to the whole parsed response by the llm api handlers
+        context = skyvern_context.current()
+        if not context or not context.hashed_href_map:
+            return action
+        return json.loads(Template(json.dumps(action)).render(context.hashed_href_map))
@@ -0,0 +1,44 @@
+"""
+Tests for the incremental parsing of streamed LLM responses
+"""
+
+import json
+
+import pytest
+
+from skyvern.forge.sdk.api.llm.streaming import StreamedActions, StreamingActionsParser
+
+RESPONSE = {
+    "user_goal_stage": 'the "actions" are not done yet {',
+    "actions": [
+        {"action_type": "INPUT_TEXT", "id": "AAAB", "text": 'a } tricky " value'},
+        {"action_type": "CLICK", "id": "AAAC", "option": {"label": "nested"}},
+    ],
+    "verification_code_reasoning": "none",
+}
+
+
+def test_actions_are_returned_as_soon_as_they_are_complete() -> None:
+    text = json.dumps(RESPONSE, indent=2)
+    first_action_end = text.rindex("}", 0, text.index('"AAAC"')) + 1
+
+    parser = StreamingActionsParser()
+    parsed_actions = []
+    for idx in range(0, first_action_end, 7):
+        parsed_actions.extend(parser.feed(text[idx : min(idx + 7, first_action_end)]))
+    assert parsed_actions == [RESPONSE["actions"][0]]
+
+    parsed_actions.extend(parser.feed(text[first_action_end:]))
+    assert parsed_actions == RESPONSE["actions"]
+
+
+@pytest.mark.asyncio
+async def test_streamed_actions_iteration() -> None:
+    streamed_actions = StreamedActions()
+    # anthropic responses are prefilled with the opening brace
+    streamed_actions.on_text("{")
+    streamed_actions.on_text(json.dumps(RESPONSE)[1:])
+    streamed_actions.close()
+
+    assert [action async for action in streamed_actions] == RESPONSE["actions"]
+    assert streamed_actions.time_to_first_action is not None
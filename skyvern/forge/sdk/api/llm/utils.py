@@ -1,4 +1,3 @@
-import base64
 import copy
 import json
 import re
@@ -11,43 +10,48 @@ import structlog
 from skyvern.constants import MAX_IMAGE_MESSAGES
 from skyvern.forge.sdk.api.llm import commentjson
 from skyvern.forge.sdk.api.llm.exceptions import EmptyLLMResponseError, InvalidLLMResponseFormat
+from skyvern.forge.sdk.api.llm.prompt_caching import PromptCache
+from skyvern.forge.sdk.api.llm.screenshot_encoding import (
+    PNG_PASSTHROUGH,
+    EncodedScreenshot,
+    ScreenshotEncodingOptions,
+    encode_screenshots,
+)
 
 LOG = structlog.get_logger()
 
 
+def build_image_message(encoded_screenshot: EncodedScreenshot, message_pattern: str = "openai") -> dict[str, Any]:
+    if message_pattern == "anthropic":
+        return {
+            "type": "image",
+            "source": {
+                "type": "base64",
+                "media_type": encoded_screenshot.media_type,
+                "data": encoded_screenshot.data,
+            },
+        }
+    return {
+        "type": "image_url",
+        "image_url": {
+            "url": encoded_screenshot.data_url,
+        },
+    }
+
+
 async def llm_messages_builder(
     prompt: str,
     screenshots: list[bytes] | None = None,
     add_assistant_prefix: bool = False,
     message_pattern: str = "openai",
+    screenshot_encoding: ScreenshotEncodingOptions = PNG_PASSTHROUGH,
+    prompt_cache_control: bool = False,
 ) -> list[dict[str, Any]]:
-    messages: list[dict[str, Any]] = [
-        {
-            "type": "text",
-            "text": prompt,
-        }
-    ]
+    messages: list[dict[str, Any]] = PromptCache.build_text_messages(prompt, prompt_cache_control)
 
     if screenshots:
-        for screenshot in screenshots:
-            encoded_image = base64.b64encode(screenshot).decode("utf-8")
-            if message_pattern == "anthropic":
-                message = {
-                    "type": "image",
-                    "source": {
-                        "type": "base64",
-                        "media_type": "image/png",
-                        "data": encoded_image,
-                    },
-                }
-            else:
-                message = {
-                    "type": "image_url",
-                    "image_url": {
-                        "url": f"data:image/png;base64,{encoded_image}",
-                    },
-                }
-            messages.append(message)
+        for encoded_screenshot in await encode_screenshots(screenshots, screenshot_encoding):
+            messages.append(build_image_message(encoded_screenshot, message_pattern))
     # Anthropic models seems to struggle to always output a valid json object so we need to prefill the response to force it:
     if add_assistant_prefix:
         return [
@@ -62,6 +66,8 @@ async def llm_messages_builder_with_history(
     screenshots: list[bytes] | None = None,
     message_history: list[dict[str, Any]] | None = None,
     message_pattern: str = "openai",
+    screenshot_encoding: ScreenshotEncodingOptions = PNG_PASSTHROUGH,
+    prompt_cache_control: bool = False,
 ) -> list[dict[str, Any]]:
     messages: list[dict[str, Any]] = []
     if message_history:
@@ -69,34 +75,11 @@ async def llm_messages_builder_with_history(
 
     current_user_messages: list[dict[str, Any]] = []
     if prompt:
-        current_user_messages.append(
-            {
-                "type": "text",
-                "text": prompt,
-            }
-        )
+        current_user_messages.extend(PromptCache.build_text_messages(prompt, prompt_cache_control))
 
     if screenshots:
-        for screenshot in screenshots:
-            encoded_image = base64.b64encode(screenshot).decode("utf-8")
-            message: dict[str, Any]
-            if message_pattern == "anthropic":
-                message = {
-                    "type": "image",
-                    "source": {
-                        "type": "base64",
-                        "media_type": "image/png",
-                        "data": encoded_image,
-                    },
-                }
-            else:
-                message = {
-                    "type": "image_url",
-                    "image_url": {
-                        "url": f"data:image/png;base64,{encoded_image}",
-                    },
-                }
-            current_user_messages.append(message)
+        for encoded_screenshot in await encode_screenshots(screenshots, screenshot_encoding):
+            current_user_messages.append(build_image_message(encoded_screenshot, message_pattern))
 
     # Only append a user message if there's actually content to add
     if current_user_messages:
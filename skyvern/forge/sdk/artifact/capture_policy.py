@@ -0,0 +1,72 @@
+import random
+from dataclasses import dataclass
+from enum import StrEnum
+
+import structlog
+
+from skyvern.config import settings
+from skyvern.forge import app
+from skyvern.forge.sdk.schemas.tasks import Task
+
+LOG = structlog.get_logger()
+
+# the experimentation provider can override the policy per task or workflow run, e.g. for a given organization
+ARTIFACT_CAPTURE_POLICY_FEATURE = "ARTIFACT_CAPTURE_POLICY"
+
+
+class ArtifactCapturePolicy(StrEnum):
+    # a scrolling screenshot and the html after every action
+    ALWAYS = "always"
+    # a viewport screenshot and the html after every action
+    VIEWPORT = "viewport"
+    # only after the failed actions
+    ON_FAILURE = "on_failure"
+    # after the failed actions and a sample (ARTIFACT_CAPTURE_SAMPLE_RATE) of the others
+    SAMPLED = "sampled"
+    # after the failed actions and the last action of each step
+    LAST_ACTION = "last_action"
+
+
+@dataclass(frozen=True)
+class ActionCapture:
+    capture: bool
+    # the screenshot is limited to the viewport
+    viewport_only: bool = False
+
+
+SKIP_CAPTURE = ActionCapture(capture=False)
+
+
+def get_artifact_capture_policy(task: Task) -> ArtifactCapturePolicy:
+    """
+    The policy of the task: the experimentation provider value for the task (or its workflow run), then the policy of
+    its organization in ARTIFACT_CAPTURE_POLICY_BY_ORGANIZATION, then ARTIFACT_CAPTURE_POLICY.
+    """
+    policy = (
+        app.EXPERIMENTATION_PROVIDER.get_value_cached(
+            ARTIFACT_CAPTURE_POLICY_FEATURE,
+            task.workflow_run_id or task.task_id,
+            properties={"organization_id": task.organization_id},
+        )
+        or settings.ARTIFACT_CAPTURE_POLICY_BY_ORGANIZATION.get(task.organization_id)
+        or settings.ARTIFACT_CAPTURE_POLICY
+    )
+    try:
+        return ArtifactCapturePolicy(policy.lower())
+    except ValueError:
+        LOG.warning("Unknown artifact capture policy, capturing every action", policy=policy, task_id=task.task_id)
+        return ArtifactCapturePolicy.ALWAYS
+
+
+def get_action_capture(policy: ArtifactCapturePolicy, action_failed: bool, is_last_action: bool) -> ActionCapture:
+    if policy == ArtifactCapturePolicy.ALWAYS:
+        return ActionCapture(capture=True)
+    if policy == ArtifactCapturePolicy.VIEWPORT:
+        return ActionCapture(capture=True, viewport_only=True)
+    if action_failed:
+        return ActionCapture(capture=True)
+    if policy == ArtifactCapturePolicy.SAMPLED and random.random() < settings.ARTIFACT_CAPTURE_SAMPLE_RATE:
+        return ActionCapture(capture=True)
+    if policy == ArtifactCapturePolicy.LAST_ACTION and is_last_action:
+        return ActionCapture(capture=True)
+    return SKIP_CAPTURE
@@ -0,0 +1,57 @@
+import gzip
+from enum import StrEnum
+
+import structlog
+
+try:
+    import zstandard
+except ImportError:  # zstandard is an optional dependency, gzip is used as a fallback
+    zstandard = None
+
+LOG = structlog.get_logger()
+
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+GZIP_MAGIC = b"\x1f\x8b"
+
+
+class ArtifactCompression(StrEnum):
+    NONE = "none"
+    GZIP = "gzip"
+    ZSTD = "zstd"
+
+
+def resolve_compression(compression: str | None) -> ArtifactCompression:
+    if not compression:
+        return ArtifactCompression.NONE
+    resolved = ArtifactCompression(compression.lower())
+    if resolved == ArtifactCompression.ZSTD and zstandard is None:
+        LOG.warning("zstandard is not installed, falling back to gzip compression for artifacts")
+        return ArtifactCompression.GZIP
+    return resolved
+
+
+def compress(data: bytes, compression: ArtifactCompression) -> bytes:
+    if compression == ArtifactCompression.ZSTD and zstandard is not None:
+        return zstandard.ZstdCompressor(level=3).compress(data)
+    if compression in (ArtifactCompression.ZSTD, ArtifactCompression.GZIP):
+        return gzip.compress(data, compresslevel=6)
+    return data
+
+
+def is_compressed(data: bytes) -> bool:
+    return data.startswith(ZSTD_MAGIC) or data.startswith(GZIP_MAGIC)
+
+
+def decompress(data: bytes) -> bytes:
+    """
+    Decompress data compressed by `compress`. The codec is detected from the magic bytes, so uncompressed data is
+    returned as is.
+    """
+    if data.startswith(ZSTD_MAGIC):
+        if zstandard is None:
+            raise RuntimeError("zstandard must be installed to read zstd compressed artifacts")
+        # content size isn't always stored in the frame header, so decompress through a decompressobj
+        return zstandard.ZstdDecompressor().decompressobj().decompress(data)
+    if data.startswith(GZIP_MAGIC):
+        return gzip.decompress(data)
+    return data
@@ -0,0 +1,72 @@
+import hashlib
+
+from skyvern.forge.sdk.artifact.compression import ArtifactCompression, decompress
+from skyvern.forge.sdk.artifact.models import ArtifactType
+
+# Artifact types that are often stored with the exact same content across steps, retries and LLM calls.
+# When content addressed storage is enabled, their blobs are keyed by the sha256 of the content and stored once.
+# A blob is shared by every artifact with the same content, so these types must never be updated in place, and
+# deleting an artifact only deletes its row.
+CONTENT_ADDRESSED_ARTIFACT_TYPES = frozenset(
+    {
+        ArtifactType.SCREENSHOT_LLM,
+        ArtifactType.SCREENSHOT_ACTION,
+        ArtifactType.LLM_PROMPT,
+        ArtifactType.LLM_REQUEST,
+        ArtifactType.VISIBLE_ELEMENTS_ID_CSS_MAP,
+        ArtifactType.VISIBLE_ELEMENTS_ID_FRAME_MAP,
+        ArtifactType.VISIBLE_ELEMENTS_TREE,
+        ArtifactType.VISIBLE_ELEMENTS_TREE_TRIMMED,
+        ArtifactType.VISIBLE_ELEMENTS_TREE_IN_PROMPT,
+        ArtifactType.HASHED_HREF_MAP,
+        ArtifactType.HTML_SCRAPE,
+        ArtifactType.HTML_ACTION,
+    }
+)
+
+# Screenshots are already compressed, compressing them again only costs CPU
+COMPRESSIBLE_ARTIFACT_TYPES = CONTENT_ADDRESSED_ARTIFACT_TYPES - {
+    ArtifactType.SCREENSHOT_LLM,
+    ArtifactType.SCREENSHOT_ACTION,
+}
+
+COMPRESSION_URI_SUFFIXES: dict[ArtifactCompression, str] = {
+    ArtifactCompression.GZIP: ".gz",
+    ArtifactCompression.ZSTD: ".zst",
+}
+
+
+def compute_content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def get_compression_uri_suffix(compression: ArtifactCompression) -> str:
+    return COMPRESSION_URI_SUFFIXES.get(compression, "")
+
+
+def is_compressed_uri(uri: str) -> bool:
+    return any(uri.endswith(suffix) for suffix in COMPRESSION_URI_SUFFIXES.values())
+
+
+def is_content_addressed_uri(uri: str) -> bool:
+    return "/cas/" in uri
+
+
+def get_content_encoding(uri: str) -> str | None:
+    """
+    The Content-Encoding to serve a compressed content addressed blob with, so HTTP clients decompress it. The
+    compression names are the HTTP content codings.
+    """
+    for compression, suffix in COMPRESSION_URI_SUFFIXES.items():
+        if uri.endswith(suffix):
+            return str(compression)
+    return None
+
+
+def decode_artifact_data(uri: str, data: bytes | None) -> bytes | None:
+    """
+    The compression of a content addressed artifact is part of its uri, decompress the data transparently.
+    """
+    if data is None or not is_compressed_uri(uri):
+        return data
+    return decompress(data)
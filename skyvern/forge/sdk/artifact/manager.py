@@ -1,10 +1,20 @@
 import asyncio
 import time
 from collections import defaultdict
+from typing import AsyncIterator
 
 import structlog
+from cachetools import LRUCache
 
+from skyvern.config import settings
 from skyvern.forge import app
+from skyvern.forge.sdk.artifact.compression import ArtifactCompression, compress, decompress, resolve_compression
+from skyvern.forge.sdk.artifact.content_addressed import (
+    COMPRESSIBLE_ARTIFACT_TYPES,
+    CONTENT_ADDRESSED_ARTIFACT_TYPES,
+    compute_content_hash,
+    is_content_addressed_uri,
+)
 from skyvern.forge.sdk.artifact.models import Artifact, ArtifactType, LogEntityType
 from skyvern.forge.sdk.core import skyvern_context
 from skyvern.forge.sdk.db.id import generate_artifact_id
@@ -16,9 +26,23 @@ from skyvern.forge.sdk.schemas.workflow_runs import WorkflowRunBlock
 LOG = structlog.get_logger(__name__)
 
 
+def _ensure_not_content_addressed(artifact: Artifact) -> None:
+    # the blob is shared by every artifact with the same content, so it's never updated in place
+    if is_content_addressed_uri(artifact.uri):
+        raise ValueError(f"Content addressed artifact {artifact.artifact_id} can't be updated.")
+
+
 class ArtifactManager:
     # task_id -> list of aio_tasks for uploading artifacts
     upload_aiotasks_map: dict[str, list[asyncio.Task[None]]] = defaultdict(list)
+    # content addressed uri -> in flight store task, so concurrent artifacts with the same content are uploaded once
+    content_addressed_aiotasks: dict[str, asyncio.Task[None]] = {}
+    # content addressed uris known to be stored by this process
+    stored_content_addressed_uris: LRUCache[str, bool] = LRUCache(
+        maxsize=settings.CONTENT_ADDRESSED_ARTIFACT_CACHE_SIZE
+    )
+    # artifact_id -> latest upload of the whole content of a growing artifact, the next one is chained after it
+    content_upload_aiotasks: dict[str, asyncio.Task[None]] = {}
 
     async def _create_artifact(
         self,
@@ -43,6 +67,100 @@ class ArtifactManager:
         if data and path:
             raise ValueError("Both data and path cannot be provided to create an artifact.")
 
+        compression = ArtifactCompression.NONE
+        # empty data isn't uploaded, so the artifact keeps its own uri rather than referencing a blob never written
+        content_addressed = (
+            bool(data)
+            and settings.ENABLE_CONTENT_ADDRESSED_ARTIFACTS
+            and artifact_type in CONTENT_ADDRESSED_ARTIFACT_TYPES
+        )
+        if data and content_addressed:
+            if artifact_type in COMPRESSIBLE_ARTIFACT_TYPES:
+                compression = resolve_compression(settings.CONTENT_ADDRESSED_ARTIFACT_COMPRESSION)
+            # the artifact row references the shared blob, the compression is encoded in the uri suffix
+            uri = app.STORAGE.build_content_addressed_uri(
+                organization_id=organization_id,
+                content_hash=compute_content_hash(data),
+                artifact_type=artifact_type,
+                compression=compression,
+            )
+
+        artifact = await self._create_artifact_row(
+            artifact_id=artifact_id,
+            artifact_type=artifact_type,
+            uri=uri,
+            organization_id=organization_id,
+            step_id=step_id,
+            task_id=task_id,
+            workflow_run_id=workflow_run_id,
+            workflow_run_block_id=workflow_run_block_id,
+            thought_id=thought_id,
+            task_v2_id=task_v2_id,
+            run_id=run_id,
+            ai_suggestion_id=ai_suggestion_id,
+        )
+        if data and content_addressed:
+            aio_task = self._store_content_addressed_artifact(artifact, data, compression)
+            if aio_task:
+                self.upload_aiotasks_map[aio_task_primary_key].append(aio_task)
+        elif data:
+            # Fire and forget
+            aio_task = asyncio.create_task(app.STORAGE.store_artifact(artifact, data))
+            self.upload_aiotasks_map[aio_task_primary_key].append(aio_task)
+        elif path:
+            # Fire and forget
+            aio_task = asyncio.create_task(app.STORAGE.store_artifact_from_path(artifact, path))
+            self.upload_aiotasks_map[aio_task_primary_key].append(aio_task)
+
+        return artifact_id
+
+    def _store_content_addressed_artifact(
+        self, artifact: Artifact, data: bytes, compression: ArtifactCompression
+    ) -> asyncio.Task[None] | None:
+        """
+        Schedule the upload of a content addressed blob unless it's already stored or being stored.
+        Returns the task the caller has to wait for, if any.
+        """
+        if artifact.uri in self.stored_content_addressed_uris:
+            return None
+        in_flight_task = self.content_addressed_aiotasks.get(artifact.uri)
+        if in_flight_task and not in_flight_task.done():
+            return in_flight_task
+
+        aio_task = asyncio.create_task(self._upload_content_addressed_artifact(artifact, data, compression))
+        self.content_addressed_aiotasks[artifact.uri] = aio_task
+        aio_task.add_done_callback(lambda _: self.content_addressed_aiotasks.pop(artifact.uri, None))
+        return aio_task
+
+    async def _upload_content_addressed_artifact(
+        self, artifact: Artifact, data: bytes, compression: ArtifactCompression
+    ) -> None:
+        try:
+            if not await app.STORAGE.artifact_exists(artifact):
+                if compression != ArtifactCompression.NONE:
+                    data = await asyncio.to_thread(compress, data, compression)
+                await app.STORAGE.store_artifact(artifact, data)
+            self.stored_content_addressed_uris[artifact.uri] = True
+        except Exception:
+            LOG.exception(
+                "Failed to store content addressed artifact", artifact_id=artifact.artifact_id, uri=artifact.uri
+            )
+
+    async def _create_artifact_row(
+        self,
+        artifact_id: str,
+        artifact_type: ArtifactType,
+        uri: str,
+        organization_id: str,
+        step_id: str | None = None,
+        task_id: str | None = None,
+        workflow_run_id: str | None = None,
+        workflow_run_block_id: str | None = None,
+        thought_id: str | None = None,
+        task_v2_id: str | None = None,
+        run_id: str | None = None,
+        ai_suggestion_id: str | None = None,
+    ) -> Artifact:
         context = skyvern_context.current()
         if not workflow_run_id and context:
             workflow_run_id = context.workflow_run_id
@@ -53,7 +171,7 @@ class ArtifactManager:
         if not run_id and context:
             run_id = context.run_id
 
-        artifact = await app.DATABASE.create_artifact(
+        return await app.DATABASE.create_artifact(
             artifact_id,
             artifact_type,
             uri,
@@ -67,16 +185,6 @@ class ArtifactManager:
             organization_id=organization_id,
             ai_suggestion_id=ai_suggestion_id,
         )
-        if data:
-            # Fire and forget
-            aio_task = asyncio.create_task(app.STORAGE.store_artifact(artifact, data))
-            self.upload_aiotasks_map[aio_task_primary_key].append(aio_task)
-        elif path:
-            # Fire and forget
-            aio_task = asyncio.create_task(app.STORAGE.store_artifact_from_path(artifact, path))
-            self.upload_aiotasks_map[aio_task_primary_key].append(aio_task)
-
-        return artifact_id
 
     async def create_artifact(
         self,
@@ -136,6 +244,40 @@ class ArtifactManager:
             path=path,
         )
 
+    async def create_segmented_log_artifact(
+        self,
+        *,
+        log_entity_type: LogEntityType,
+        log_entity_id: str,
+        artifact_type: ArtifactType,
+        organization_id: str,
+        step_id: str | None = None,
+        task_id: str | None = None,
+        workflow_run_id: str | None = None,
+        workflow_run_block_id: str | None = None,
+    ) -> Artifact:
+        """
+        Create a log artifact whose content is appended through `append_artifact_segment` instead of being stored
+        (and rewritten) as a single blob.
+        """
+        artifact_id = generate_artifact_id()
+        uri = app.STORAGE.build_log_uri(
+            organization_id=organization_id,
+            log_entity_type=log_entity_type,
+            log_entity_id=log_entity_id,
+            artifact_type=artifact_type,
+        )
+        return await self._create_artifact_row(
+            artifact_id=artifact_id,
+            artifact_type=artifact_type,
+            uri=uri,
+            step_id=step_id,
+            task_id=task_id,
+            workflow_run_id=workflow_run_id,
+            workflow_run_block_id=workflow_run_block_id,
+            organization_id=organization_id,
+        )
+
     async def create_thought_artifact(
         self,
         thought: Thought,
@@ -346,16 +488,119 @@ class ArtifactManager:
         artifact = await app.DATABASE.get_artifact_by_id(artifact_id, organization_id)
         if not artifact:
             return
-        # Fire and forget
-        aio_task = asyncio.create_task(app.STORAGE.store_artifact(artifact, data))
-
         if not artifact[primary_key]:
             raise ValueError(f"{primary_key} is required to update artifact data.")
-        self.upload_aiotasks_map[artifact[primary_key]].append(aio_task)
+        # stored after the pending upload of the artifact content, if any, so an older content doesn't overwrite it
+        await self._store_content(artifact, data, aio_task_primary_key=artifact[primary_key])
+
+    async def append_artifact_segment_data(
+        self,
+        artifact_id: str,
+        organization_id: str | None,
+        segment_index: int,
+        data: bytes,
+        content: bytes | None = None,
+        primary_key: str = "task_id",
+    ) -> bool:
+        """
+        Append a segment to an artifact while its content is growing (e.g. a recording). Returns whether the segment
+        was stored. The whole content up to the end of the segment, when given, is then stored at the artifact uri in
+        the background, so the artifact uri stays current.
+        """
+        if not organization_id:
+            return False
+        artifact = await app.DATABASE.get_artifact_by_id(artifact_id, organization_id)
+        if not artifact:
+            return False
+        if not artifact[primary_key]:
+            raise ValueError(f"{primary_key} is required to append artifact data.")
+        _ensure_not_content_addressed(artifact)
+        if not await app.STORAGE.store_artifact_segment(artifact, segment_index, data):
+            return False
+        if content is not None:
+            await self._store_content(artifact, content, aio_task_primary_key=artifact[primary_key])
+        return True
+
+    async def _store_content(self, artifact: Artifact, data: bytes, aio_task_primary_key: str) -> None:
+        previous = self.content_upload_aiotasks.get(artifact.artifact_id)
+        aio_task = await self.store_artifact_data(
+            artifact, data, aio_task_primary_key=aio_task_primary_key, after=previous
+        )
+        self.content_upload_aiotasks[artifact.artifact_id] = aio_task
+
+        def forget(done: asyncio.Task[None]) -> None:
+            if self.content_upload_aiotasks.get(artifact.artifact_id) is done:
+                del self.content_upload_aiotasks[artifact.artifact_id]
+
+        aio_task.add_done_callback(forget)
 
     async def retrieve_artifact(self, artifact: Artifact) -> bytes | None:
         return await app.STORAGE.retrieve_artifact(artifact)
 
+    async def append_artifact_segment(
+        self,
+        artifact: Artifact,
+        segment_index: int,
+        data: bytes,
+        aio_task_primary_key: str,
+    ) -> None:
+        _ensure_not_content_addressed(artifact)
+
+        async def store() -> None:
+            await app.STORAGE.store_artifact_segment(artifact, segment_index, data)
+
+        # Fire and forget
+        aio_task = asyncio.create_task(store())
+        self.upload_aiotasks_map[aio_task_primary_key].append(aio_task)
+
+    async def store_artifact_data(
+        self,
+        artifact: Artifact,
+        data: bytes,
+        aio_task_primary_key: str,
+        after: asyncio.Task[None] | None = None,
+    ) -> asyncio.Task[None]:
+        """
+        Replace the content of an artifact. The upload starts once the `after` upload is done, so the successive
+        versions of a growing artifact are stored in order.
+        """
+        _ensure_not_content_addressed(artifact)
+
+        async def store() -> None:
+            if after is not None:
+                await asyncio.gather(after, return_exceptions=True)
+            await app.STORAGE.store_artifact(artifact, data)
+
+        # Fire and forget
+        aio_task = asyncio.create_task(store())
+        self.upload_aiotasks_map[aio_task_primary_key].append(aio_task)
+        return aio_task
+
+    async def iter_artifact_content(self, artifact: Artifact) -> AsyncIterator[bytes]:
+        """
+        Yield the content of an artifact. Segmented artifacts are stitched lazily, one segment at a time.
+        """
+        # the whole recording is stored at its uri after each segment, the segments are stitched until it's stored
+        if artifact.artifact_type == ArtifactType.RECORDING and await app.STORAGE.artifact_exists(artifact):
+            data = await app.STORAGE.retrieve_artifact(artifact)
+            if data is not None:
+                yield data
+            return
+
+        segment_uris = await app.STORAGE.list_artifact_segment_uris(artifact)
+        if not segment_uris:
+            data = await app.STORAGE.retrieve_artifact(artifact)
+            if data is not None:
+                yield data
+            return
+
+        for segment_uri in segment_uris:
+            segment = await app.STORAGE.retrieve_artifact_segment(segment_uri)
+            if segment is None:
+                LOG.warning("Missing artifact segment", artifact_id=artifact.artifact_id, segment_uri=segment_uri)
+                continue
+            yield decompress(segment)
+
     async def get_share_link(self, artifact: Artifact) -> str | None:
         return await app.STORAGE.get_share_link(artifact)
 
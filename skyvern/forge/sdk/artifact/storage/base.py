@@ -1,6 +1,7 @@
 from abc import ABC, abstractmethod
 from typing import BinaryIO
 
+from skyvern.forge.sdk.artifact.compression import ArtifactCompression
 from skyvern.forge.sdk.artifact.models import Artifact, ArtifactType, LogEntityType
 from skyvern.forge.sdk.models import Step
 from skyvern.forge.sdk.schemas.ai_suggestions import AISuggestion
@@ -16,7 +17,7 @@ FILE_EXTENTSION_MAP: dict[ArtifactType, str] = {
     ArtifactType.SCREENSHOT_ACTION: "png",
     ArtifactType.SCREENSHOT_FINAL: "png",
     ArtifactType.SKYVERN_LOG: "log",
-    ArtifactType.SKYVERN_LOG_RAW: "json",
+    ArtifactType.SKYVERN_LOG_RAW: "ndjson",
     ArtifactType.LLM_PROMPT: "txt",
     ArtifactType.LLM_REQUEST: "json",
     ArtifactType.LLM_RESPONSE: "json",
@@ -87,6 +88,24 @@ class BaseStorage(ABC):
     ) -> str:
         pass
 
+    @abstractmethod
+    def build_content_addressed_uri(
+        self,
+        *,
+        organization_id: str,
+        content_hash: str,
+        artifact_type: ArtifactType,
+        compression: ArtifactCompression,
+    ) -> str:
+        """
+        Content addressed blobs are shared by every artifact of the organization with the same content.
+        """
+        pass
+
+    @abstractmethod
+    async def artifact_exists(self, artifact: Artifact) -> bool:
+        pass
+
     @abstractmethod
     async def store_artifact(self, artifact: Artifact, data: bytes) -> None:
         pass
@@ -95,6 +114,33 @@ class BaseStorage(ABC):
     async def retrieve_artifact(self, artifact: Artifact) -> bytes | None:
         pass
 
+    async def get_artifact_file_path(self, artifact: Artifact) -> str | None:
+        """
+        Path of the artifact on the local filesystem when it can be served as is, without reading it in memory.
+        """
+        return None
+
+    def build_artifact_segment_uri(self, artifact: Artifact, segment_index: int) -> str:
+        """
+        Segments are append-only chunks of an artifact. Reading the artifact means stitching its segments in order.
+        """
+        return f"{artifact.uri}.segments/{segment_index:06d}"
+
+    @abstractmethod
+    async def store_artifact_segment(self, artifact: Artifact, segment_index: int, data: bytes) -> bool:
+        """
+        Returns whether the segment was stored.
+        """
+        pass
+
+    @abstractmethod
+    async def list_artifact_segment_uris(self, artifact: Artifact) -> list[str]:
+        pass
+
+    @abstractmethod
+    async def retrieve_artifact_segment(self, segment_uri: str) -> bytes | None:
+        pass
+
     @abstractmethod
     async def get_share_link(self, artifact: Artifact) -> str | None:
         pass
@@ -0,0 +1,217 @@
+"""
+Helpers for persisting browser profiles incrementally.
+
+A persisted browser session is described by a manifest mapping every file of the profile (relative path) to the
+sha256 of its content. Storage backends only have to transfer the files whose content is not already part of the
+previously stored manifest. All the filesystem work (walking, hashing, copying and writing) runs in a worker thread
+so that persisting a large Chromium profile doesn't block the event loop.
+"""
+
+import asyncio
+import os
+import shutil
+from pathlib import Path
+from typing import Awaitable, Callable, Iterable
+
+import structlog
+from pydantic import BaseModel
+
+from skyvern.forge.sdk.api.files import calculate_sha256_for_file
+
+LOG = structlog.get_logger()
+
+BROWSER_SESSION_MANIFEST_VERSION = 1
+BROWSER_SESSION_MANIFEST_NAME = "manifest.json"
+
+# Chromium regenerates these directories on demand. They're usually the bulk of a profile and never worth syncing.
+BROWSER_SESSION_SKIPPED_DIRECTORIES = frozenset(
+    {
+        "Cache",
+        "Code Cache",
+        "GPUCache",
+        "GrShaderCache",
+        "GraphiteDawnCache",
+        "ShaderCache",
+        "DawnCache",
+        "DawnGraphiteCache",
+        "DawnWebGPUCache",
+        "CacheStorage",
+        "ScriptCache",
+        "component_crx_cache",
+        "extensions_crx_cache",
+        "Crashpad",
+        "BrowserMetrics",
+    }
+)
+
+# Chromium process lock files. They are only meaningful for the browser instance that created them.
+BROWSER_SESSION_SKIPPED_FILES = frozenset(
+    {"SingletonLock", "SingletonSocket", "SingletonCookie", "RunningChromeVersion"}
+)
+
+
+class BrowserSessionManifest(BaseModel):
+    version: int = BROWSER_SESSION_MANIFEST_VERSION
+    # relative file path -> sha256 of the file content
+    files: dict[str, str] = {}
+    # the blobs of the previous manifest that this one doesn't reference anymore. They're only deleted by the next
+    # store, as a concurrent store started from the previous manifest may still reference them
+    retired_hashes: list[str] = []
+
+    def hashes(self) -> set[str]:
+        return set(self.files.values())
+
+    def paths_by_hash(self) -> dict[str, list[str]]:
+        paths_by_hash: dict[str, list[str]] = {}
+        for relative_path, file_hash in self.files.items():
+            paths_by_hash.setdefault(file_hash, []).append(relative_path)
+        return paths_by_hash
+
+
+def iter_browser_session_files(directory: str) -> Iterable[str]:
+    """
+    Yield the relative paths of the files in a browser profile that are worth persisting.
+    """
+    for root, dirs, files in os.walk(directory):
+        # prune the cache directories in place so os.walk doesn't descend into them
+        dirs[:] = [d for d in dirs if d not in BROWSER_SESSION_SKIPPED_DIRECTORIES]
+        for file in files:
+            if file in BROWSER_SESSION_SKIPPED_FILES:
+                continue
+            file_path = os.path.join(root, file)
+            if os.path.islink(file_path) or not os.path.isfile(file_path):
+                continue
+            yield os.path.relpath(file_path, directory)
+
+
+def build_browser_session_manifest(directory: str) -> BrowserSessionManifest:
+    files: dict[str, str] = {}
+    for relative_path in iter_browser_session_files(directory):
+        try:
+            files[relative_path] = calculate_sha256_for_file(os.path.join(directory, relative_path))
+        except OSError:
+            # the browser may still be rotating some files (journals, temp files) while we walk the profile
+            LOG.warning("Failed to hash browser session file, skipping", relative_path=relative_path, exc_info=True)
+    return BrowserSessionManifest(files=files)
+
+
+async def build_browser_session_manifest_async(directory: str) -> BrowserSessionManifest:
+    return await asyncio.to_thread(build_browser_session_manifest, directory)
+
+
+def get_missing_hashes(
+    manifest: BrowserSessionManifest, previous_manifest: BrowserSessionManifest | None
+) -> dict[str, str]:
+    """
+    Return the content hashes of the manifest that aren't stored yet, mapped to one relative path holding that content.
+    """
+    stored_hashes = previous_manifest.hashes() if previous_manifest else set()
+    missing: dict[str, str] = {}
+    for relative_path, file_hash in manifest.files.items():
+        if file_hash in stored_hashes or file_hash in missing:
+            continue
+        missing[file_hash] = relative_path
+    return missing
+
+
+def get_stale_hashes(manifest: BrowserSessionManifest, previous_manifest: BrowserSessionManifest | None) -> set[str]:
+    if not previous_manifest:
+        return set()
+    return previous_manifest.hashes() - manifest.hashes()
+
+
+def get_deletable_hashes(
+    manifest: BrowserSessionManifest, previous_manifest: BrowserSessionManifest | None
+) -> set[str]:
+    """
+    Return the blobs that can be deleted while the manifest is stored: the ones already retired by the previous
+    manifest that neither manifest references.
+    """
+    if not previous_manifest:
+        return set()
+    return set(previous_manifest.retired_hashes) - previous_manifest.hashes() - manifest.hashes()
+
+
+def get_retired_hashes(
+    manifest: BrowserSessionManifest, previous_manifest: BrowserSessionManifest | None, deleted_hashes: set[str]
+) -> set[str]:
+    """
+    Return the blobs still stored that the manifest no longer references: the stale ones of the previous manifest, and
+    the ones it retired that weren't deleted, so they are deleted by a later store rather than never.
+    """
+    if not previous_manifest:
+        return set()
+    retired_hashes = get_stale_hashes(manifest, previous_manifest) | set(previous_manifest.retired_hashes)
+    return retired_hashes - manifest.hashes() - deleted_hashes
+
+
+def write_browser_session_file(directory: str, relative_paths: list[str], data: bytes) -> None:
+    for relative_path in relative_paths:
+        target_path = Path(directory) / relative_path
+        target_path.parent.mkdir(parents=True, exist_ok=True)
+        target_path.write_bytes(data)
+
+
+def sync_browser_session_directory(source_directory: str, target_directory: str) -> int:
+    """
+    Mirror a browser profile into another directory, copying only the files whose size or mtime changed and removing
+    the files that don't exist in the source anymore. Returns the number of copied files.
+    """
+    copied = 0
+    source_files = set(iter_browser_session_files(source_directory))
+    for relative_path in source_files:
+        source_path = Path(source_directory) / relative_path
+        target_path = Path(target_directory) / relative_path
+        try:
+            source_stat = source_path.stat()
+            if target_path.exists():
+                target_stat = target_path.stat()
+                # copy2 preserves the mtime, so an unchanged file has the same size and mtime as the stored copy
+                if target_stat.st_size == source_stat.st_size and target_stat.st_mtime == source_stat.st_mtime:
+                    continue
+            target_path.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copy2(source_path, target_path)
+            copied += 1
+        except OSError:
+            LOG.warning("Failed to copy browser session file, skipping", relative_path=relative_path, exc_info=True)
+
+    for relative_path in set(iter_browser_session_files(target_directory)) - source_files:
+        (Path(target_directory) / relative_path).unlink(missing_ok=True)
+
+    return copied
+
+
+async def gather_with_concurrency(concurrency: int, coroutines: Iterable[Awaitable[None]]) -> None:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def _run(coroutine: Awaitable[None]) -> None:
+        async with semaphore:
+            await coroutine
+
+    await asyncio.gather(*[_run(coroutine) for coroutine in coroutines])
+
+
+async def restore_browser_session_files(
+    manifest: BrowserSessionManifest,
+    directory: str,
+    download_blob: Callable[[str], Awaitable[bytes | None]],
+    concurrency: int,
+) -> list[str]:
+    """
+    Download every distinct blob of the manifest in parallel and write it to all the paths sharing that content.
+    Returns the hashes that couldn't be downloaded.
+    """
+    failed_hashes: list[str] = []
+
+    async def _restore(file_hash: str, relative_paths: list[str]) -> None:
+        data = await download_blob(file_hash)
+        if data is None:
+            failed_hashes.append(file_hash)
+            return
+        await asyncio.to_thread(write_browser_session_file, directory, relative_paths, data)
+
+    await gather_with_concurrency(
+        concurrency,
+        [_restore(file_hash, relative_paths) for file_hash, relative_paths in manifest.paths_by_hash().items()],
+    )
+    return failed_hashes
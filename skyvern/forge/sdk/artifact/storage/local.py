@@ -1,8 +1,11 @@
+import asyncio
+import hashlib
 import os
-import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
-from typing import BinaryIO
+from typing import BinaryIO, Callable, TypeVar
 
 import structlog
 
@@ -13,8 +16,15 @@ from skyvern.forge.sdk.api.files import (
     get_skyvern_temp_dir,
     parse_uri_to_path,
 )
+from skyvern.forge.sdk.artifact.compression import ArtifactCompression
+from skyvern.forge.sdk.artifact.content_addressed import (
+    decode_artifact_data,
+    get_compression_uri_suffix,
+    is_compressed_uri,
+)
 from skyvern.forge.sdk.artifact.models import Artifact, ArtifactType, LogEntityType
 from skyvern.forge.sdk.artifact.storage.base import FILE_EXTENTSION_MAP, BaseStorage
+from skyvern.forge.sdk.artifact.storage.browser_session_sync import sync_browser_session_directory
 from skyvern.forge.sdk.models import Step
 from skyvern.forge.sdk.schemas.ai_suggestions import AISuggestion
 from skyvern.forge.sdk.schemas.files import FileInfo
@@ -23,43 +33,82 @@ from skyvern.forge.sdk.schemas.workflow_runs import WorkflowRunBlock
 
 LOG = structlog.get_logger()
 
+T = TypeVar("T")
+
+
+def write_file_atomically(file_path: Path, data: bytes) -> None:
+    """
+    Write to a temporary file in the target directory and rename it, so readers never see a partially written file.
+    """
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=file_path.parent, prefix=f".{file_path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(temp_path, file_path)
+    except BaseException:
+        Path(temp_path).unlink(missing_ok=True)
+        raise
+
+
+def read_file(file_path: str) -> bytes:
+    with open(file_path, "rb") as f:
+        return f.read()
+
 
 class LocalStorage(BaseStorage):
-    def __init__(self, artifact_path: str = settings.ARTIFACT_STORAGE_PATH) -> None:
+    def __init__(
+        self,
+        artifact_path: str = settings.ARTIFACT_STORAGE_PATH,
+        sharded: bool = settings.ARTIFACT_STORAGE_SHARDED,
+    ) -> None:
         self.artifact_path = artifact_path
+        self.sharded = sharded
+        # all the file I/O runs in a dedicated pool so that busy artifact writes don't starve the default executor
+        self._io_executor = ThreadPoolExecutor(
+            max_workers=settings.ARTIFACT_STORAGE_IO_WORKERS, thread_name_prefix="local-storage-io"
+        )
+
+    async def _run_io(self, func: Callable[..., T], *args: object) -> T:
+        return await asyncio.get_running_loop().run_in_executor(self._io_executor, func, *args)
+
+    def _shard(self, key: str) -> str:
+        """
+        Path prefix spreading the per entity directories over 256 buckets when sharding is enabled.
+        """
+        if not self.sharded:
+            return ""
+        return f"{hashlib.sha1(key.encode()).hexdigest()[:2]}/"
 
     def build_uri(self, *, organization_id: str, artifact_id: str, step: Step, artifact_type: ArtifactType) -> str:
         file_ext = FILE_EXTENTSION_MAP[artifact_type]
-        return f"file://{self.artifact_path}/{organization_id}/{step.task_id}/{step.order:02d}_{step.retry_index}_{step.step_id}/{datetime.utcnow().isoformat()}_{artifact_id}_{artifact_type}.{file_ext}"
+        return f"file://{self.artifact_path}/{organization_id}/{self._shard(step.task_id)}{step.task_id}/{step.order:02d}_{step.retry_index}_{step.step_id}/{datetime.utcnow().isoformat()}_{artifact_id}_{artifact_type}.{file_ext}"
 
     async def retrieve_global_workflows(self) -> list[str]:
         file_path = Path(f"{self.artifact_path}/{settings.ENV}/global_workflows.txt")
-        self._create_directories_if_not_exists(file_path)
-        if not file_path.exists():
-            return []
         try:
-            with open(file_path) as f:
-                return [line.strip() for line in f.readlines() if line.strip()]
+            data = await self._run_io(read_file, str(file_path))
         except Exception:
             return []
+        return [line.strip() for line in data.decode("utf-8").splitlines() if line.strip()]
 
     def build_log_uri(
         self, *, organization_id: str, log_entity_type: LogEntityType, log_entity_id: str, artifact_type: ArtifactType
     ) -> str:
         file_ext = FILE_EXTENTSION_MAP[artifact_type]
-        return f"file://{self.artifact_path}/logs/{log_entity_type}/{log_entity_id}/{datetime.utcnow().isoformat()}_{artifact_type}.{file_ext}"
+        return f"file://{self.artifact_path}/logs/{log_entity_type}/{self._shard(log_entity_id)}{log_entity_id}/{datetime.utcnow().isoformat()}_{artifact_type}.{file_ext}"
 
     def build_thought_uri(
         self, *, organization_id: str, artifact_id: str, thought: Thought, artifact_type: ArtifactType
     ) -> str:
         file_ext = FILE_EXTENTSION_MAP[artifact_type]
-        return f"file://{self.artifact_path}/{settings.ENV}/{organization_id}/tasks/{thought.observer_cruise_id}/{thought.observer_thought_id}/{datetime.utcnow().isoformat()}_{artifact_id}_{artifact_type}.{file_ext}"
+        return f"file://{self.artifact_path}/{settings.ENV}/{organization_id}/tasks/{self._shard(thought.observer_cruise_id)}{thought.observer_cruise_id}/{thought.observer_thought_id}/{datetime.utcnow().isoformat()}_{artifact_id}_{artifact_type}.{file_ext}"
 
     def build_task_v2_uri(
         self, *, organization_id: str, artifact_id: str, task_v2: TaskV2, artifact_type: ArtifactType
     ) -> str:
         file_ext = FILE_EXTENTSION_MAP[artifact_type]
-        return f"file://{self.artifact_path}/{settings.ENV}/{organization_id}/observers/{task_v2.observer_cruise_id}/{datetime.utcnow().isoformat()}_{artifact_id}_{artifact_type}.{file_ext}"
+        return f"file://{self.artifact_path}/{settings.ENV}/{organization_id}/observers/{self._shard(task_v2.observer_cruise_id)}{task_v2.observer_cruise_id}/{datetime.utcnow().isoformat()}_{artifact_id}_{artifact_type}.{file_ext}"
 
     def build_workflow_run_block_uri(
         self,
@@ -70,26 +119,39 @@ class LocalStorage(BaseStorage):
         artifact_type: ArtifactType,
     ) -> str:
         file_ext = FILE_EXTENTSION_MAP[artifact_type]
-        return f"file://{self.artifact_path}/{settings.ENV}/{organization_id}/workflow_runs/{workflow_run_block.workflow_run_id}/{workflow_run_block.workflow_run_block_id}/{datetime.utcnow().isoformat()}_{artifact_id}_{artifact_type}.{file_ext}"
+        return f"file://{self.artifact_path}/{settings.ENV}/{organization_id}/workflow_runs/{self._shard(workflow_run_block.workflow_run_id)}{workflow_run_block.workflow_run_id}/{workflow_run_block.workflow_run_block_id}/{datetime.utcnow().isoformat()}_{artifact_id}_{artifact_type}.{file_ext}"
 
     def build_ai_suggestion_uri(
         self, *, organization_id: str, artifact_id: str, ai_suggestion: AISuggestion, artifact_type: ArtifactType
     ) -> str:
         file_ext = FILE_EXTENTSION_MAP[artifact_type]
-        return f"file://{self.artifact_path}/{settings.ENV}/{organization_id}/ai_suggestions/{ai_suggestion.ai_suggestion_id}/{datetime.utcnow().isoformat()}_{artifact_id}_{artifact_type}.{file_ext}"
+        return f"file://{self.artifact_path}/{settings.ENV}/{organization_id}/ai_suggestions/{self._shard(ai_suggestion.ai_suggestion_id)}{ai_suggestion.ai_suggestion_id}/{datetime.utcnow().isoformat()}_{artifact_id}_{artifact_type}.{file_ext}"
 
     def build_project_file_uri(
         self, *, organization_id: str, project_id: str, project_version: int, file_path: str
     ) -> str:
         return f"file://{self.artifact_path}/{settings.ENV}/{organization_id}/projects/{project_id}/{project_version}/{file_path}"
 
+    def build_content_addressed_uri(
+        self,
+        *,
+        organization_id: str,
+        content_hash: str,
+        artifact_type: ArtifactType,
+        compression: ArtifactCompression,
+    ) -> str:
+        file_ext = FILE_EXTENTSION_MAP[artifact_type]
+        suffix = get_compression_uri_suffix(compression)
+        return f"file://{self.artifact_path}/{settings.ENV}/{organization_id}/cas/{content_hash[:2]}/{content_hash}.{file_ext}{suffix}"
+
+    async def artifact_exists(self, artifact: Artifact) -> bool:
+        return await self._run_io(os.path.exists, parse_uri_to_path(artifact.uri))
+
     async def store_artifact(self, artifact: Artifact, data: bytes) -> None:
         file_path = None
         try:
             file_path = Path(parse_uri_to_path(artifact.uri))
-            self._create_directories_if_not_exists(file_path)
-            with open(file_path, "wb") as f:
-                f.write(data)
+            await self._run_io(write_file_atomically, file_path, data)
         except Exception:
             LOG.exception(
                 "Failed to store artifact locally.",
@@ -101,8 +163,7 @@ class LocalStorage(BaseStorage):
         file_path = None
         try:
             file_path = Path(parse_uri_to_path(artifact.uri))
-            self._create_directories_if_not_exists(file_path)
-            Path(path).replace(file_path)
+            await self._run_io(self._move_file, Path(path), file_path)
         except Exception:
             LOG.exception(
                 "Failed to store artifact locally.",
@@ -114,8 +175,8 @@ class LocalStorage(BaseStorage):
         file_path = None
         try:
             file_path = parse_uri_to_path(artifact.uri)
-            with open(file_path, "rb") as f:
-                return f.read()
+            data = await self._run_io(read_file, file_path)
+            return decode_artifact_data(artifact.uri, data)
         except Exception:
             LOG.exception(
                 "Failed to retrieve local artifact.",
@@ -124,6 +185,54 @@ class LocalStorage(BaseStorage):
             )
             return None
 
+    async def store_artifact_segment(self, artifact: Artifact, segment_index: int, data: bytes) -> bool:
+        file_path = None
+        try:
+            file_path = Path(parse_uri_to_path(self.build_artifact_segment_uri(artifact, segment_index)))
+            await self._run_io(write_file_atomically, file_path, data)
+            return True
+        except Exception:
+            LOG.exception(
+                "Failed to store artifact segment locally.",
+                file_path=file_path,
+                artifact=artifact,
+                segment_index=segment_index,
+            )
+            return False
+
+    async def list_artifact_segment_uris(self, artifact: Artifact) -> list[str]:
+        segments_dir = Path(parse_uri_to_path(self.build_artifact_segment_uri(artifact, 0))).parent
+        return await self._run_io(self._list_segment_uris, segments_dir)
+
+    @staticmethod
+    def _list_segment_uris(segments_dir: Path) -> list[str]:
+        if not segments_dir.is_dir():
+            return []
+        # skip the temporary files of in flight atomic writes
+        return [
+            f"file://{path}"
+            for path in sorted(segments_dir.iterdir())
+            if path.is_file() and not path.name.startswith(".")
+        ]
+
+    async def retrieve_artifact_segment(self, segment_uri: str) -> bytes | None:
+        file_path = None
+        try:
+            file_path = parse_uri_to_path(segment_uri)
+            return await self._run_io(read_file, file_path)
+        except Exception:
+            LOG.exception("Failed to retrieve local artifact segment.", file_path=file_path)
+            return None
+
+    async def get_artifact_file_path(self, artifact: Artifact) -> str | None:
+        # compressed artifacts have to be decompressed before being served
+        if is_compressed_uri(artifact.uri):
+            return None
+        file_path = parse_uri_to_path(artifact.uri)
+        if not await self._run_io(os.path.isfile, file_path):
+            return None
+        return file_path
+
     async def get_share_link(self, artifact: Artifact) -> str:
         return artifact.uri
 
@@ -134,12 +243,9 @@ class LocalStorage(BaseStorage):
         return
 
     async def get_streaming_file(self, organization_id: str, file_name: str) -> bytes | None:
-        # make the directory if it doesn't exist
-        Path(f"{get_skyvern_temp_dir()}/{organization_id}").mkdir(parents=True, exist_ok=True)
-        file_path = Path(f"{get_skyvern_temp_dir()}/{organization_id}/{file_name}")
+        file_path = f"{get_skyvern_temp_dir()}/{organization_id}/{file_name}"
         try:
-            with open(file_path, "rb") as f:
-                return f.read()
+            return await self._run_io(read_file, file_path)
         except Exception:
             return None
 
@@ -147,7 +253,7 @@ class LocalStorage(BaseStorage):
         stored_folder_path = Path(settings.BROWSER_SESSION_BASE_PATH) / organization_id / workflow_permanent_id
         if directory == str(stored_folder_path):
             return
-        self._create_directories_if_not_exists(stored_folder_path)
+        await self._run_io(self._create_directories_if_not_exists, stored_folder_path)
         LOG.info(
             "Storing browser session locally",
             organization_id=organization_id,
@@ -156,14 +262,14 @@ class LocalStorage(BaseStorage):
             browser_session_path=stored_folder_path,
         )
 
-        # Copy all files from the directory to the stored folder
-        for root, _, files in os.walk(directory):
-            for file in files:
-                source_file_path = Path(root) / file
-                relative_path = source_file_path.relative_to(directory)
-                target_file_path = stored_folder_path / relative_path
-                self._create_directories_if_not_exists(target_file_path)
-                shutil.copy2(source_file_path, target_file_path)
+        # Only copy the files that changed since the last time the session was stored
+        copied_files = await asyncio.to_thread(sync_browser_session_directory, directory, str(stored_folder_path))
+        LOG.info(
+            "Stored browser session locally",
+            organization_id=organization_id,
+            workflow_permanent_id=workflow_permanent_id,
+            copied_files=copied_files,
+        )
 
     async def retrieve_browser_session(self, organization_id: str, workflow_permanent_id: str) -> str | None:
         stored_folder_path = Path(settings.BROWSER_SESSION_BASE_PATH) / organization_id / workflow_permanent_id
@@ -180,6 +286,10 @@ class LocalStorage(BaseStorage):
         self, organization_id: str, task_id: str | None, workflow_run_id: str | None
     ) -> list[FileInfo]:
         download_dir = get_download_dir(workflow_run_id=workflow_run_id, task_id=task_id)
+        return await self._run_io(self._list_downloaded_files, download_dir)
+
+    @staticmethod
+    def _list_downloaded_files(download_dir: str) -> list[FileInfo]:
         file_infos: list[FileInfo] = []
         files_and_folders = os.listdir(download_dir)
         for file_or_folder in files_and_folders:
@@ -196,6 +306,16 @@ class LocalStorage(BaseStorage):
         path = path_including_file_name.parent
         path.mkdir(parents=True, exist_ok=True)
 
+    @staticmethod
+    def _move_file(source_path: Path, target_path: Path) -> None:
+        target_path.parent.mkdir(parents=True, exist_ok=True)
+        # rename is atomic on the same filesystem, fall back to a copy + atomic rename across filesystems
+        try:
+            source_path.replace(target_path)
+        except OSError:
+            write_file_atomically(target_path, source_path.read_bytes())
+            source_path.unlink(missing_ok=True)
+
     async def save_legacy_file(
         self, *, organization_id: str, filename: str, fileObj: BinaryIO
     ) -> tuple[str, str] | None:
@@ -1,5 +1,5 @@
+import asyncio
 import os
-import shutil
 import uuid
 from datetime import datetime, timezone
 from typing import BinaryIO
@@ -8,7 +8,8 @@ import structlog
 
 from skyvern.config import settings
 from skyvern.constants import DOWNLOAD_FILE_PREFIX
-from skyvern.forge.sdk.api.aws import AsyncAWSClient, S3StorageClass
+from skyvern.exceptions import BrowserSessionStoreFailed
+from skyvern.forge.sdk.api.aws import AsyncAWSClient, S3StorageClass, S3Uri
 from skyvern.forge.sdk.api.files import (
     calculate_sha256_for_file,
     create_named_temporary_file,
@@ -17,8 +18,24 @@ from skyvern.forge.sdk.api.files import (
     make_temp_directory,
     unzip_files,
 )
+from skyvern.forge.sdk.artifact.compression import ArtifactCompression
+from skyvern.forge.sdk.artifact.content_addressed import (
+    decode_artifact_data,
+    get_compression_uri_suffix,
+    get_content_encoding,
+)
 from skyvern.forge.sdk.artifact.models import Artifact, ArtifactType, LogEntityType
 from skyvern.forge.sdk.artifact.storage.base import FILE_EXTENTSION_MAP, BaseStorage
+from skyvern.forge.sdk.artifact.storage.browser_session_sync import (
+    BROWSER_SESSION_MANIFEST_NAME,
+    BrowserSessionManifest,
+    build_browser_session_manifest_async,
+    gather_with_concurrency,
+    get_deletable_hashes,
+    get_missing_hashes,
+    get_retired_hashes,
+    restore_browser_session_files,
+)
 from skyvern.forge.sdk.models import Step
 from skyvern.forge.sdk.schemas.ai_suggestions import AISuggestion
 from skyvern.forge.sdk.schemas.files import FileInfo
@@ -100,6 +117,21 @@ class S3Storage(BaseStorage):
         """
         return f"{self._build_base_uri(organization_id)}/projects/{project_id}/{project_version}/{file_path}"
 
+    def build_content_addressed_uri(
+        self,
+        *,
+        organization_id: str,
+        content_hash: str,
+        artifact_type: ArtifactType,
+        compression: ArtifactCompression,
+    ) -> str:
+        file_ext = FILE_EXTENTSION_MAP[artifact_type]
+        suffix = get_compression_uri_suffix(compression)
+        return f"{self._build_base_uri(organization_id)}/cas/{content_hash[:2]}/{content_hash}.{file_ext}{suffix}"
+
+    async def artifact_exists(self, artifact: Artifact) -> bool:
+        return await self.async_client.get_file_metadata(artifact.uri, log_exception=False) is not None
+
     async def store_artifact(self, artifact: Artifact, data: bytes) -> None:
         sc = await self._get_storage_class_for_org(artifact.organization_id)
         tags = await self._get_tags_for_org(artifact.organization_id)
@@ -120,14 +152,37 @@ class S3Storage(BaseStorage):
         return {}
 
     async def retrieve_artifact(self, artifact: Artifact) -> bytes | None:
-        return await self.async_client.download_file(artifact.uri)
+        data = await self.async_client.download_file(artifact.uri)
+        return decode_artifact_data(artifact.uri, data)
+
+    async def store_artifact_segment(self, artifact: Artifact, segment_index: int, data: bytes) -> bool:
+        sc = await self._get_storage_class_for_org(artifact.organization_id)
+        tags = await self._get_tags_for_org(artifact.organization_id)
+        uploaded_uri = await self.async_client.upload_file(
+            self.build_artifact_segment_uri(artifact, segment_index), data, storage_class=sc, tags=tags
+        )
+        return uploaded_uri is not None
+
+    async def list_artifact_segment_uris(self, artifact: Artifact) -> list[str]:
+        segments_prefix = self.build_artifact_segment_uri(artifact, 0).rsplit("/", 1)[0] + "/"
+        bucket = S3Uri(artifact.uri).bucket
+        keys = await self.async_client.list_files(uri=segments_prefix)
+        # segment names are zero padded, so the lexicographic order is the append order
+        return [f"s3://{bucket}/{key}" for key in sorted(keys)]
+
+    async def retrieve_artifact_segment(self, segment_uri: str) -> bytes | None:
+        return await self.async_client.download_file(segment_uri)
 
     async def get_share_link(self, artifact: Artifact) -> str | None:
-        share_urls = await self.async_client.create_presigned_urls([artifact.uri])
+        share_urls = await self.get_share_links([artifact])
         return share_urls[0] if share_urls else None
 
     async def get_share_links(self, artifacts: list[Artifact]) -> list[str] | None:
-        return await self.async_client.create_presigned_urls([artifact.uri for artifact in artifacts])
+        # compressed content addressed blobs are served with their Content-Encoding, so they're decompressed on read
+        return await self.async_client.create_presigned_urls(
+            [artifact.uri for artifact in artifacts],
+            content_encodings=[get_content_encoding(artifact.uri) for artifact in artifacts],
+        )
 
     async def store_artifact_from_path(self, artifact: Artifact, path: str) -> None:
         sc = await self._get_storage_class_for_org(artifact.organization_id)
@@ -163,35 +218,116 @@ class S3Storage(BaseStorage):
         path = f"s3://{settings.AWS_S3_BUCKET_SCREENSHOTS}/{settings.ENV}/{organization_id}/{file_name}"
         return await self.async_client.download_file(path, log_exception=False)
 
+    def _build_browser_session_base_uri(self, organization_id: str, workflow_permanent_id: str) -> str:
+        return (
+            f"s3://{settings.AWS_S3_BUCKET_BROWSER_SESSIONS}/{settings.ENV}/{organization_id}/{workflow_permanent_id}"
+        )
+
+    async def _retrieve_browser_session_manifest(self, base_uri: str) -> BrowserSessionManifest | None:
+        data = await self.async_client.download_file(f"{base_uri}/{BROWSER_SESSION_MANIFEST_NAME}", log_exception=False)
+        if not data:
+            return None
+        try:
+            return BrowserSessionManifest.model_validate_json(data)
+        except Exception:
+            LOG.warning("Failed to parse the browser session manifest", base_uri=base_uri, exc_info=True)
+            return None
+
     async def store_browser_session(self, organization_id: str, workflow_permanent_id: str, directory: str) -> None:
-        # Zip the directory to a temp file
-        temp_zip_file = create_named_temporary_file()
-        zip_file_path = shutil.make_archive(temp_zip_file.name, "zip", directory)
-        browser_session_uri = f"s3://{settings.AWS_S3_BUCKET_BROWSER_SESSIONS}/{settings.ENV}/{organization_id}/{workflow_permanent_id}.zip"
+        base_uri = self._build_browser_session_base_uri(organization_id, workflow_permanent_id)
         sc = await self._get_storage_class_for_org(organization_id)
         tags = await self._get_tags_for_org(organization_id)
+
+        manifest = await build_browser_session_manifest_async(directory)
+        previous_manifest = await self._retrieve_browser_session_manifest(base_uri)
+        missing_hashes = get_missing_hashes(manifest, previous_manifest)
         LOG.debug(
             "Storing browser session",
             organization_id=organization_id,
             workflow_permanent_id=workflow_permanent_id,
-            zip_file_path=zip_file_path,
-            browser_session_uri=browser_session_uri,
+            directory=directory,
+            browser_session_uri=base_uri,
+            total_files=len(manifest.files),
+            uploaded_files=len(missing_hashes),
+            storage_class=sc,
+            tags=tags,
+        )
+
+        await gather_with_concurrency(
+            settings.BROWSER_SESSION_SYNC_CONCURRENCY,
+            [
+                self.async_client.upload_file_from_path(
+                    f"{base_uri}/blobs/{file_hash}",
+                    os.path.join(directory, relative_path),
+                    storage_class=sc,
+                    tags=tags,
+                    raise_exception=True,
+                )
+                for file_hash, relative_path in missing_hashes.items()
+            ],
+        )
+        deleted_hashes: set[str] = set()
+        deletable_hashes = get_deletable_hashes(manifest, previous_manifest)
+        if deletable_hashes:
+            stored_manifest = await self._retrieve_browser_session_manifest(base_uri)
+            if stored_manifest != previous_manifest:
+                # another store replaced the manifest meanwhile and may still reference the retired blobs
+                LOG.info(
+                    "The browser session manifest changed during the store, keeping the retired blobs",
+                    organization_id=organization_id,
+                    workflow_permanent_id=workflow_permanent_id,
+                )
+            elif await self.async_client.delete_files(
+                [f"{base_uri}/blobs/{file_hash}" for file_hash in deletable_hashes]
+            ):
+                deleted_hashes = deletable_hashes
+        # the blobs that weren't deleted stay retired, a later store deletes them
+        manifest.retired_hashes = sorted(get_retired_hashes(manifest, previous_manifest, deleted_hashes))
+        # the manifest is uploaded last so a partially uploaded session never replaces a complete one
+        manifest_uri = await self.async_client.upload_file(
+            f"{base_uri}/{BROWSER_SESSION_MANIFEST_NAME}",
+            manifest.model_dump_json().encode("utf-8"),
             storage_class=sc,
             tags=tags,
         )
-        await self.async_client.upload_file_from_path(browser_session_uri, zip_file_path, storage_class=sc, tags=tags)
+        if not manifest_uri:
+            # the stored manifest is still the previous one, which references none of the deleted blobs
+            raise BrowserSessionStoreFailed(workflow_permanent_id=workflow_permanent_id)
 
     async def retrieve_browser_session(self, organization_id: str, workflow_permanent_id: str) -> str | None:
-        browser_session_uri = f"s3://{settings.AWS_S3_BUCKET_BROWSER_SESSIONS}/{settings.ENV}/{organization_id}/{workflow_permanent_id}.zip"
-        downloaded_zip_bytes = await self.async_client.download_file(browser_session_uri, log_exception=True)
+        base_uri = self._build_browser_session_base_uri(organization_id, workflow_permanent_id)
+        manifest = await self._retrieve_browser_session_manifest(base_uri)
+        if manifest is None:
+            return await self._retrieve_legacy_browser_session(base_uri)
+
+        temp_dir = make_temp_directory(prefix="skyvern_browser_session_")
+
+        async def _download_blob(file_hash: str) -> bytes | None:
+            return await self.async_client.download_file(f"{base_uri}/blobs/{file_hash}", log_exception=True)
+
+        failed_hashes = await restore_browser_session_files(
+            manifest, temp_dir, _download_blob, settings.BROWSER_SESSION_SYNC_CONCURRENCY
+        )
+        if failed_hashes:
+            LOG.warning(
+                "Failed to restore some browser session files",
+                organization_id=organization_id,
+                workflow_permanent_id=workflow_permanent_id,
+                failed_file_count=len(failed_hashes),
+            )
+        return temp_dir
+
+    async def _retrieve_legacy_browser_session(self, base_uri: str) -> str | None:
+        # browser sessions stored before the incremental sync were uploaded as a single zip file
+        downloaded_zip_bytes = await self.async_client.download_file(f"{base_uri}.zip", log_exception=True)
         if not downloaded_zip_bytes:
             return None
         temp_zip_file = create_named_temporary_file(delete=False)
-        temp_zip_file.write(downloaded_zip_bytes)
-        temp_zip_file_path = temp_zip_file.name
+        await asyncio.to_thread(temp_zip_file.write, downloaded_zip_bytes)
+        temp_zip_file.flush()
 
         temp_dir = make_temp_directory(prefix="skyvern_browser_session_")
-        unzip_files(temp_zip_file_path, temp_dir)
+        await asyncio.to_thread(unzip_files, temp_zip_file.name, temp_dir)
         temp_zip_file.close()
         return temp_dir
 
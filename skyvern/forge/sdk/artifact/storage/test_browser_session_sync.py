@@ -0,0 +1,94 @@
+from pathlib import Path
+
+import pytest
+
+from skyvern.forge.sdk.artifact.storage.browser_session_sync import (
+    BrowserSessionManifest,
+    build_browser_session_manifest,
+    get_deletable_hashes,
+    get_missing_hashes,
+    get_retired_hashes,
+    get_stale_hashes,
+    restore_browser_session_files,
+    sync_browser_session_directory,
+)
+
+
+def _write(path: Path, content: str) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content)
+
+
+@pytest.fixture
+def profile_dir(tmp_path: Path) -> Path:
+    profile = tmp_path / "profile"
+    _write(profile / "Default" / "Cookies", "cookies")
+    _write(profile / "Default" / "Preferences", "prefs")
+    _write(profile / "Local State", "prefs")
+    _write(profile / "Default" / "Cache" / "data_0", "cached")
+    _write(profile / "Default" / "Code Cache" / "js" / "index", "cached")
+    _write(profile / "SingletonCookie", "lock")
+    return profile
+
+
+def test_build_manifest_skips_caches(profile_dir: Path) -> None:
+    manifest = build_browser_session_manifest(str(profile_dir))
+    assert sorted(manifest.files) == ["Default/Cookies", "Default/Preferences", "Local State"]
+    assert manifest.files["Default/Preferences"] == manifest.files["Local State"]
+
+
+def test_missing_and_stale_hashes(profile_dir: Path) -> None:
+    previous_manifest = build_browser_session_manifest(str(profile_dir))
+    # nothing stored yet: every distinct content has to be uploaded once
+    assert len(get_missing_hashes(previous_manifest, None)) == 2
+
+    _write(profile_dir / "Default" / "Cookies", "new cookies")
+    manifest = build_browser_session_manifest(str(profile_dir))
+    missing = get_missing_hashes(manifest, previous_manifest)
+    assert list(missing.values()) == ["Default/Cookies"]
+    assert get_stale_hashes(manifest, previous_manifest) == {previous_manifest.files["Default/Cookies"]}
+
+
+def test_stale_hashes_are_deleted_one_store_later() -> None:
+    first = BrowserSessionManifest(files={"Cookies": "a"})
+    second = BrowserSessionManifest(files={"Cookies": "b"}, retired_hashes=["a"])
+    # a concurrent store started from the first manifest may still reference a
+    assert get_deletable_hashes(second, first) == set()
+    assert get_deletable_hashes(BrowserSessionManifest(files={"Cookies": "c"}), second) == {"a"}
+    # a retired blob referenced again is kept
+    assert get_deletable_hashes(BrowserSessionManifest(files={"Cookies": "a"}), second) == set()
+
+
+def test_retired_hashes_are_kept_until_deleted() -> None:
+    previous = BrowserSessionManifest(files={"Cookies": "b"}, retired_hashes=["a"])
+    manifest = BrowserSessionManifest(files={"Cookies": "c"})
+    assert get_retired_hashes(manifest, previous, deleted_hashes={"a"}) == {"b"}
+    # the deletion of a was skipped, it stays retired
+    assert get_retired_hashes(manifest, previous, deleted_hashes=set()) == {"a", "b"}
+
+
+def test_sync_directory_only_copies_changes(profile_dir: Path, tmp_path: Path) -> None:
+    target = tmp_path / "stored"
+    assert sync_browser_session_directory(str(profile_dir), str(target)) == 3
+    assert not (target / "Default" / "Cache").exists()
+    assert sync_browser_session_directory(str(profile_dir), str(target)) == 0
+
+    (profile_dir / "Local State").unlink()
+    _write(profile_dir / "Default" / "Cookies", "new cookies")
+    assert sync_browser_session_directory(str(profile_dir), str(target)) == 1
+    assert (target / "Default" / "Cookies").read_text() == "new cookies"
+    assert not (target / "Local State").exists()
+
+
+@pytest.mark.asyncio
+async def test_restore_files(tmp_path: Path) -> None:
+    manifest = BrowserSessionManifest(files={"a/one": "h1", "two": "h1", "three": "h2"})
+    blobs = {"h1": b"same"}
+
+    async def _download_blob(file_hash: str) -> bytes | None:
+        return blobs.get(file_hash)
+
+    failed_hashes = await restore_browser_session_files(manifest, str(tmp_path), _download_blob, concurrency=2)
+    assert failed_hashes == ["h2"]
+    assert (tmp_path / "a" / "one").read_bytes() == b"same"
+    assert (tmp_path / "two").read_bytes() == b"same"
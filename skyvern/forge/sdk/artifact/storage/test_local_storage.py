@@ -1,8 +1,14 @@
+import hashlib
+from datetime import datetime
+from pathlib import Path
+
 import pytest
 from freezegun import freeze_time
 
 from skyvern.config import settings
-from skyvern.forge.sdk.artifact.models import ArtifactType, LogEntityType
+from skyvern.forge.sdk.artifact.compression import ArtifactCompression, compress
+from skyvern.forge.sdk.artifact.content_addressed import compute_content_hash
+from skyvern.forge.sdk.artifact.models import Artifact, ArtifactType, LogEntityType
 from skyvern.forge.sdk.artifact.storage.local import LocalStorage
 from skyvern.forge.sdk.artifact.storage.test_helpers import (
     create_fake_for_ai_suggestion,
@@ -105,3 +111,77 @@ class TestLocalStorageBuildURIs:
             uri
             == f"file://{local_storage.artifact_path}/{settings.ENV}/{TEST_ORGANIZATION_ID}/ai_suggestions/{TEST_AI_SUGGESTION_ID}/2025-06-09T12:00:00_artifact123_screenshot_llm.png"
         )
+
+    def test_build_content_addressed_uri(self, local_storage: LocalStorage) -> None:
+        uri = local_storage.build_content_addressed_uri(
+            organization_id=TEST_ORGANIZATION_ID,
+            content_hash="abcdef",
+            artifact_type=ArtifactType.VISIBLE_ELEMENTS_TREE,
+            compression=ArtifactCompression.GZIP,
+        )
+        assert (
+            uri == f"file://{local_storage.artifact_path}/{settings.ENV}/{TEST_ORGANIZATION_ID}/cas/ab/abcdef.json.gz"
+        )
+
+
+@pytest.mark.asyncio
+async def test_content_addressed_artifact_round_trip(tmp_path: Path) -> None:
+    local_storage = LocalStorage(artifact_path=str(tmp_path))
+    data = b'{"elements": []}'
+    uri = local_storage.build_content_addressed_uri(
+        organization_id=TEST_ORGANIZATION_ID,
+        content_hash=compute_content_hash(data),
+        artifact_type=ArtifactType.VISIBLE_ELEMENTS_TREE,
+        compression=ArtifactCompression.GZIP,
+    )
+    artifact = Artifact(
+        created_at=datetime.utcnow(),
+        modified_at=datetime.utcnow(),
+        artifact_id="artifact123",
+        artifact_type=ArtifactType.VISIBLE_ELEMENTS_TREE,
+        uri=uri,
+        organization_id=TEST_ORGANIZATION_ID,
+    )
+    assert not await local_storage.artifact_exists(artifact)
+
+    await local_storage.store_artifact(artifact, compress(data, ArtifactCompression.GZIP))
+    assert await local_storage.artifact_exists(artifact)
+    assert await local_storage.retrieve_artifact(artifact) == data
+
+
+@freeze_time("2025-06-09T12:00:00")
+def test_build_sharded_uri() -> None:
+    local_storage = LocalStorage(sharded=True)
+    step = create_fake_step(TEST_STEP_ID)
+    uri = local_storage.build_uri(
+        organization_id=TEST_ORGANIZATION_ID,
+        artifact_id="artifact123",
+        step=step,
+        artifact_type=ArtifactType.LLM_PROMPT,
+    )
+    shard = hashlib.sha1(TEST_TASK_ID.encode()).hexdigest()[:2]
+    assert (
+        uri
+        == f"file://{local_storage.artifact_path}/{TEST_ORGANIZATION_ID}/{shard}/{TEST_TASK_ID}/01_0_{TEST_STEP_ID}/2025-06-09T12:00:00_artifact123_llm_prompt.txt"
+    )
+
+
+@pytest.mark.asyncio
+async def test_store_artifact_atomically(tmp_path: Path) -> None:
+    local_storage = LocalStorage(artifact_path=str(tmp_path))
+    file_path = tmp_path / "org" / "task" / "artifact.json"
+    artifact = Artifact(
+        created_at=datetime.utcnow(),
+        modified_at=datetime.utcnow(),
+        artifact_id="artifact123",
+        artifact_type=ArtifactType.LLM_REQUEST,
+        uri=f"file://{file_path}",
+        organization_id=TEST_ORGANIZATION_ID,
+    )
+    await local_storage.store_artifact(artifact, b"first")
+    await local_storage.store_artifact(artifact, b"second")
+
+    assert await local_storage.retrieve_artifact(artifact) == b"second"
+    assert await local_storage.get_artifact_file_path(artifact) == str(file_path)
+    # no temporary file is left behind
+    assert [path.name for path in file_path.parent.iterdir()] == ["artifact.json"]
@@ -1,16 +1,21 @@
 from datetime import datetime
 from pathlib import Path
-from typing import Generator
+from typing import Any, Generator
 
 import boto3
 import pytest
+import requests
 from freezegun import freeze_time
 from moto.server import ThreadedMotoServer
 from types_boto3_s3.client import S3Client
 
 from skyvern.config import settings
+from skyvern.exceptions import BrowserSessionStoreFailed
 from skyvern.forge.sdk.api.aws import S3StorageClass, S3Uri, tag_set_to_dict
+from skyvern.forge.sdk.artifact.compression import ArtifactCompression, compress
+from skyvern.forge.sdk.artifact.content_addressed import compute_content_hash
 from skyvern.forge.sdk.artifact.models import Artifact, ArtifactType, LogEntityType
+from skyvern.forge.sdk.artifact.storage.browser_session_sync import BrowserSessionManifest
 from skyvern.forge.sdk.artifact.storage.s3 import S3Storage
 from skyvern.forge.sdk.artifact.storage.test_helpers import (
     create_fake_for_ai_suggestion,
@@ -221,3 +226,95 @@ class TestS3StorageStore:
         await s3_storage.store_artifact(artifact, test_data)
         _assert_object_content(boto3_test_client, artifact.uri, test_data)
         _assert_object_meta(boto3_test_client, artifact.uri)
+
+    async def test_compressed_content_addressed_artifact_is_shared_decompressed(self, s3_storage: S3Storage) -> None:
+        test_data = b'{"elements": []}'
+        artifact = self._create_artifact_for_ai_suggestion(
+            s3_storage, ArtifactType.VISIBLE_ELEMENTS_TREE, TEST_AI_SUGGESTION_ID
+        )
+        artifact.uri = s3_storage.build_content_addressed_uri(
+            organization_id=TEST_ORGANIZATION_ID,
+            content_hash=compute_content_hash(test_data),
+            artifact_type=ArtifactType.VISIBLE_ELEMENTS_TREE,
+            compression=ArtifactCompression.GZIP,
+        )
+        await s3_storage.store_artifact(artifact, compress(test_data, ArtifactCompression.GZIP))
+
+        share_link = await s3_storage.get_share_link(artifact)
+        assert share_link is not None
+        response = requests.get(share_link)
+        assert response.headers["Content-Encoding"] == "gzip"
+        assert response.content == test_data
+
+
+@pytest.mark.asyncio
+class TestS3StorageBrowserSession:
+    @pytest.fixture(autouse=True)
+    def browser_sessions_bucket(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(settings, "AWS_S3_BUCKET_BROWSER_SESSIONS", TEST_BUCKET)
+
+    @staticmethod
+    def _blob_keys(boto3_test_client: S3Client, workflow_permanent_id: str) -> set[str]:
+        prefix = f"{settings.ENV}/{TEST_ORGANIZATION_ID}/{workflow_permanent_id}/blobs/"
+        response = boto3_test_client.list_objects_v2(Bucket=TEST_BUCKET, Prefix=prefix)
+        return {obj["Key"].removeprefix(prefix) for obj in response.get("Contents", [])}
+
+    async def test_stale_blobs_are_kept_for_one_store(
+        self, s3_storage: S3Storage, boto3_test_client: S3Client, tmp_path: Path
+    ) -> None:
+        cookies = tmp_path / "Default" / "Cookies"
+        cookies.parent.mkdir(parents=True)
+        blob_counts = []
+        for content in ["first", "second", "third"]:
+            cookies.write_text(content)
+            await s3_storage.store_browser_session(TEST_ORGANIZATION_ID, "wpid_keep", str(tmp_path))
+            blob_counts.append(len(self._blob_keys(boto3_test_client, "wpid_keep")))
+        # the blob of the first store is only deleted by the third one
+        assert blob_counts == [1, 2, 2]
+
+    async def test_failed_manifest_upload_keeps_the_blobs(
+        self, s3_storage: S3Storage, boto3_test_client: S3Client, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        cookies = tmp_path / "Cookies"
+        for content in ["first", "second"]:
+            cookies.write_text(content)
+            await s3_storage.store_browser_session(TEST_ORGANIZATION_ID, "wpid_fail", str(tmp_path))
+
+        async def failed_upload(*args: Any, **kwargs: Any) -> None:
+            return None
+
+        monkeypatch.setattr(s3_storage.async_client, "upload_file", failed_upload)
+        cookies.write_text("third")
+        with pytest.raises(BrowserSessionStoreFailed):
+            await s3_storage.store_browser_session(TEST_ORGANIZATION_ID, "wpid_fail", str(tmp_path))
+        # the blob of the manifest still stored is kept, the new one is uploaded and the already retired one deleted
+        assert len(self._blob_keys(boto3_test_client, "wpid_fail")) == 2
+
+    async def test_skipped_deletion_is_retried_by_the_next_store(
+        self, s3_storage: S3Storage, boto3_test_client: S3Client, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        cookies = tmp_path / "Cookies"
+        for content in ["first", "second"]:
+            cookies.write_text(content)
+            await s3_storage.store_browser_session(TEST_ORGANIZATION_ID, "wpid_skip", str(tmp_path))
+
+        retrieve_manifest = s3_storage._retrieve_browser_session_manifest
+        reads = 0
+
+        async def manifest_changed_meanwhile(base_uri: str) -> BrowserSessionManifest | None:
+            nonlocal reads
+            reads += 1
+            if reads == 2:
+                return BrowserSessionManifest(files={"Cookies": "concurrent"})
+            return await retrieve_manifest(base_uri)
+
+        monkeypatch.setattr(s3_storage, "_retrieve_browser_session_manifest", manifest_changed_meanwhile)
+        cookies.write_text("third")
+        await s3_storage.store_browser_session(TEST_ORGANIZATION_ID, "wpid_skip", str(tmp_path))
+        assert len(self._blob_keys(boto3_test_client, "wpid_skip")) == 3
+        monkeypatch.delattr(s3_storage, "_retrieve_browser_session_manifest")
+
+        # the blobs of the first and second stores are deleted by the next store
+        cookies.write_text("fourth")
+        await s3_storage.store_browser_session(TEST_ORGANIZATION_ID, "wpid_skip", str(tmp_path))
+        assert len(self._blob_keys(boto3_test_client, "wpid_skip")) == 2
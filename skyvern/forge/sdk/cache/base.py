@@ -1,3 +1,4 @@
+import asyncio
 from abc import ABC, abstractmethod
 from datetime import timedelta
 from typing import Any, Union
@@ -14,3 +15,10 @@ class BaseCache(ABC):
     @abstractmethod
     async def get(self, key: str) -> Any:
         pass
+
+    async def get_many(self, keys: list[str]) -> list[Any]:
+        """
+        Values of the keys, None for the missing ones. Caches backed by a remote store should override it with a
+        single round trip.
+        """
+        return list(await asyncio.gather(*[self.get(key) for key in keys]))
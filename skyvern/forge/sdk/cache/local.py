@@ -1,3 +1,4 @@
+import time
 from datetime import timedelta
 from typing import Any, Union
 
@@ -13,8 +14,15 @@ class LocalCache(BaseCache):
     async def get(self, key: str) -> Any:
         if key not in self.cache:
             return None
-        value = self.cache[key]
+        value, expire_at = self.cache[key]
+        if expire_at is not None and expire_at <= time.monotonic():
+            self.cache.pop(key, None)
+            return None
         return value
 
     async def set(self, key: str, value: Any, ex: Union[int, timedelta, None] = CACHE_EXPIRE_TIME) -> None:
-        self.cache[key] = value
+        # the TTLCache expires every item after CACHE_EXPIRE_TIME, shorter expirations are tracked per item
+        if isinstance(ex, timedelta):
+            ex = int(ex.total_seconds())
+        expire_at = time.monotonic() + ex if ex is not None else None
+        self.cache[key] = (value, expire_at)
@@ -0,0 +1,163 @@
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+
+import structlog
+
+LOG = structlog.get_logger()
+
+# the hit counts only order the exports, so they're kept in memory and written once this many hits are pending
+HIT_COUNT_FLUSH_THRESHOLD = 100
+
+
+@dataclass
+class ShapeStoreStats:
+    hits: int = 0
+    misses: int = 0
+    writes: int = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class ShapeStore:
+    """
+    Durable store of the recognized svg and css shapes, keyed by the shape cache keys (the hash of the shape html
+    without the skyvern attributes). Unlike app.CACHE it survives restarts and isn't bounded, and its content can be
+    exported and imported between nodes, or preloaded from a seed file.
+
+    The database is opened on first use. The sqlite calls are blocking, the async methods run them in a thread.
+    The lookups don't write, their hit counts are written in batches (and before an export or when closing), the
+    pending ones are lost if the process dies.
+    """
+
+    def __init__(self, path: str, seed_path: str | None = None) -> None:
+        self.path = path
+        self.seed_path = seed_path
+        self.stats = ShapeStoreStats()
+        self._connection: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+        self._pending_hit_counts: Counter[str] = Counter()
+
+    def _get_connection(self) -> sqlite3.Connection:
+        if self._connection is not None:
+            return self._connection
+        if self.path != ":memory:":
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        connection = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS shapes ("
+            "key TEXT PRIMARY KEY, shape TEXT NOT NULL, created_at REAL NOT NULL, hit_count INTEGER NOT NULL DEFAULT 0)"
+        )
+        self._connection = connection
+        if self.seed_path:
+            try:
+                imported_count = self._import_shapes(Path(self.seed_path), overwrite=False)
+                LOG.info("Shape store seeded", seed_path=self.seed_path, imported_count=imported_count)
+            except Exception:
+                LOG.warning("Failed to seed the shape store", seed_path=self.seed_path, exc_info=True)
+        return connection
+
+    def get_many(self, keys: list[str]) -> list[str | None]:
+        if not keys:
+            return []
+        with self._lock:
+            connection = self._get_connection()
+            placeholders = ",".join("?" * len(keys))
+            rows = connection.execute(f"SELECT key, shape FROM shapes WHERE key IN ({placeholders})", keys).fetchall()
+            shapes = dict(rows)
+            self._pending_hit_counts.update(shapes.keys())
+            if self._pending_hit_counts.total() >= HIT_COUNT_FLUSH_THRESHOLD:
+                self._flush_hit_counts()
+        hits = sum(1 for key in keys if key in shapes)
+        self.stats.hits += hits
+        self.stats.misses += len(keys) - hits
+        return [shapes.get(key) for key in keys]
+
+    def _flush_hit_counts(self) -> None:
+        if not self._pending_hit_counts or self._connection is None:
+            return
+        self._connection.execute("BEGIN")
+        try:
+            self._connection.executemany(
+                "UPDATE shapes SET hit_count = hit_count + ? WHERE key = ?",
+                [(hit_count, key) for key, hit_count in self._pending_hit_counts.items()],
+            )
+        except Exception:
+            self._connection.execute("ROLLBACK")
+            raise
+        self._connection.execute("COMMIT")
+        self._pending_hit_counts.clear()
+
+    def set(self, key: str, shape: str) -> None:
+        with self._lock:
+            self._get_connection().execute(
+                "INSERT INTO shapes (key, shape, created_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET shape = excluded.shape",
+                (key, shape, time.time()),
+            )
+        self.stats.writes += 1
+
+    async def aget_many(self, keys: list[str]) -> list[str | None]:
+        return await asyncio.to_thread(self.get_many, keys)
+
+    async def aset(self, key: str, shape: str) -> None:
+        await asyncio.to_thread(self.set, key, shape)
+
+    def export_shapes(self, path: Path, limit: int | None = None) -> int:
+        """
+        Write the shapes to a JSON lines file, the most used first. The file can be imported on another node or
+        shipped as a seed.
+        """
+        with self._lock:
+            self._flush_hit_counts()
+            rows = (
+                self._get_connection()
+                .execute("SELECT key, shape FROM shapes ORDER BY hit_count DESC, key LIMIT ?", (limit or -1,))
+                .fetchall()
+            )
+        with path.open("w") as f:
+            for key, shape in rows:
+                f.write(json.dumps({"key": key, "shape": shape}) + "\n")
+        return len(rows)
+
+    def import_shapes(self, path: Path, overwrite: bool = False) -> int:
+        with self._lock:
+            self._get_connection()
+            return self._import_shapes(path, overwrite)
+
+    def _import_shapes(self, path: Path, overwrite: bool) -> int:
+        assert self._connection is not None
+        rows = []
+        with path.open() as f:
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    rows.append((record["key"], record["shape"], time.time()))
+        conflict_clause = "DO UPDATE SET shape = excluded.shape" if overwrite else "DO NOTHING"
+        # a single transaction, the connection commits every statement otherwise
+        self._connection.execute("BEGIN")
+        try:
+            cursor = self._connection.executemany(
+                f"INSERT INTO shapes (key, shape, created_at) VALUES (?, ?, ?) ON CONFLICT(key) {conflict_clause}", rows
+            )
+        except Exception:
+            self._connection.execute("ROLLBACK")
+            raise
+        self._connection.execute("COMMIT")
+        return cursor.rowcount
+
+    def close(self) -> None:
+        with self._lock:
+            if self._connection is not None:
+                self._flush_hit_counts()
+                self._connection.close()
+                self._connection = None
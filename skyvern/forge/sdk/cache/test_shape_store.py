@@ -0,0 +1,57 @@
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+from skyvern.forge.sdk.cache import shape_store
+from skyvern.forge.sdk.cache.shape_store import ShapeStore
+
+
+def test_shapes_are_persisted_and_counted(tmp_path: Path) -> None:
+    store = ShapeStore(str(tmp_path / "shapes.sqlite3"))
+    store.set("skyvern:svg:search", "magnifying glass")
+    store.close()
+
+    reopened_store = ShapeStore(str(tmp_path / "shapes.sqlite3"))
+    assert reopened_store.get_many(["skyvern:svg:search", "skyvern:svg:cart"]) == ["magnifying glass", None]
+    assert reopened_store.stats.hits == 1
+    assert reopened_store.stats.hit_ratio == 0.5
+
+
+def test_export_import_and_seed(tmp_path: Path) -> None:
+    store = ShapeStore(str(tmp_path / "node1.sqlite3"))
+    store.set("skyvern:svg:close", "cross")
+    store.set("skyvern:shape:menu", "hamburger menu")
+    store.get_many(["skyvern:shape:menu"])
+    assert store.export_shapes(tmp_path / "shapes.jsonl") == 2
+    assert (tmp_path / "shapes.jsonl").read_text().splitlines()[0].startswith('{"key": "skyvern:shape:menu"')
+
+    other_store = ShapeStore(str(tmp_path / "node2.sqlite3"))
+    other_store.set("skyvern:svg:close", "x icon")
+    assert other_store.import_shapes(tmp_path / "shapes.jsonl") == 1
+    assert other_store.get_many(["skyvern:svg:close"]) == ["x icon"]
+    assert other_store.import_shapes(tmp_path / "shapes.jsonl", overwrite=True) == 2
+    assert other_store.get_many(["skyvern:svg:close"]) == ["cross"]
+
+    seeded_store = ShapeStore(str(tmp_path / "node3.sqlite3"), seed_path=str(tmp_path / "shapes.jsonl"))
+    assert seeded_store.get_many(["skyvern:svg:close", "skyvern:shape:menu"]) == ["cross", "hamburger menu"]
+
+
+def test_hit_counts_are_written_in_batches(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    monkeypatch.setattr(shape_store, "HIT_COUNT_FLUSH_THRESHOLD", 3)
+    store = ShapeStore(str(tmp_path / "shapes.sqlite3"))
+    store.set("skyvern:svg:close", "cross")
+    connection = sqlite3.connect(tmp_path / "shapes.sqlite3")
+
+    def get_hit_count() -> int:
+        return connection.execute("SELECT hit_count FROM shapes WHERE key = 'skyvern:svg:close'").fetchone()[0]
+
+    store.get_many(["skyvern:svg:close", "skyvern:svg:cart"])
+    store.get_many(["skyvern:svg:close"])
+    assert get_hit_count() == 0
+    store.get_many(["skyvern:svg:close"])
+    assert get_hit_count() == 3
+
+    store.get_many(["skyvern:svg:close"])
+    store.close()
+    assert get_hit_count() == 4
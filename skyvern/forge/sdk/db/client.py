@@ -89,6 +89,7 @@ from skyvern.forge.sdk.schemas.task_generations import TaskGeneration
 from skyvern.forge.sdk.schemas.task_v2 import TaskV2, TaskV2Status, Thought, ThoughtType
 from skyvern.forge.sdk.schemas.tasks import OrderBy, SortDirection, Task, TaskStatus
 from skyvern.forge.sdk.schemas.totp_codes import TOTPCode
+from skyvern.forge.sdk.services.totp_code_waiters import TOTP_CODE_CHANNEL, build_totp_code_notification
 from skyvern.forge.sdk.schemas.workflow_runs import WorkflowRunBlock
 from skyvern.forge.sdk.workflow.models.block import BlockStatus, BlockType
 from skyvern.forge.sdk.workflow.models.parameter import (
@@ -368,6 +369,30 @@ class AgentDB:
             LOG.error("UnexpectedError", exc_info=True)
             raise
 
+    async def get_last_task_steps(self, task_id: str, organization_id: str, limit: int) -> list[Step]:
+        """
+        Get the last steps of the task, in step order
+        """
+        try:
+            async with self.Session() as session:
+                steps = (
+                    await session.scalars(
+                        select(StepModel)
+                        .filter_by(task_id=task_id)
+                        .filter_by(organization_id=organization_id)
+                        .order_by(StepModel.order.desc())
+                        .order_by(StepModel.retry_index.desc())
+                        .limit(limit)
+                    )
+                ).all()
+                return [convert_to_step(step, debug_enabled=self.debug_enabled) for step in reversed(steps)]
+        except SQLAlchemyError:
+            LOG.error("SQLAlchemyError", exc_info=True)
+            raise
+        except Exception:
+            LOG.error("UnexpectedError", exc_info=True)
+            raise
+
     async def get_steps_by_task_ids(self, task_ids: list[str], organization_id: str | None = None) -> list[Step]:
         try:
             async with self.Session() as session:
@@ -1787,7 +1812,7 @@ class AgentDB:
                     workflow_run.webhook_failure_reason = webhook_failure_reason
                 await session.commit()
                 await session.refresh(workflow_run)
-                await save_workflow_run_logs(workflow_run_id)
+                await save_workflow_run_logs(workflow_run_id, final=bool(status and status.is_final()))
                 return convert_to_workflow_run(workflow_run)
             else:
                 raise WorkflowRunNotFound(workflow_run_id)
@@ -2414,6 +2439,40 @@ class AgentDB:
             totp_code = (await session.scalars(query)).all()
             return [TOTPCode.model_validate(totp_code) for totp_code in totp_code]
 
+    async def get_valid_totp_code(
+        self,
+        organization_id: str,
+        totp_identifier: str,
+        task_id: str,
+        workflow_id: str | None = None,
+        workflow_run_id: str | None = None,
+        valid_lifespan_minutes: int = settings.TOTP_LIFESPAN_MINUTES,
+        created_after: datetime | None = None,
+    ) -> TOTPCode | None:
+        """
+        The latest unexpired code of the identifier within the valid lifespan that isn't bound to another task,
+        workflow or workflow run. With created_after, only the codes created after it.
+        """
+        async with self.Session() as session:
+            query = (
+                select(TOTPCodeModel)
+                .filter_by(organization_id=organization_id)
+                .filter_by(totp_identifier=totp_identifier)
+                .filter(TOTPCodeModel.created_at > datetime.utcnow() - timedelta(minutes=valid_lifespan_minutes))
+                .filter(or_(TOTPCodeModel.task_id.is_(None), TOTPCodeModel.task_id == task_id))
+                .filter(or_(TOTPCodeModel.expired_at.is_(None), TOTPCodeModel.expired_at >= datetime.utcnow()))
+            )
+            if workflow_id:
+                query = query.filter(or_(TOTPCodeModel.workflow_id.is_(None), TOTPCodeModel.workflow_id == workflow_id))
+            if workflow_run_id:
+                query = query.filter(
+                    or_(TOTPCodeModel.workflow_run_id.is_(None), TOTPCodeModel.workflow_run_id == workflow_run_id)
+                )
+            if created_after:
+                query = query.filter(TOTPCodeModel.created_at > created_after)
+            totp_code = (await session.scalars(query.order_by(TOTPCodeModel.created_at.desc()).limit(1))).first()
+            return TOTPCode.model_validate(totp_code) if totp_code else None
+
     async def create_totp_code(
         self,
         organization_id: str,
@@ -2439,36 +2498,58 @@ class AgentDB:
                 expired_at=expired_at,
             )
             session.add(new_totp_code)
+            if self.engine.dialect.name == "postgresql":
+                # delivered to the listening workers once the code is committed
+                notification = build_totp_code_notification(organization_id, totp_identifier)
+                await session.execute(select(func.pg_notify(TOTP_CODE_CHANNEL, notification)))
             await session.commit()
             await session.refresh(new_totp_code)
             return TOTPCode.model_validate(new_totp_code)
 
+    @staticmethod
+    def _build_action_model(action: Action) -> ActionModel:
+        new_action = ActionModel(
+            action_type=action.action_type,
+            source_action_id=action.source_action_id,
+            organization_id=action.organization_id,
+            workflow_run_id=action.workflow_run_id,
+            task_id=action.task_id,
+            step_id=action.step_id,
+            step_order=action.step_order,
+            action_order=action.action_order,
+            status=action.status,
+            reasoning=action.reasoning,
+            intention=action.intention,
+            response=action.response,
+            element_id=action.element_id,
+            skyvern_element_hash=action.skyvern_element_hash,
+            skyvern_element_data=action.skyvern_element_data,
+            action_json=action.model_dump(),
+            confidence_float=action.confidence_float,
+        )
+        if action.created_at:
+            new_action.created_at = action.created_at
+        return new_action
+
     async def create_action(self, action: Action) -> Action:
         async with self.Session() as session:
-            new_action = ActionModel(
-                action_type=action.action_type,
-                source_action_id=action.source_action_id,
-                organization_id=action.organization_id,
-                workflow_run_id=action.workflow_run_id,
-                task_id=action.task_id,
-                step_id=action.step_id,
-                step_order=action.step_order,
-                action_order=action.action_order,
-                status=action.status,
-                reasoning=action.reasoning,
-                intention=action.intention,
-                response=action.response,
-                element_id=action.element_id,
-                skyvern_element_hash=action.skyvern_element_hash,
-                skyvern_element_data=action.skyvern_element_data,
-                action_json=action.model_dump(),
-                confidence_float=action.confidence_float,
-            )
+            new_action = self._build_action_model(action)
             session.add(new_action)
             await session.commit()
             await session.refresh(new_action)
             return Action.model_validate(new_action)
 
+    async def create_actions(self, actions: list[Action]) -> None:
+        """
+        Insert the actions in a single multi-row INSERT. The actions keep their created_at, if set, so their order
+        doesn't depend on when they were written.
+        """
+        if not actions:
+            return
+        async with self.Session() as session:
+            session.add_all([self._build_action_model(action) for action in actions])
+            await session.commit()
+
     async def retrieve_action_plan(self, task: Task) -> list[Action]:
         async with self.Session() as session:
             subquery = (
@@ -485,6 +485,9 @@ class AISuggestionModel(Base):
 
 class TOTPCodeModel(Base):
     __tablename__ = "totp_codes"
+    __table_args__ = (
+        Index("totp_code_org_identifier_run_index", "organization_id", "totp_identifier", "workflow_run_id"),
+    )
 
     totp_code_id = Column(String, primary_key=True, default=generate_totp_code_id)
     totp_identifier = Column(String, nullable=False, index=True)
@@ -1,10 +1,15 @@
+import asyncio
 import json
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable
 
 import structlog
 
 from skyvern.config import settings
 from skyvern.forge import app
-from skyvern.forge.sdk.artifact.models import ArtifactType, LogEntityType
+from skyvern.forge.sdk.artifact.compression import compress, resolve_compression
+from skyvern.forge.sdk.artifact.models import Artifact, ArtifactType, LogEntityType
 from skyvern.forge.sdk.core import skyvern_context
 from skyvern.forge.skyvern_json_encoder import SkyvernJSONLogEncoder
 from skyvern.forge.skyvern_log_encoder import SkyvernLogEncoder
@@ -27,97 +32,175 @@ def primary_key_from_log_entity_type(log_entity_type: LogEntityType) -> str:
         raise ValueError(f"Invalid log entity type: {log_entity_type}")
 
 
-async def save_step_logs(step_id: str) -> None:
-    if not settings.ENABLE_LOG_ARTIFACTS:
-        return
+@dataclass
+class LogSegmentState:
+    # index in the context log up to which the entries have been scanned for this entity
+    scanned_index: int = 0
+    pending_entries: list[dict] = field(default_factory=list)
+    next_segment_index: int = 0
+    last_flushed_at: float = field(default_factory=time.monotonic)
+    artifacts: dict[ArtifactType, Artifact] = field(default_factory=dict)
+    # the whole log of each artifact, stored at the artifact uri on every flush for the readers of the uri, and the
+    # upload of its latest version
+    contents: dict[ArtifactType, bytearray] = field(default_factory=dict)
+    content_uploads: dict[ArtifactType, asyncio.Task[None]] = field(default_factory=dict)
+    # flushes the buffered entries if the entity isn't saved again within the flush interval
+    flush_task: asyncio.Task[None] | None = None
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+
 
-    context = skyvern_context.ensure_context()
+def _get_new_entries(
+    context: skyvern_context.SkyvernContext, log_entity_type: LogEntityType, log_entity_id: str
+) -> tuple[LogSegmentState, list[dict]]:
+    """
+    Return the log entries of the entity added to the context log since the last call. The context log is append-only,
+    so only its tail has to be scanned.
+    """
+    key = f"{log_entity_type}:{log_entity_id}"
+    state = context.log_segment_states.get(key)
+    if state is None:
+        state = LogSegmentState()
+        context.log_segment_states[key] = state
+
+    primary_key = primary_key_from_log_entity_type(log_entity_type)
     log = context.log
-    organization_id = context.organization_id
+    new_entries = [entry for entry in log[state.scanned_index :] if entry.get(primary_key, "") == log_entity_id]
+    state.scanned_index = len(log)
+    return state, new_entries
 
-    current_step_log = [entry for entry in log if entry.get("step_id", "") == step_id]
+
+async def save_step_logs(step_id: str, final: bool = False) -> None:
+    if not settings.ENABLE_LOG_ARTIFACTS:
+        return
 
     await _save_log_artifacts(
-        log=current_step_log,
         log_entity_type=LogEntityType.STEP,
         log_entity_id=step_id,
-        organization_id=organization_id,
+        final=final,
         step_id=step_id,
     )
 
 
-async def save_task_logs(task_id: str) -> None:
+async def save_task_logs(task_id: str, final: bool = False) -> None:
     if not settings.ENABLE_LOG_ARTIFACTS:
         return
 
-    context = skyvern_context.ensure_context()
-    log = context.log
-    organization_id = context.organization_id
-
-    current_task_log = [entry for entry in log if entry.get("task_id", "") == task_id]
-
     await _save_log_artifacts(
-        log=current_task_log,
         log_entity_type=LogEntityType.TASK,
         log_entity_id=task_id,
-        organization_id=organization_id,
+        final=final,
         task_id=task_id,
     )
 
 
-async def save_workflow_run_logs(workflow_run_id: str) -> None:
+async def save_workflow_run_logs(workflow_run_id: str, final: bool = False) -> None:
     if not settings.ENABLE_LOG_ARTIFACTS:
         return
 
-    context = skyvern_context.ensure_context()
-    log = context.log
-    organization_id = context.organization_id
-
-    current_workflow_run_log = [entry for entry in log if entry.get("workflow_run_id", "") == workflow_run_id]
-
     await _save_log_artifacts(
-        log=current_workflow_run_log,
         log_entity_type=LogEntityType.WORKFLOW_RUN,
         log_entity_id=workflow_run_id,
-        organization_id=organization_id,
+        final=final,
         workflow_run_id=workflow_run_id,
     )
 
 
-async def save_workflow_run_block_logs(workflow_run_block_id: str) -> None:
+async def save_workflow_run_block_logs(workflow_run_block_id: str, final: bool = False) -> None:
     if not settings.ENABLE_LOG_ARTIFACTS:
         return
 
-    context = skyvern_context.ensure_context()
-    log = context.log
-    organization_id = context.organization_id
-    current_workflow_run_block_log = [
-        entry for entry in log if entry.get("workflow_run_block_id", "") == workflow_run_block_id
-    ]
-
     await _save_log_artifacts(
-        log=current_workflow_run_block_log,
         log_entity_type=LogEntityType.WORKFLOW_RUN_BLOCK,
         log_entity_id=workflow_run_block_id,
-        organization_id=organization_id,
+        final=final,
         workflow_run_block_id=workflow_run_block_id,
     )
 
 
+def encode_log_segment(log: list[dict]) -> tuple[bytes, bytes]:
+    """
+    Encode log entries into a raw (NDJSON) and a formatted segment. Segments end with a newline so they can be
+    concatenated as they are.
+    """
+    raw_segment = "".join(json.dumps(entry, cls=SkyvernJSONLogEncoder) + "\n" for entry in log)
+    formatted_segment = SkyvernLogEncoder.encode(log) + "\n"
+    return raw_segment.encode(), formatted_segment.encode()
+
+
+async def _get_or_create_log_artifact(
+    state: LogSegmentState,
+    *,
+    artifact_type: ArtifactType,
+    log_entity_type: LogEntityType,
+    log_entity_id: str,
+    organization_id: str,
+    step_id: str | None = None,
+    task_id: str | None = None,
+    workflow_run_id: str | None = None,
+    workflow_run_block_id: str | None = None,
+) -> Artifact:
+    if artifact_type in state.artifacts:
+        return state.artifacts[artifact_type]
+
+    artifact = await app.DATABASE.get_artifact_by_entity_id(
+        artifact_type=artifact_type,
+        step_id=step_id,
+        task_id=task_id,
+        workflow_run_id=workflow_run_id,
+        workflow_run_block_id=workflow_run_block_id,
+        organization_id=organization_id,
+    )
+    if artifact:
+        # the entity may have been logged from another context already, keep appending after its segments
+        segment_count = len(await app.STORAGE.list_artifact_segment_uris(artifact))
+        state.next_segment_index = max(state.next_segment_index, segment_count)
+        state.contents[artifact_type] = bytearray(
+            b"".join([segment async for segment in app.ARTIFACT_MANAGER.iter_artifact_content(artifact)])
+        )
+    else:
+        artifact = await app.ARTIFACT_MANAGER.create_segmented_log_artifact(
+            organization_id=organization_id,
+            step_id=step_id,
+            task_id=task_id,
+            workflow_run_id=workflow_run_id,
+            workflow_run_block_id=workflow_run_block_id,
+            log_entity_type=log_entity_type,
+            log_entity_id=log_entity_id,
+            artifact_type=artifact_type,
+        )
+    state.artifacts[artifact_type] = artifact
+    return artifact
+
+
+async def _flush_later(state: LogSegmentState, delay: float, flush: Callable[[], Awaitable[None]]) -> None:
+    await asyncio.sleep(delay)
+    state.flush_task = None
+    await flush()
+
+
+def _schedule_flush(state: LogSegmentState, flush: Callable[[], Awaitable[None]]) -> None:
+    if state.flush_task is not None:
+        return
+    delay = settings.LOG_ARTIFACT_FLUSH_INTERVAL_SECONDS - (time.monotonic() - state.last_flushed_at)
+    state.flush_task = asyncio.create_task(_flush_later(state, max(delay, 0), flush))
+
+
 async def _save_log_artifacts(
     *,
-    log: list[dict],
     log_entity_type: LogEntityType,
     log_entity_id: str,
-    organization_id: str | None = None,
+    final: bool = False,
     step_id: str | None = None,
     task_id: str | None = None,
     workflow_run_id: str | None = None,
     workflow_run_block_id: str | None = None,
 ) -> None:
+    organization_id: str | None = None
     try:
         if not settings.ENABLE_LOG_ARTIFACTS:
             return
+        context = skyvern_context.ensure_context()
+        organization_id = context.organization_id
         if not organization_id:
             LOG.error(
                 "Organization ID is required to save log artifacts",
@@ -125,66 +208,81 @@ async def _save_log_artifacts(
                 log_entity_id=log_entity_id,
             )
             return
-        log_json = json.dumps(log, cls=SkyvernJSONLogEncoder, indent=2)
 
-        log_artifact = await app.DATABASE.get_artifact_by_entity_id(
-            artifact_type=ArtifactType.SKYVERN_LOG_RAW,
-            step_id=step_id,
-            task_id=task_id,
-            workflow_run_id=workflow_run_id,
-            workflow_run_block_id=workflow_run_block_id,
-            organization_id=organization_id,
-        )
+        state, new_entries = _get_new_entries(context, log_entity_type, log_entity_id)
+        state.pending_entries.extend(new_entries)
+        if not state.pending_entries:
+            return
+        if not final:
+            if (
+                len(state.pending_entries) < settings.LOG_ARTIFACT_SEGMENT_MAX_ENTRIES
+                and time.monotonic() - state.last_flushed_at < settings.LOG_ARTIFACT_FLUSH_INTERVAL_SECONDS
+            ):
+                _schedule_flush(
+                    state,
+                    lambda: _save_log_artifacts(
+                        log_entity_type=log_entity_type,
+                        log_entity_id=log_entity_id,
+                        step_id=step_id,
+                        task_id=task_id,
+                        workflow_run_id=workflow_run_id,
+                        workflow_run_block_id=workflow_run_block_id,
+                    ),
+                )
+                return
 
-        if log_artifact:
-            await app.ARTIFACT_MANAGER.update_artifact_data(
-                artifact_id=log_artifact.artifact_id,
-                organization_id=organization_id,
-                data=log_json.encode(),
-                primary_key=primary_key_from_log_entity_type(log_entity_type),
-            )
-        else:
-            await app.ARTIFACT_MANAGER.create_log_artifact(
+        if state.flush_task is not None:
+            state.flush_task.cancel()
+            state.flush_task = None
+        async with state.lock:
+            entries = state.pending_entries
+            state.pending_entries = []
+            state.last_flushed_at = time.monotonic()
+            if not entries:
+                return
+            raw_segment, formatted_segment = encode_log_segment(entries)
+
+            raw_artifact = await _get_or_create_log_artifact(
+                state,
+                artifact_type=ArtifactType.SKYVERN_LOG_RAW,
+                log_entity_type=log_entity_type,
+                log_entity_id=log_entity_id,
                 organization_id=organization_id,
                 step_id=step_id,
                 task_id=task_id,
                 workflow_run_id=workflow_run_id,
                 workflow_run_block_id=workflow_run_block_id,
+            )
+            formatted_artifact = await _get_or_create_log_artifact(
+                state,
+                artifact_type=ArtifactType.SKYVERN_LOG,
                 log_entity_type=log_entity_type,
                 log_entity_id=log_entity_id,
-                artifact_type=ArtifactType.SKYVERN_LOG_RAW,
-                data=log_json.encode(),
-            )
-
-        formatted_log = SkyvernLogEncoder.encode(log)
-
-        formatted_log_artifact = await app.DATABASE.get_artifact_by_entity_id(
-            artifact_type=ArtifactType.SKYVERN_LOG,
-            step_id=step_id,
-            task_id=task_id,
-            workflow_run_id=workflow_run_id,
-            workflow_run_block_id=workflow_run_block_id,
-            organization_id=organization_id,
-        )
-
-        if formatted_log_artifact:
-            await app.ARTIFACT_MANAGER.update_artifact_data(
-                artifact_id=formatted_log_artifact.artifact_id,
-                organization_id=organization_id,
-                data=formatted_log.encode(),
-                primary_key=primary_key_from_log_entity_type(log_entity_type),
-            )
-        else:
-            await app.ARTIFACT_MANAGER.create_log_artifact(
                 organization_id=organization_id,
                 step_id=step_id,
                 task_id=task_id,
                 workflow_run_id=workflow_run_id,
                 workflow_run_block_id=workflow_run_block_id,
-                log_entity_type=log_entity_type,
-                log_entity_id=log_entity_id,
-                artifact_type=ArtifactType.SKYVERN_LOG,
-                data=formatted_log.encode(),
+            )
+            segment_index = state.next_segment_index
+            state.next_segment_index += 1
+
+        compression = resolve_compression(settings.LOG_ARTIFACT_COMPRESSION)
+        for artifact, segment in ((raw_artifact, raw_segment), (formatted_artifact, formatted_segment)):
+            await app.ARTIFACT_MANAGER.append_artifact_segment(
+                artifact=artifact,
+                segment_index=segment_index,
+                data=compress(segment, compression),
+                aio_task_primary_key=log_entity_id,
+            )
+            # the uri holds the whole log, for the readers of the artifact as a single object (signed urls, share links)
+            content = state.contents.setdefault(artifact.artifact_type, bytearray())
+            content.extend(segment)
+            state.content_uploads[artifact.artifact_type] = await app.ARTIFACT_MANAGER.store_artifact_data(
+                artifact,
+                bytes(content),
+                aio_task_primary_key=log_entity_id,
+                after=state.content_uploads.get(artifact.artifact_type),
             )
     except Exception:
         LOG.error(
@@ -31,6 +31,10 @@ from skyvern.constants import SKYVERN_DIR
 
 LOG = structlog.get_logger()
 
+# Templates render this marker (`{{ prompt_cache_breakpoint }}`) between their static instructions and the per-call
+# content. The LLM messages builder splits the prompt on it so providers can cache the static prefix.
+PROMPT_CACHE_BREAKPOINT = "<|skyvern_prompt_cache_breakpoint|>"
+
 
 class PromptEngine:
     """
@@ -58,6 +62,7 @@ class PromptEngine:
             self.model = self.get_closest_match(self.model, model_names)
 
             self.env = Environment(loader=FileSystemLoader(models_dir))
+            self.env.globals["prompt_cache_breakpoint"] = PROMPT_CACHE_BREAKPOINT
         except Exception:
             LOG.error("Error initializing PromptEngine.", model=model, exc_info=True)
             raise
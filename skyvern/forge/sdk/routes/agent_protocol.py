@@ -6,7 +6,7 @@ from typing import Annotated, Any
 import structlog
 import yaml
 from fastapi import BackgroundTasks, Depends, Header, HTTPException, Path, Query, Request, Response, UploadFile, status
-from fastapi.responses import ORJSONResponse
+from fastapi.responses import FileResponse, ORJSONResponse, StreamingResponse
 
 from skyvern import analytics
 from skyvern._version import __version__
@@ -94,6 +94,7 @@ from skyvern.schemas.runs import (
 from skyvern.schemas.workflows import WorkflowRequest
 from skyvern.services import block_service, run_service, task_v1_service, task_v2_service, workflow_service
 from skyvern.webeye.actions.actions import Action
+from skyvern.webeye.actions.journal import ActionJournal
 
 LOG = structlog.get_logger()
 
@@ -785,6 +786,51 @@ async def get_artifact(
     return artifact
 
 
+ARTIFACT_CONTENT_MEDIA_TYPES: dict[ArtifactType, str] = {
+    ArtifactType.SKYVERN_LOG: "text/plain; charset=utf-8",
+    ArtifactType.SKYVERN_LOG_RAW: "application/x-ndjson",
+    ArtifactType.RECORDING: "video/webm",
+    ArtifactType.LLM_PROMPT: "text/plain; charset=utf-8",
+    ArtifactType.LLM_REQUEST: "application/json",
+    ArtifactType.VISIBLE_ELEMENTS_ID_CSS_MAP: "application/json",
+    ArtifactType.VISIBLE_ELEMENTS_ID_FRAME_MAP: "application/json",
+    ArtifactType.VISIBLE_ELEMENTS_TREE: "application/json",
+    ArtifactType.VISIBLE_ELEMENTS_TREE_TRIMMED: "application/json",
+    ArtifactType.VISIBLE_ELEMENTS_TREE_IN_PROMPT: "text/plain; charset=utf-8",
+    ArtifactType.HASHED_HREF_MAP: "application/json",
+    ArtifactType.HTML_SCRAPE: "text/html; charset=utf-8",
+    ArtifactType.HTML_ACTION: "text/html; charset=utf-8",
+    ArtifactType.SCREENSHOT_LLM: "image/png",
+    ArtifactType.SCREENSHOT_ACTION: "image/png",
+}
+
+
+@legacy_base_router.get("/artifacts/{artifact_id}/content", tags=["Artifacts"])
+@legacy_base_router.get("/artifacts/{artifact_id}/content/", include_in_schema=False)
+async def get_artifact_content(
+    artifact_id: str,
+    current_org: Organization = Depends(org_auth_service.get_current_org),
+) -> Response:
+    """
+    Stream the content of an artifact. Segmented artifacts (e.g. log artifacts) are stitched lazily.
+    """
+    artifact = await app.DATABASE.get_artifact_by_id(
+        artifact_id=artifact_id,
+        organization_id=current_org.organization_id,
+    )
+    if not artifact:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Artifact not found {artifact_id}",
+        )
+    media_type = ARTIFACT_CONTENT_MEDIA_TYPES.get(artifact.artifact_type, "application/octet-stream")
+    # plain files on local storage are sent by the server straight from disk (sendfile where supported)
+    file_path = await app.STORAGE.get_artifact_file_path(artifact)
+    if file_path:
+        return FileResponse(file_path, media_type=media_type)
+    return StreamingResponse(app.ARTIFACT_MANAGER.iter_artifact_content(artifact), media_type=media_type)
+
+
 @base_router.get(
     "/runs/{run_id}/artifacts",
     tags=["Artifacts"],
@@ -1400,6 +1446,9 @@ async def get_actions(
     current_org: Organization = Depends(org_auth_service.get_current_org),
 ) -> list[Action]:
     analytics.capture("skyvern-oss-agent-task-actions-get")
+    # the actions of the running step, when the task runs in this process. The actions pending in another worker
+    # aren't visible until its step is updated, see ActionJournal
+    await ActionJournal.flush_task(task_id)
     actions = await app.DATABASE.get_task_actions(task_id, organization_id=current_org.organization_id)
     return actions
 
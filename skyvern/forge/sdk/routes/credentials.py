@@ -23,6 +23,7 @@ from skyvern.forge.sdk.schemas.organizations import Organization
 from skyvern.forge.sdk.schemas.totp_codes import TOTPCode, TOTPCodeCreate
 from skyvern.forge.sdk.services import org_auth_service
 from skyvern.forge.sdk.services.credential import create_credential as create_credential_service
+from skyvern.forge.sdk.services.totp_code_waiters import TOTP_CODE_WAITERS
 
 LOG = structlog.get_logger()
 
@@ -78,7 +79,7 @@ async def send_totp_code(
             content=data.content,
         )
         raise HTTPException(status_code=400, detail="Failed to parse totp code")
-    return await app.DATABASE.create_totp_code(
+    totp_code = await app.DATABASE.create_totp_code(
         organization_id=curr_org.organization_id,
         totp_identifier=data.totp_identifier,
         content=data.content,
@@ -89,6 +90,9 @@ async def send_totp_code(
         source=data.source,
         expired_at=data.expired_at,
     )
+    # the waiters of the other workers are notified by the database
+    TOTP_CODE_WAITERS.notify(curr_org.organization_id, data.totp_identifier)
+    return totp_code
 
 
 @legacy_base_router.post("/credentials")
@@ -0,0 +1,98 @@
+import asyncio
+import json
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Iterator
+
+import psycopg
+import structlog
+from sqlalchemy.engine import make_url
+
+from skyvern.config import settings
+
+LOG = structlog.get_logger()
+
+# the postgres channel the new totp codes are announced on, so the waiters of every worker are woken up
+TOTP_CODE_CHANNEL = "skyvern_totp_codes"
+LISTENER_RECONNECT_DELAY_SECS = 5
+
+
+def build_totp_code_notification(organization_id: str, totp_identifier: str) -> str:
+    return json.dumps({"organization_id": organization_id, "totp_identifier": totp_identifier})
+
+
+class TOTPCodeWaiters:
+    """
+    Registry of the tasks waiting for a TOTP code, keyed by organization and totp identifier. The waiters are woken up
+    as soon as a code is sent for their key, by the send totp code route of this worker or, through the postgres
+    LISTEN/NOTIFY channel, of any other worker. A woken waiter looks the code up in the database, the source of truth.
+    """
+
+    def __init__(self) -> None:
+        self._waiters: defaultdict[tuple[str, str], set[asyncio.Event]] = defaultdict(set)
+        self._listener_task: asyncio.Task | None = None
+
+    @contextmanager
+    def subscribe(self, organization_id: str, totp_identifier: str) -> Iterator[asyncio.Event]:
+        """
+        The event is set whenever a code is sent for the key. Clear it before looking the code up, so a code sent
+        during the lookup isn't missed.
+        """
+        self._ensure_listener()
+        key = (organization_id, totp_identifier)
+        event = asyncio.Event()
+        self._waiters[key].add(event)
+        try:
+            yield event
+        finally:
+            self._waiters[key].discard(event)
+            if not self._waiters[key]:
+                del self._waiters[key]
+
+    @staticmethod
+    async def wait(event: asyncio.Event, timeout: float) -> bool:
+        """
+        Wait until the event is set or the timeout. Returns whether the event was set.
+        """
+        try:
+            async with asyncio.timeout(timeout):
+                await event.wait()
+        except TimeoutError:
+            return False
+        return True
+
+    def notify(self, organization_id: str, totp_identifier: str) -> None:
+        for event in self._waiters.get((organization_id, totp_identifier), ()):
+            event.set()
+
+    def _ensure_listener(self) -> None:
+        if not settings.TOTP_CODE_NOTIFICATIONS_ENABLED or "postgresql+psycopg" not in settings.DATABASE_STRING:
+            return
+        if self._listener_task is None or self._listener_task.done():
+            self._listener_task = asyncio.create_task(self._listen())
+
+    async def _listen(self) -> None:
+        conninfo = make_url(settings.DATABASE_STRING).set(drivername="postgresql").render_as_string(hide_password=False)
+        while True:
+            try:
+                async with await psycopg.AsyncConnection.connect(conninfo, autocommit=True) as connection:
+                    await connection.execute(f"LISTEN {TOTP_CODE_CHANNEL}")
+                    LOG.info("Listening to the totp code notifications")
+                    async for notification in connection.notifies():
+                        self._on_notification(notification.payload)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                # the waiters still look the codes up every VERIFICATION_CODE_POLLING_INTERVAL_SECS meanwhile
+                LOG.warning("The totp code notification listener failed, reconnecting", exc_info=True)
+            await asyncio.sleep(LISTENER_RECONNECT_DELAY_SECS)
+
+    def _on_notification(self, payload: str) -> None:
+        try:
+            notification = json.loads(payload)
+            self.notify(notification["organization_id"], notification["totp_identifier"])
+        except Exception:
+            LOG.warning("Invalid totp code notification", payload=payload, exc_info=True)
+
+
+TOTP_CODE_WAITERS = TOTPCodeWaiters()
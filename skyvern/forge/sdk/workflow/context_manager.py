@@ -9,9 +9,7 @@ from skyvern.exceptions import (
     CredentialParameterNotFoundError,
     WorkflowRunContextNotInitialized,
 )
-from skyvern.forge import app
 from skyvern.forge.sdk.api.aws import AsyncAWSClient
-from skyvern.forge.sdk.schemas.credentials import CredentialType
 from skyvern.forge.sdk.schemas.organizations import Organization
 from skyvern.forge.sdk.schemas.tasks import TaskStatus
 from skyvern.forge.sdk.workflow.exceptions import OutputParameterKeyCollisionError
@@ -26,6 +24,7 @@ from skyvern.forge.sdk.workflow.models.parameter import (
     WorkflowParameter,
     WorkflowParameterType,
 )
+from skyvern.forge.sdk.workflow.secret_resolver import ResolvedCredential, SecretResolver
 
 if TYPE_CHECKING:
     from skyvern.forge.sdk.workflow.models.workflow import WorkflowRunParameter
@@ -48,7 +47,9 @@ class WorkflowRunContext:
         secret_parameters: list[AWSSecretParameter | CredentialParameter],
     ) -> Self:
         # key is label name
-        workflow_run_context = cls(aws_client=aws_client)
+        workflow_run_context = cls(aws_client=aws_client, organization_id=organization.organization_id)
+        # resolve all the secrets concurrently before registering the parameters one by one
+        workflow_run_context.prefetch_secrets(workflow_parameter_tuples, secret_parameters)
         for parameter, run_parameter in workflow_parameter_tuples:
             if parameter.workflow_parameter_type == WorkflowParameterType.CREDENTIAL_ID:
                 await workflow_run_context.register_secret_workflow_parameter_value(
@@ -84,12 +85,44 @@ class WorkflowRunContext:
 
         return workflow_run_context
 
-    def __init__(self, aws_client: AsyncAWSClient) -> None:
+    def __init__(self, aws_client: AsyncAWSClient, organization_id: str | None = None) -> None:
         self.blocks_metadata: dict[str, BlockMetadata] = {}
         self.parameters: dict[str, PARAMETER_TYPE] = {}
         self.values: dict[str, Any] = {}
         self.secrets: dict[str, Any] = {}
         self._aws_client = aws_client
+        self._secret_resolver = SecretResolver(aws_client, organization_id) if organization_id else None
+
+    def _get_secret_resolver(self, organization: Organization) -> SecretResolver:
+        if self._secret_resolver is None or self._secret_resolver.organization_id != organization.organization_id:
+            self._secret_resolver = SecretResolver(self._aws_client, organization.organization_id)
+        return self._secret_resolver
+
+    def prefetch_secrets(
+        self,
+        workflow_parameter_tuples: list[tuple[WorkflowParameter, "WorkflowRunParameter"]],
+        secret_parameters: list[AWSSecretParameter | CredentialParameter],
+    ) -> None:
+        """
+        Start fetching every secret the workflow run needs. The register_* methods await the running fetches.
+        """
+        if self._secret_resolver is None:
+            return
+        run_parameter_values: dict[str, Any] = {}
+        for parameter, run_parameter in workflow_parameter_tuples:
+            run_parameter_values[parameter.key] = run_parameter.value
+            if parameter.workflow_parameter_type == WorkflowParameterType.CREDENTIAL_ID and isinstance(
+                run_parameter.value, str
+            ):
+                self._secret_resolver.prefetch_credential(run_parameter.value)
+
+        for secret_parameter in secret_parameters:
+            if isinstance(secret_parameter, AWSSecretParameter):
+                self._secret_resolver.prefetch_aws_secret(secret_parameter.aws_key)
+            elif isinstance(secret_parameter, CredentialParameter) and secret_parameter.credential_id:
+                credential_id = run_parameter_values.get(secret_parameter.credential_id, secret_parameter.credential_id)
+                if isinstance(credential_id, str):
+                    self._secret_resolver.prefetch_credential(credential_id)
 
     def get_parameter(self, key: str) -> Parameter:
         return self.parameters[key]
@@ -183,54 +216,9 @@ class WorkflowRunContext:
 
         LOG.info(f"Fetching credential parameter value for credential: {credential_id}")
 
-        # Handle regular credentials from the database
         try:
-            db_credential = await app.DATABASE.get_credential(
-                credential_id, organization_id=organization.organization_id
-            )
-            if db_credential is None:
-                raise CredentialParameterNotFoundError(credential_id)
-
-            self.parameters[parameter.key] = parameter
-            self.values[parameter.key] = {}
-            if db_credential.credential_type == CredentialType.PASSWORD:
-                secret = await app.DATABASE.get_password_secret(db_credential.credential_id)
-                if not secret:
-                    raise CredentialParameterNotFoundError(credential_id)
-                # username
-                sid_u = f"{self.generate_random_secret_id()}_username"
-                self.secrets[sid_u] = secret.username
-                self.values[parameter.key]["username"] = sid_u
-                # password
-                sid_p = f"{self.generate_random_secret_id()}_password"
-                self.secrets[sid_p] = secret.password
-                self.values[parameter.key]["password"] = sid_p
-                # totp
-                if secret.totp:
-                    totp_secret_id = f"{self.generate_random_secret_id()}_totp"
-                    self.secrets[totp_secret_id] = TOTP_LABEL
-                    totp_secret_value = self.totp_secret_value_key(totp_secret_id)
-                    self.secrets[totp_secret_value] = secret.totp
-                    self.values[parameter.key]["totp"] = totp_secret_id
-            elif db_credential.credential_type == CredentialType.CREDIT_CARD:
-                cc = await app.DATABASE.get_credit_card_secret(db_credential.credential_id)
-                if not cc:
-                    raise CredentialParameterNotFoundError(credential_id)
-                # map fields
-                for key in [
-                    "card_number",
-                    "card_cvv",
-                    "card_exp_month",
-                    "card_exp_year",
-                    "card_brand",
-                    "card_holder_name",
-                ]:
-                    val = getattr(cc, key)
-                    sid = f"{self.generate_random_secret_id()}_{key}"
-                    self.secrets[sid] = val
-                    self.values[parameter.key][key] = sid
-            else:
-                raise CredentialParameterNotFoundError(credential_id)
+            resolved_credential = await self._get_secret_resolver(organization).get_credential(credential_id)
+            self._register_resolved_credential(parameter, resolved_credential)
         except Exception as e:
             LOG.error(f"Failed to get credential from database: {credential_id}. Error: {e}")
             raise e
@@ -253,46 +241,26 @@ class WorkflowRunContext:
             LOG.error(f"Credential ID not found for credential: {parameter.credential_id}")
             raise CredentialParameterNotFoundError(parameter.credential_id)
 
-        db_credential = await app.DATABASE.get_credential(credential_id, organization_id=organization.organization_id)
-        if db_credential is None:
-            raise CredentialParameterNotFoundError(credential_id)
+        resolved_credential = await self._get_secret_resolver(organization).get_credential(credential_id)
+        self._register_resolved_credential(parameter, resolved_credential)
 
+    def _register_resolved_credential(
+        self, parameter: WorkflowParameter | CredentialParameter, resolved_credential: ResolvedCredential
+    ) -> None:
         self.parameters[parameter.key] = parameter
         self.values[parameter.key] = {}
-        if db_credential.credential_type == CredentialType.PASSWORD:
-            secret = await app.DATABASE.get_password_secret(db_credential.credential_id)
-            if not secret:
-                raise CredentialParameterNotFoundError(credential_id)
-            sid_u = f"{self.generate_random_secret_id()}_username"
-            self.secrets[sid_u] = secret.username
-            self.values[parameter.key]["username"] = sid_u
-            sid_p = f"{self.generate_random_secret_id()}_password"
-            self.secrets[sid_p] = secret.password
-            self.values[parameter.key]["password"] = sid_p
-            if secret.totp:
+        for key, val in resolved_credential.values.items():
+            if key == "totp":
+                if not val:
+                    continue
                 totp_secret_id = f"{self.generate_random_secret_id()}_totp"
                 self.secrets[totp_secret_id] = TOTP_LABEL
-                totp_secret_value = self.totp_secret_value_key(totp_secret_id)
-                self.secrets[totp_secret_value] = secret.totp
+                self.secrets[self.totp_secret_value_key(totp_secret_id)] = val
                 self.values[parameter.key]["totp"] = totp_secret_id
-        elif db_credential.credential_type == CredentialType.CREDIT_CARD:
-            cc = await app.DATABASE.get_credit_card_secret(db_credential.credential_id)
-            if not cc:
-                raise CredentialParameterNotFoundError(credential_id)
-            for key in [
-                "card_number",
-                "card_cvv",
-                "card_exp_month",
-                "card_exp_year",
-                "card_brand",
-                "card_holder_name",
-            ]:
-                val = getattr(cc, key)
-                sid = f"{self.generate_random_secret_id()}_{key}"
-                self.secrets[sid] = val
-                self.values[parameter.key][key] = sid
-        else:
-            raise CredentialParameterNotFoundError(credential_id)
+                continue
+            sid = f"{self.generate_random_secret_id()}_{key}"
+            self.secrets[sid] = val
+            self.values[parameter.key][key] = sid
 
     async def register_aws_secret_parameter_value(
         self,
@@ -301,7 +269,10 @@ class WorkflowRunContext:
         # If the parameter is an AWS secret, fetch the secret value and store it in the secrets dict
         # The value of the parameter will be the random secret id with format `secret_<uuid>`.
         # We'll replace the random secret id with the actual secret value when we need to use it.
-        secret_value = await self._aws_client.get_secret(parameter.aws_key)
+        if self._secret_resolver:
+            secret_value = await self._secret_resolver.get_aws_secret(parameter.aws_key)
+        else:
+            secret_value = await self._aws_client.get_secret(parameter.aws_key)
         if secret_value is not None:
             random_secret_id = self.generate_random_secret_id()
             self.secrets[random_secret_id] = secret_value
@@ -0,0 +1,154 @@
+import asyncio
+import json
+import weakref
+from enum import StrEnum
+from typing import Any, Awaitable, Callable
+
+import structlog
+from cachetools import TTLCache
+from pydantic import BaseModel
+
+from skyvern.config import settings
+from skyvern.exceptions import CredentialParameterNotFoundError
+from skyvern.forge import app
+from skyvern.forge.sdk.api.aws import AsyncAWSClient
+from skyvern.forge.sdk.schemas.credentials import CredentialType
+from skyvern.forge.sdk.utils.crypto import decrypt_str, encrypt_str
+
+LOG = structlog.get_logger()
+
+CREDIT_CARD_SECRET_FIELDS = [
+    "card_number",
+    "card_cvv",
+    "card_exp_month",
+    "card_exp_year",
+    "card_brand",
+    "card_holder_name",
+]
+
+
+class SecretProvider(StrEnum):
+    AWS_SECRETS_MANAGER = "aws_secrets_manager"
+    CREDENTIAL_DB = "credential_db"
+
+
+class ResolvedCredential(BaseModel):
+    credential_type: CredentialType
+    values: dict[str, str | None]
+
+
+class EncryptedSecretCache:
+    """
+    Short lived, per organization cache of resolved secrets. Values are only kept encrypted in memory.
+    """
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self.enabled = ttl > 0
+        self._cache: TTLCache[tuple[str, SecretProvider, str], str] = TTLCache(maxsize=maxsize, ttl=max(ttl, 1))
+
+    def get(self, organization_id: str, provider: SecretProvider, key: str) -> Any | None:
+        if not self.enabled:
+            return None
+        token = self._cache.get((organization_id, provider, key))
+        if token is None:
+            return None
+        return json.loads(decrypt_str(token))
+
+    def set(self, organization_id: str, provider: SecretProvider, key: str, value: Any) -> None:
+        if not self.enabled or value is None:
+            return
+        try:
+            self._cache[(organization_id, provider, key)] = encrypt_str(json.dumps(value))
+        except RuntimeError:
+            # SECRET_KEY isn't configured, secrets are not cached
+            self.enabled = False
+
+
+class SecretResolver:
+    """
+    Resolves the secrets of a workflow run. Secrets are prefetched concurrently, with a concurrency limit per provider,
+    and the registration of the parameters awaits the already running fetches.
+    """
+
+    cache = EncryptedSecretCache(maxsize=settings.SECRET_CACHE_MAX_SIZE, ttl=settings.SECRET_CACHE_TTL_SECONDS)
+    # the concurrency limits are shared by the resolvers of an event loop, a semaphore can't be used across loops
+    _semaphores: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict[SecretProvider, asyncio.Semaphore]] = (
+        weakref.WeakKeyDictionary()
+    )
+
+    def __init__(self, aws_client: AsyncAWSClient, organization_id: str) -> None:
+        self._aws_client = aws_client
+        self.organization_id = organization_id
+        self._tasks: dict[tuple[SecretProvider, str], asyncio.Task[Any]] = {}
+
+    @classmethod
+    def _get_semaphore(cls, provider: SecretProvider) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        loop_semaphores = cls._semaphores.get(loop)
+        if loop_semaphores is None:
+            loop_semaphores = cls._semaphores[loop] = {}
+        if provider not in loop_semaphores:
+            limits = {
+                SecretProvider.AWS_SECRETS_MANAGER: settings.AWS_SECRETS_MANAGER_CONCURRENCY,
+                SecretProvider.CREDENTIAL_DB: settings.CREDENTIAL_DB_CONCURRENCY,
+            }
+            loop_semaphores[provider] = asyncio.Semaphore(limits[provider])
+        return loop_semaphores[provider]
+
+    def prefetch_aws_secret(self, aws_key: str) -> None:
+        self._schedule(SecretProvider.AWS_SECRETS_MANAGER, aws_key, self._fetch_aws_secret)
+
+    def prefetch_credential(self, credential_id: str) -> None:
+        self._schedule(SecretProvider.CREDENTIAL_DB, credential_id, self._fetch_credential)
+
+    async def get_aws_secret(self, aws_key: str) -> str | None:
+        return await self._schedule(SecretProvider.AWS_SECRETS_MANAGER, aws_key, self._fetch_aws_secret)
+
+    async def get_credential(self, credential_id: str) -> ResolvedCredential:
+        values = await self._schedule(SecretProvider.CREDENTIAL_DB, credential_id, self._fetch_credential)
+        return ResolvedCredential.model_validate(values)
+
+    def _schedule(
+        self, provider: SecretProvider, key: str, fetch: Callable[[str], Awaitable[Any]]
+    ) -> asyncio.Task[Any]:
+        task = self._tasks.get((provider, key))
+        if task is None:
+            task = asyncio.create_task(self._resolve(provider, key, fetch))
+            # failures are re-raised when the parameter that needs the secret is registered. Mark them as retrieved
+            # so a run failing on an earlier parameter doesn't log the unused prefetches as never retrieved
+            task.add_done_callback(lambda t: t.cancelled() or t.exception())
+            self._tasks[(provider, key)] = task
+        return task
+
+    async def _resolve(self, provider: SecretProvider, key: str, fetch: Callable[[str], Awaitable[Any]]) -> Any:
+        cached_value = self.cache.get(self.organization_id, provider, key)
+        if cached_value is not None:
+            return cached_value
+        async with self._get_semaphore(provider):
+            value = await fetch(key)
+        self.cache.set(self.organization_id, provider, key, value)
+        return value
+
+    async def _fetch_aws_secret(self, aws_key: str) -> str | None:
+        return await self._aws_client.get_secret(aws_key)
+
+    async def _fetch_credential(self, credential_id: str) -> dict[str, Any]:
+        db_credential = await app.DATABASE.get_credential(credential_id, organization_id=self.organization_id)
+        if db_credential is None:
+            raise CredentialParameterNotFoundError(credential_id)
+
+        values: dict[str, str | None] = {}
+        if db_credential.credential_type == CredentialType.PASSWORD:
+            secret = await app.DATABASE.get_password_secret(db_credential.credential_id)
+            if not secret:
+                raise CredentialParameterNotFoundError(credential_id)
+            values = {"username": secret.username, "password": secret.password, "totp": secret.totp}
+        elif db_credential.credential_type == CredentialType.CREDIT_CARD:
+            cc = await app.DATABASE.get_credit_card_secret(db_credential.credential_id)
+            if not cc:
+                raise CredentialParameterNotFoundError(credential_id)
+            values = {key: getattr(cc, key) for key in CREDIT_CARD_SECRET_FIELDS}
+        else:
+            raise CredentialParameterNotFoundError(credential_id)
+
+        return ResolvedCredential(credential_type=db_credential.credential_type, values=values).model_dump(mode="json")
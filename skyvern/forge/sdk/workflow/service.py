@@ -1333,12 +1333,19 @@ class WorkflowService:
             if tasks:
                 await self.persist_debug_artifacts(browser_state, tasks[-1], workflow, workflow_run)
             if workflow.persist_browser_session and browser_state.browser_artifacts.browser_session_dir:
-                await app.STORAGE.store_browser_session(
-                    workflow_run.organization_id,
-                    workflow.workflow_permanent_id,
-                    browser_state.browser_artifacts.browser_session_dir,
-                )
-                LOG.info("Persisted browser session for workflow run", workflow_run_id=workflow_run.workflow_run_id)
+                try:
+                    await app.STORAGE.store_browser_session(
+                        workflow_run.organization_id,
+                        workflow.workflow_permanent_id,
+                        browser_state.browser_artifacts.browser_session_dir,
+                    )
+                    LOG.info("Persisted browser session for workflow run", workflow_run_id=workflow_run.workflow_run_id)
+                except Exception:
+                    LOG.warning(
+                        "Failed to persist browser session for workflow run",
+                        workflow_run_id=workflow_run.workflow_run_id,
+                        exc_info=True,
+                    )
 
         await app.ARTIFACT_MANAGER.wait_for_upload_aiotasks(all_workflow_task_ids)
 
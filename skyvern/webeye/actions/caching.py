@@ -7,6 +7,7 @@ from skyvern.forge.sdk.models import Step
 from skyvern.forge.sdk.schemas.tasks import Task
 from skyvern.webeye.actions.action_types import ActionType
 from skyvern.webeye.actions.actions import Action, ActionStatus, SelectOption
+from skyvern.webeye.actions.journal import ActionJournal
 from skyvern.webeye.scraper.scraper import ScrapedPage
 
 LOG = structlog.get_logger()
@@ -31,6 +32,7 @@ async def _retrieve_action_plan(task: Task, step: Step, scraped_page: ScrapedPag
 
     # Get the existing actions for this task from the database. Then find the actions that are already executed by looking at
     # the source_action_id field for this task's actions.
+    await ActionJournal.flush_task(task.task_id)
     previous_actions = await app.DATABASE.get_previous_actions_for_task(task_id=task.task_id)
 
     executed_cached_actions = []
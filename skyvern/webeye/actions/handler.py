@@ -69,6 +69,7 @@ from skyvern.forge.sdk.core.skyvern_context import ensure_context
 from skyvern.forge.sdk.db.enums import OrganizationAuthTokenType
 from skyvern.forge.sdk.models import Step
 from skyvern.forge.sdk.schemas.tasks import Task
+from skyvern.forge.sdk.services.totp_code_waiters import TOTP_CODE_WAITERS
 TOTP_LABEL = "TOTP"
 from skyvern.forge.sdk.trace import TraceManager
 from skyvern.services.task_v1_service import is_cua_task
@@ -89,6 +90,7 @@ from skyvern.webeye.actions.actions import (
     UploadFileAction,
     WebAction,
 )
+from skyvern.webeye.actions.journal import ActionJournal
 from skyvern.webeye.actions.responses import ActionAbort, ActionFailure, ActionResult, ActionSuccess
 from skyvern.webeye.scraper.scraper import (
     CleanupElementTreeFunc,
@@ -351,6 +353,10 @@ class ActionHandler:
     ) -> list[ActionResult]:
         LOG.info("Handling action", action=action)
         actions_result: list[ActionResult] = []
+        context = skyvern_context.current()
+        if context:
+            context.browser_evaluations = 0
+            context.saved_browser_round_trips = 0
         try:
             if action.action_type in ActionHandler._handled_action_types:
                 invalid_web_action_check = check_for_invalid_web_action(action, page, scraped_page, task, step)
@@ -437,7 +443,14 @@ class ActionHandler:
                 if not actions_result:
                     LOG.warning("Action failed to execute, setting status to failed", action=action)
                 action.status = ActionStatus.failed
-            await app.DATABASE.create_action(action=action)
+            await ActionJournal.record(action)
+            if context:
+                LOG.debug(
+                    "Browser round trips of the action",
+                    action_type=action.action_type,
+                    browser_evaluations=context.browser_evaluations,
+                    saved_browser_round_trips=context.saved_browser_round_trips,
+                )
 
         return actions_result
 
@@ -968,7 +981,7 @@ async def handle_input_text_action(
                 action=action,
             )
 
-        await asyncio.sleep(5)
+        await incremental_scraped.wait_for_dom_increment(timeout_seconds=5)
 
         incremental_element = await incremental_scraped.get_incremental_element_tree(
             clean_and_remove_element_tree_factory(
@@ -1507,8 +1520,8 @@ async def handle_select_option_action(
         await skyvern_element.scroll_into_view()
 
         await skyvern_element.click(page=page, dom=dom, timeout=timeout)
-        # wait 5s for options to load
-        await asyncio.sleep(5)
+        # wait up to 5s for options to load
+        await incremental_scraped.wait_for_dom_increment(timeout_seconds=5)
 
         incremental_element = await incremental_scraped.get_incremental_element_tree(
             clean_and_remove_element_tree_factory(
@@ -1524,9 +1537,10 @@ async def handle_select_option_action(
                 step_id=step.step_id,
             )
             await skyvern_element.scroll_into_view()
+            start_count = await incremental_scraped.get_incremental_elements_num()
             await skyvern_element.press_key("ArrowDown")
-            # wait 5s for options to load
-            await asyncio.sleep(5)
+            # wait up to 5s for options to load
+            await incremental_scraped.wait_for_dom_increment(timeout_seconds=5, start_count=start_count)
             incremental_element = await incremental_scraped.get_incremental_element_tree(
                 clean_and_remove_element_tree_factory(
                     task=task, step=step, check_filter_funcs=[check_existed_but_not_option_element_in_dom_factory(dom)]
@@ -1622,7 +1636,7 @@ async def handle_select_option_action(
             )
             await skyvern_element.scroll_into_view()
             await skyvern_element.press_key("ArrowDown")
-        await asyncio.sleep(5)
+        await incremental_scraped.wait_for_dom_increment(timeout_seconds=5)
         is_open = True
 
         result = await select_from_dropdown_by_value(
@@ -2141,9 +2155,7 @@ async def chain_click(
                 element=str(blocking_element),
                 locator=locator,
             )
-            if await blocking_element.is_parent_of(
-                await skyvern_element.get_element_handler()
-            ) or await blocking_element.is_sibling_of(await skyvern_element.get_element_handler()):
+            if await blocking_element.is_parent_or_sibling_of(await skyvern_element.get_element_handler()):
                 LOG.info(
                     "Chain click: element is blocked by other elements, going to click on the blocking element",
                     task_id=task.task_id,
@@ -2202,7 +2214,7 @@ async def choose_auto_completion_dropdown(
     try:
         await skyvern_element.press_fill(text)
         # wait for new elemnts to load
-        await asyncio.sleep(5)
+        await incremental_scraped.wait_for_dom_increment(timeout_seconds=5)
         incremental_element = await incremental_scraped.get_incremental_element_tree(
             clean_and_remove_element_tree_factory(
                 task=task, step=step, check_filter_funcs=[check_existed_but_not_option_element_in_dom_factory(dom)]
@@ -2584,6 +2596,8 @@ async def sequentially_select_from_dropdown(
 
     check_filter_funcs: list[CheckFilterOutElementIDFunc] = [check_existed_but_not_option_element_in_dom_factory(dom)]
     for i in range(max_depth):
+        # the options of the next level are the elements observed after this selection
+        start_count = await incremental_scraped.get_incremental_elements_num()
         single_select_result = await select_from_dropdown(
             context=input_or_select_context,
             page=page,
@@ -2622,8 +2636,8 @@ async def sequentially_select_from_dropdown(
             task_id=task.task_id,
             step_id=step.step_id,
         )
-        # wait for 3s to load new options
-        await asyncio.sleep(3)
+        # wait up to 3s to load new options
+        await incremental_scraped.wait_for_dom_increment(timeout_seconds=3, start_count=start_count)
 
         check_filter_funcs.append(
             check_disappeared_element_id_in_incremental_factory(incremental_scraped=incremental_scraped)
@@ -3338,7 +3352,7 @@ async def scroll_down_to_load_all_options(
         await page.mouse.wheel(0, -1e-5)
         await page.mouse.wheel(0, 1e-5)
         # wait for while to load new options
-        await asyncio.sleep(10)
+        await incremental_scraped.wait_for_dom_increment(timeout_seconds=10, start_count=previous_num)
 
         current_num = await incremental_scraped.get_incremental_elements_num()
         LOG.info(
@@ -3363,7 +3377,7 @@ async def scroll_down_to_load_all_options(
         await page.mouse.wheel(0, -scroll_pace)
     else:
         await skyvern_frame.scroll_to_element_top(dropdown_menu_element_handle)
-    await asyncio.sleep(5)
+    await incremental_scraped.wait_for_dom_increment(timeout_seconds=5, wait_for_first_mutation=False)
 
 
 async def normal_select(
@@ -3505,11 +3519,8 @@ def get_anchor_to_click(scraped_page: ScrapedPage, element_id: str) -> str | Non
     Get the anchor tag under the label to click
     """
     LOG.info("Getting anchor tag to click", element_id=element_id)
-    for ele in scraped_page.elements:
-        if "id" in ele and ele["id"] == element_id:
-            for child in ele["children"]:
-                if "tagName" in child and child["tagName"] == "a":
-                    return scraped_page.id_to_css_dict[child["id"]]
+    for child in scraped_page.element_index.get_children_by_tag(element_id, "a"):
+        return scraped_page.id_to_css_dict[child["id"]]
     return None
 
 
@@ -3518,13 +3529,8 @@ def get_select_id_in_label_children(scraped_page: ScrapedPage, element_id: str)
     search <select> in the children of <label>
     """
     LOG.info("Searching select in the label children", element_id=element_id)
-    element = scraped_page.id_to_element_dict.get(element_id, None)
-    if element is None:
-        return None
-
-    for child in element.get("children", []):
-        if child.get("tagName", "") == "select":
-            return child.get("id", None)
+    for child in scraped_page.element_index.get_children_by_tag(element_id, "select"):
+        return child.get("id", None)
 
     return None
 
@@ -3534,12 +3540,8 @@ def get_checkbox_id_in_label_children(scraped_page: ScrapedPage, element_id: str
     search checkbox/radio in the children of <label>
     """
     LOG.info("Searching checkbox/radio in the label children", element_id=element_id)
-    element = scraped_page.id_to_element_dict.get(element_id, None)
-    if element is None:
-        return None
-
-    for child in element.get("children", []):
-        if child.get("tagName", "") == "input" and child.get("attributes", {}).get("type") in ["checkbox", "radio"]:
+    for child in scraped_page.element_index.get_children_by_tag(element_id, "input"):
+        if child.get("attributes", {}).get("type") in ["checkbox", "radio"]:
             return child.get("id", None)
 
     return None
@@ -3654,6 +3656,17 @@ async def poll_verification_code(
     if not org_token:
         LOG.error("Failed to get organization token when trying to get verification code")
         return None
+    if not totp_verification_url and totp_identifier:
+        return await _wait_for_verification_code_from_db(
+            task_id,
+            organization_id,
+            totp_identifier,
+            start_datetime,
+            timeout_datetime,
+            workflow_id=workflow_permanent_id,
+            workflow_run_id=workflow_run_id,
+        )
+
     # wait for 40 seconds to let the verification code comes in before polling
     await asyncio.sleep(settings.VERIFICATION_CODE_INITIAL_WAIT_TIME_SECS)
     while True:
@@ -3675,19 +3688,61 @@ async def poll_verification_code(
                 org_token.token,
                 workflow_run_id=workflow_run_id,
             )
-        elif totp_identifier:
+        if verification_code:
+            LOG.info("Got verification code", verification_code=verification_code)
+            return verification_code
+
+        await asyncio.sleep(settings.VERIFICATION_CODE_POLLING_INTERVAL_SECS)
+
+
+async def _wait_for_verification_code_from_db(
+    task_id: str,
+    organization_id: str,
+    totp_identifier: str,
+    start_datetime: datetime,
+    timeout_datetime: datetime,
+    workflow_id: str | None = None,
+    workflow_run_id: str | None = None,
+) -> str:
+    """
+    Look the code up as soon as it's sent instead of polling: the sent codes wake the waiters up, the lookup interval
+    is only a fallback for the missed notifications.
+
+    A code sent before the wait may be an unexpired one of a previous login, so only the codes sent since
+    start_datetime are accepted during VERIFICATION_CODE_INITIAL_WAIT_TIME_SECS. After that, the latest valid code is
+    accepted, as it was after the initial wait.
+    """
+    newer_codes_only_until = start_datetime + timedelta(seconds=settings.VERIFICATION_CODE_INITIAL_WAIT_TIME_SECS)
+    with TOTP_CODE_WAITERS.subscribe(organization_id, totp_identifier) as code_sent:
+        while True:
+            code_sent.clear()
             verification_code = await _get_verification_code_from_db(
                 task_id,
                 organization_id,
                 totp_identifier,
-                workflow_id=workflow_permanent_id,
+                workflow_id=workflow_id,
                 workflow_run_id=workflow_run_id,
-            )
-        if verification_code:
-            LOG.info("Got verification code", verification_code=verification_code)
-            return verification_code
-
-        await asyncio.sleep(10)
+                created_after=start_datetime if datetime.utcnow() < newer_codes_only_until else None,
+            )
+            if verification_code:
+                LOG.info("Got verification code", verification_code=verification_code)
+                return verification_code
+
+            now = datetime.utcnow()
+            remaining_seconds = (timeout_datetime - now).total_seconds()
+            if remaining_seconds <= 0:
+                LOG.warning("Waiting for verification code timed out")
+                raise NoTOTPVerificationCodeFound(
+                    task_id=task_id,
+                    workflow_run_id=workflow_run_id,
+                    workflow_id=workflow_id,
+                    totp_identifier=totp_identifier,
+                )
+            wait_seconds = min(remaining_seconds, settings.VERIFICATION_CODE_POLLING_INTERVAL_SECS)
+            if now < newer_codes_only_until:
+                # look the older codes up as soon as they're accepted
+                wait_seconds = min(wait_seconds, (newer_codes_only_until - now).total_seconds())
+            await TOTP_CODE_WAITERS.wait(code_sent, timeout=wait_seconds)
 
 
 async def _get_verification_code_from_url(
@@ -3723,19 +3778,17 @@ async def _get_verification_code_from_db(
     totp_identifier: str,
     workflow_id: str | None = None,
     workflow_run_id: str | None = None,
+    created_after: datetime | None = None,
 ) -> str | None:
-    totp_codes = await app.DATABASE.get_totp_codes(organization_id=organization_id, totp_identifier=totp_identifier)
-    for totp_code in totp_codes:
-        if totp_code.workflow_run_id and workflow_run_id and totp_code.workflow_run_id != workflow_run_id:
-            continue
-        if totp_code.workflow_id and workflow_id and totp_code.workflow_id != workflow_id:
-            continue
-        if totp_code.task_id and totp_code.task_id != task_id:
-            continue
-        if totp_code.expired_at and totp_code.expired_at < datetime.utcnow():
-            continue
-        return totp_code.code
-    return None
+    totp_code = await app.DATABASE.get_valid_totp_code(
+        organization_id=organization_id,
+        totp_identifier=totp_identifier,
+        task_id=task_id,
+        workflow_id=workflow_id,
+        workflow_run_id=workflow_run_id,
+        created_after=created_after,
+    )
+    return totp_code.code if totp_code else None
 
 
 class AbstractActionForContextParse(BaseModel):
@@ -0,0 +1,153 @@
+import json
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable
+
+import structlog
+from cachetools import LRUCache
+
+from skyvern.config import settings
+from skyvern.forge.sdk.models import Step
+from skyvern.forge.sdk.schemas.tasks import Task
+from skyvern.utils.token_counter import count_tokens
+
+LOG = structlog.get_logger()
+
+ACTION_HISTORY_FIELDS = {"action_type", "element_id", "status", "reasoning", "option", "download"}
+ACTION_RESULT_HISTORY_FIELDS = {"success", "exception_type", "exception_message"}
+# tasks whose action history is kept in memory
+ACTION_HISTORY_MAX_TASKS = 1000
+# loads the last steps of a task from the DB, called with task_id, organization_id and limit
+LastStepsLoader = Callable[..., Awaitable[list[Step]]]
+
+
+def compact_step_actions(step: Step) -> list[dict[str, Any]]:
+    """
+    The actions of the step with their results, trimmed to the fields the prompts use. Actions without any result
+    aren't part of the history.
+    """
+    if not step.output or not step.output.actions_and_results:
+        return []
+    return [
+        {
+            "action": action.model_dump(exclude_none=True, include=ACTION_HISTORY_FIELDS),
+            "results": [
+                result.model_dump(exclude_none=True, include=ACTION_RESULT_HISTORY_FIELDS) for result in results
+            ],
+        }
+        for action, results in step.output.actions_and_results
+        if len(results) > 0
+    ]
+
+
+def fit_action_history(action_history: list[dict[str, Any]], token_budget: int | None) -> list[dict[str, Any]]:
+    """
+    Summarize the history until it fits in the token budget: the reasoning of the oldest actions is dropped first, then
+    the oldest actions themselves. The last action is always kept.
+    """
+    if not token_budget or not action_history:
+        return action_history
+    entry_tokens = [count_tokens(json.dumps(entry)) for entry in action_history]
+    total_tokens = sum(entry_tokens)
+    if total_tokens <= token_budget:
+        return action_history
+
+    summarized_history = list(action_history)
+    for idx, entry in enumerate(summarized_history[:-1]):
+        if total_tokens <= token_budget:
+            return summarized_history
+        if "reasoning" not in entry["action"]:
+            continue
+        summarized_entry = {**entry, "action": {k: v for k, v in entry["action"].items() if k != "reasoning"}}
+        summarized_tokens = count_tokens(json.dumps(summarized_entry))
+        total_tokens -= entry_tokens[idx] - summarized_tokens
+        entry_tokens[idx] = summarized_tokens
+        summarized_history[idx] = summarized_entry
+
+    dropped_count = 0
+    while total_tokens > token_budget and dropped_count < len(summarized_history) - 1:
+        total_tokens -= entry_tokens[dropped_count]
+        dropped_count += 1
+    if dropped_count:
+        LOG.debug("Dropped the oldest actions from the action history", dropped_count=dropped_count)
+    return summarized_history[dropped_count:]
+
+
+@dataclass
+class _StepHistory:
+    order: int
+    retry_index: int
+    actions: list[dict[str, Any]]
+
+    @classmethod
+    def from_step(cls, step: Step) -> "_StepHistory":
+        return cls(order=step.order, retry_index=step.retry_index, actions=compact_step_actions(step))
+
+    def precedes(self, step: Step) -> bool:
+        if step.retry_index > 0:
+            return self.order == step.order and self.retry_index == step.retry_index - 1
+        return self.order == step.order - 1
+
+
+class ActionHistoryStore:
+    """
+    Compact action history of the last steps of each task, so the prompts don't reload and re-dump every step of the
+    task. The history of a task is loaded once from its last steps in the DB, the source of truth, and each step
+    update then only replaces the entry of that step.
+
+    The history is reloaded when it doesn't have the step before the one being prompted, i.e. the previous step ran
+    or was updated in another process, and it's forgotten when the task is cleaned up.
+    """
+
+    # task id -> step id -> compact actions of the step, in step order
+    _histories: LRUCache[str, OrderedDict[str, _StepHistory]] = LRUCache(maxsize=ACTION_HISTORY_MAX_TASKS)
+
+    @classmethod
+    def record_step(cls, step: Step) -> None:
+        history = cls._histories.get(step.task_id)
+        if history is None:
+            # not loaded yet, the step will be part of the snapshot loaded from the DB
+            return
+        history[step.step_id] = _StepHistory.from_step(step)
+        while len(history) > settings.PROMPT_ACTION_HISTORY_WINDOW + 1:
+            history.popitem(last=False)
+
+    @classmethod
+    def forget_task(cls, task_id: str) -> None:
+        cls._histories.pop(task_id, None)
+
+    @classmethod
+    async def get_action_history(
+        cls,
+        task: Task,
+        step: Step,
+        load_last_steps: LastStepsLoader,
+        include_step: bool = False,
+    ) -> list[dict[str, Any]]:
+        """
+        The compact actions of the PROMPT_ACTION_HISTORY_WINDOW steps before step, and of step itself when
+        include_step is set, summarized to fit in PROMPT_ACTION_HISTORY_TOKEN_BUDGET. load_last_steps loads the history
+        of the task the first time, e.g. app.DATABASE.get_last_task_steps.
+        """
+        history = cls._histories.get(task.task_id)
+        is_first_step = step.order == 0 and step.retry_index == 0
+        if history is not None and not is_first_step:
+            if not any(step_history.precedes(step) for step_history in history.values()):
+                LOG.debug("The action history misses the previous step, reloading it", task_id=task.task_id)
+                history = None
+        if history is None:
+            # the window steps and the step itself
+            steps = await load_last_steps(
+                task_id=task.task_id,
+                organization_id=task.organization_id,
+                limit=settings.PROMPT_ACTION_HISTORY_WINDOW + 1,
+            )
+            history = OrderedDict((task_step.step_id, _StepHistory.from_step(task_step)) for task_step in steps)
+            cls._histories[task.task_id] = history
+
+        window_step_ids = [step_id for step_id in history if step_id != step.step_id]
+        window_step_ids = window_step_ids[len(window_step_ids) - settings.PROMPT_ACTION_HISTORY_WINDOW :]
+        action_history = [entry for step_id in window_step_ids for entry in history[step_id].actions]
+        if include_step:
+            action_history.extend(compact_step_actions(step))
+        return fit_action_history(action_history, settings.PROMPT_ACTION_HISTORY_TOKEN_BUDGET)
@@ -0,0 +1,54 @@
+from datetime import datetime
+
+import structlog
+
+from skyvern.config import settings
+from skyvern.forge import app
+from skyvern.webeye.actions.actions import Action
+
+LOG = structlog.get_logger()
+
+
+class ActionJournal:
+    """
+    Buffer of the actions of the running steps, so handling an action doesn't wait for its INSERT. The actions of a
+    step are written in a single multi-row INSERT when the step is updated, or as soon as
+    ACTION_JOURNAL_MAX_PENDING_ACTIONS of them are pending. The readers of the actions of a running task flush it
+    first.
+
+    The buffer is per process: a reader only sees the pending actions of the tasks running in its own process. When the
+    tasks run in other workers than the API, the task actions route returns the actions of the previous steps until the
+    running step is updated, unless ACTION_JOURNAL_MAX_PENDING_ACTIONS is 1 so every action is written when recorded.
+    """
+
+    # step id -> actions waiting to be written, in execution order
+    _pending: dict[str, list[Action]] = {}
+
+    @classmethod
+    async def record(cls, action: Action) -> None:
+        # a snapshot, the action can still be changed after it's recorded. created_at is the time of the action, not
+        # of the write, the actions are ordered by it
+        pending_action = action.model_copy(deep=True, update={"created_at": action.created_at or datetime.utcnow()})
+        pending_actions = cls._pending.setdefault(action.step_id or "", [])
+        pending_actions.append(pending_action)
+        if len(pending_actions) >= settings.ACTION_JOURNAL_MAX_PENDING_ACTIONS:
+            await cls.flush(action.step_id or "")
+
+    @classmethod
+    async def flush(cls, step_id: str) -> None:
+        pending_actions = cls._pending.pop(step_id, None)
+        if not pending_actions:
+            return
+        try:
+            await app.DATABASE.create_actions(pending_actions)
+        except Exception:
+            # kept for the next flush, ahead of the actions recorded meanwhile
+            cls._pending[step_id] = pending_actions + cls._pending.get(step_id, [])
+            raise
+        LOG.debug("Flushed the pending actions", step_id=step_id, action_count=len(pending_actions))
+
+    @classmethod
+    async def flush_task(cls, task_id: str) -> None:
+        step_ids = [step_id for step_id, actions in cls._pending.items() if actions and actions[0].task_id == task_id]
+        for step_id in step_ids:
+            await cls.flush(step_id)
@@ -287,6 +287,9 @@ class VideoArtifact(BaseModel):
     video_path: str | None = None
     video_artifact_id: str | None = None
     video_data: bytes = b""
+    # bytes of the recording already uploaded as segments of the artifact, and the number of segments
+    uploaded_size: int = 0
+    segment_count: int = 0
 
 
 class BrowserArtifacts(BaseModel):
@@ -754,7 +757,7 @@ class BrowserState:
 
         target_lenght = index + 1
         self.browser_artifacts.video_artifacts.extend(
-            [VideoArtifact()] * (target_lenght - len(self.browser_artifacts.video_artifacts))
+            [VideoArtifact() for _ in range(target_lenght - len(self.browser_artifacts.video_artifacts))]
         )
         try:
             async with asyncio.timeout(settings.BROWSER_ACTION_TIMEOUT_MS / 1000):
@@ -1,6 +1,8 @@
 from __future__ import annotations
 
+import asyncio
 import os
+from dataclasses import dataclass
 
 import structlog
 from playwright.async_api import async_playwright
@@ -15,6 +17,29 @@ from skyvern.webeye.browser_factory import BrowserContextFactory, BrowserState,
 LOG = structlog.get_logger()
 
 
+@dataclass
+class VideoSegment:
+    video_artifact: VideoArtifact
+    video_artifact_id: str
+    segment_index: int
+    data: bytes
+    # the whole recording, up to the end of the segment
+    recording: bytes
+
+    def mark_uploaded(self) -> None:
+        """
+        Advance the recording past this segment. Called once the segment is uploaded, so a failed upload is retried
+        with the next segment.
+        """
+        self.video_artifact.uploaded_size += len(self.data)
+        self.video_artifact.segment_count += 1
+
+
+def _read_file(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+
 class BrowserManager:
     instance = None
     pages: dict[str, BrowserState] = dict()
@@ -238,11 +263,40 @@ class BrowserManager:
         for i, video_artifact in enumerate(browser_state.browser_artifacts.video_artifacts):
             path = video_artifact.video_path
             if path and os.path.exists(path=path):
-                with open(path, "rb") as f:
-                    browser_state.browser_artifacts.video_artifacts[i].video_data = f.read()
+                browser_state.browser_artifacts.video_artifacts[i].video_data = await asyncio.to_thread(
+                    _read_file, path
+                )
 
         return browser_state.browser_artifacts.video_artifacts
 
+    async def get_new_video_segments(self, browser_state: BrowserState, min_size: int = 0) -> list[VideoSegment]:
+        """
+        The bytes appended to each recording since its last uploaded segment, for the recordings that grew by at least
+        min_size. The recordings aren't advanced until `VideoSegment.mark_uploaded` is called.
+        """
+        video_segments: list[VideoSegment] = []
+        for video_artifact in browser_state.browser_artifacts.video_artifacts:
+            path = video_artifact.video_path
+            if not video_artifact.video_artifact_id or not path:
+                continue
+            try:
+                size = await asyncio.to_thread(os.path.getsize, path)
+            except OSError:
+                continue
+            if size - video_artifact.uploaded_size < max(min_size, 1):
+                continue
+            recording = await asyncio.to_thread(_read_file, path)
+            video_segments.append(
+                VideoSegment(
+                    video_artifact=video_artifact,
+                    video_artifact_id=video_artifact.video_artifact_id,
+                    segment_index=video_artifact.segment_count,
+                    data=recording[video_artifact.uploaded_size :],
+                    recording=recording,
+                )
+            )
+        return video_segments
+
     async def get_har_data(
         self,
         browser_state: BrowserState,
@@ -1105,6 +1105,83 @@ function checkDisabledFromStyle(element) {
   return false;
 }
 
+// the dynamic state the action handlers check before interacting, read in a single evaluation
+function getElementState(element) {
+  const rect = element.getBoundingClientRect();
+  return {
+    tagName: element.tagName.toLowerCase(),
+    visible: isElementVisible(element) && !isHidden(element),
+    disabledAttr: element.getAttribute("disabled"),
+    ariaDisabledAttr: element.getAttribute("aria-disabled"),
+    styleDisabled: checkDisabledFromStyle(element),
+    rect: { x: rect.x, y: rect.y, width: rect.width, height: rect.height },
+  };
+}
+
+// the helpers runElementQueries can batch, called with the element and the args of the query
+const elementQueryHelpers = {
+  visible: (element) => isElementVisible(element) && !isHidden(element),
+  // same definition as the playwright locator.is_visible(): a non-empty box and not visibility:hidden
+  boxVisible: (element) => {
+    const rect = element.getBoundingClientRect();
+    return (
+      rect.width > 0 &&
+      rect.height > 0 &&
+      getElementComputedStyle(element)?.visibility !== "hidden"
+    );
+  },
+  disabledFromStyle: (element) => checkDisabledFromStyle(element),
+  scrollable: (element) => isScrollable(element),
+  blockingElementId: (element) => getBlockElementUniqueID(element),
+  parentOf: (element, child) => isParent(element, child),
+  siblingOf: (element, other) => isSibling(element, other),
+  state: (element) => getElementState(element),
+};
+
+// the open shadow roots under root, the nested ones included
+function getOpenShadowRoots(root = document) {
+  const shadowRoots = [];
+  const walker = document.createTreeWalker(root, NodeFilter.SHOW_ELEMENT);
+  for (let node = walker.nextNode(); node; node = walker.nextNode()) {
+    if (node.shadowRoot) {
+      shadowRoots.push(node.shadowRoot, ...getOpenShadowRoots(node.shadowRoot));
+    }
+  }
+  return shadowRoots;
+}
+
+// queries: [target, helper, args] where the target is an element or a css selector matching exactly one element
+function runElementQueries(queries) {
+  // collected once for all the selectors of the batch
+  let shadowRoots = null;
+  return queries.map(([target, helper, args]) => {
+    let element = target;
+    if (typeof target === "string") {
+      // like the playwright css locators, the selector pierces the open shadow roots
+      shadowRoots = shadowRoots ?? getOpenShadowRoots();
+      const elements = [document, ...shadowRoots].flatMap((root) =>
+        Array.from(root.querySelectorAll(target)),
+      );
+      if (elements.length !== 1) {
+        return { found: false, value: null, error: null };
+      }
+      element = elements[0];
+    }
+    if (!element || !element.isConnected) {
+      return { found: false, value: null, error: null };
+    }
+    try {
+      return {
+        found: true,
+        value: elementQueryHelpers[helper](element, ...args),
+        error: null,
+      };
+    } catch (e) {
+      return { found: true, value: null, error: String(e) };
+    }
+  });
+}
+
 // element should always be the parent of stopped_element
 function getElementContext(element, stopped_element) {
   // dfs to collect the non unique_id context
@@ -1451,6 +1528,95 @@ async function buildTreeFromBody(
   return await buildElementTree(document.body, frame);
 }
 
+// the compact wire format of the element tree, decoded by decode_element_tree in element_store.py:
+// - strings: every key and string value, once
+// - elements: one record per element, [fields, attributeFields]. The fields are flat [key, value, ...] arrays in the
+//   order of the object: a key index k is followed by the index of a string value, a key index -k-1 by a raw value
+// - parents: the index of the parent of each element, -1 for the roots of the tree and -2 for the elements out of it
+const ELEMENT_TREE_WIRE_VERSION = 1;
+
+// the placeholder keys keep their position with a null value, they're filled by the decoder
+const encodeFields = (obj, stringIndex, placeholderKeys) => {
+  const fields = [];
+  for (const [key, value] of Object.entries(obj)) {
+    if (placeholderKeys.has(key)) {
+      fields.push(-stringIndex(key) - 1, null);
+    } else if (typeof value === "string") {
+      fields.push(stringIndex(key), stringIndex(value));
+    } else {
+      fields.push(-stringIndex(key) - 1, value === undefined ? null : value);
+    }
+  }
+  return fields;
+};
+
+const encodeElementTree = (elements, tree) => {
+  const strings = [];
+  const stringIndexes = new Map();
+  const stringIndex = (value) => {
+    let index = stringIndexes.get(value);
+    if (index === undefined) {
+      index = strings.length;
+      strings.push(value);
+      stringIndexes.set(value, index);
+    }
+    return index;
+  };
+
+  const elementIndexes = new Map(
+    elements.map((element, index) => [element, index]),
+  );
+  const parents = new Array(elements.length).fill(-2);
+  for (const root of tree) {
+    parents[elementIndexes.get(root)] = -1;
+  }
+  const elementPlaceholderKeys = new Set(["children", "attributes"]);
+  const noPlaceholderKeys = new Set();
+  const records = elements.map((element, index) => {
+    for (const child of element.children ?? []) {
+      const childIndex = elementIndexes.get(child);
+      if (childIndex !== undefined) {
+        parents[childIndex] = index;
+      }
+    }
+    return [
+      encodeFields(element, stringIndex, elementPlaceholderKeys),
+      encodeFields(element.attributes ?? {}, stringIndex, noPlaceholderKeys),
+    ];
+  });
+  return {
+    version: ELEMENT_TREE_WIRE_VERSION,
+    strings: strings,
+    elements: records,
+    parents: parents,
+  };
+};
+
+// build the element tree for the body and return it in the compact wire format, as a JSON string. The strings longer
+// than chunkSize are returned in chunks: the first one, and the number of the others to take with takeEncodedTreeChunk
+async function buildEncodedTreeFromBody(
+  frame = "main.frame",
+  frame_index = undefined,
+  chunkSize = 16 * 1024 * 1024,
+) {
+  const [elements, tree] = await buildTreeFromBody(frame, frame_index);
+  const payload = JSON.stringify(encodeElementTree(elements, tree));
+  window.globalEncodedTreeChunks = [];
+  for (let start = chunkSize; start < payload.length; start += chunkSize) {
+    window.globalEncodedTreeChunks.push(
+      payload.slice(start, start + chunkSize),
+    );
+  }
+  return [
+    payload.slice(0, chunkSize),
+    window.globalEncodedTreeChunks.length,
+  ];
+}
+
+function takeEncodedTreeChunk() {
+  return window.globalEncodedTreeChunks.shift();
+}
+
 async function buildElementTree(
   starter = document.body,
   frame,
@@ -2590,6 +2756,42 @@ async function stopGlobalIncrementalObserver() {
   window.globalDomDepthMap = new Map();
 }
 
+// Resolves with the number of incremental elements recorded after the first startCount ones:
+// - once some were recorded and none for quietMs (with waitForFirstMutation = false, none at all counts too),
+// - or after timeoutMs.
+// startCount is the number of incremental elements before the interaction the wait is for, so the elements recorded
+// between the interaction and the wait count as the first mutation, e.g. the options rendered synchronously by the
+// click that opened a dropdown.
+async function waitForIncrementalElements(
+  quietMs,
+  timeoutMs = 5000,
+  waitForFirstMutation = true,
+  startCount = 0,
+) {
+  const getCount = () =>
+    window.globalOneTimeIncrementElements
+      ? window.globalOneTimeIncrementElements.length
+      : 0;
+  const startTime = Date.now();
+  let lastCount = getCount();
+  let lastChangeTime = startTime;
+  while (Date.now() - startTime < timeoutMs) {
+    await asyncSleepFor(50);
+    const count = getCount();
+    if (count !== lastCount) {
+      lastCount = count;
+      lastChangeTime = Date.now();
+    }
+    if (
+      (count > startCount || !waitForFirstMutation) &&
+      Date.now() - lastChangeTime >= quietMs
+    ) {
+      break;
+    }
+  }
+  return Math.max(getCount() - startCount, 0);
+}
+
 async function getIncrementElements(wait_until_finished = true) {
   if (wait_until_finished) {
     while (
@@ -0,0 +1,74 @@
+from collections import defaultdict
+from typing import Iterable
+
+
+class ElementIndex:
+    """
+    Secondary indexes over the scraped elements, so the action handlers don't scan the elements and their children
+    again for every lookup. The elements are walked once, children included, and the indexes are read-only afterwards:
+    build a new index for a new scrape.
+    """
+
+    def __init__(self, elements: Iterable[dict]) -> None:
+        # element id -> id of the closest ancestor with an id
+        self.parent_ids: dict[str, str] = {}
+        # tag name -> ids of the elements with this tag
+        self.ids_by_tag: defaultdict[str, list[str]] = defaultdict(list)
+        # text -> ids of the elements with exactly this text
+        self.ids_by_text: defaultdict[str, list[str]] = defaultdict(list)
+        # element id -> tag name -> direct children with this tag
+        self.children_by_tag: dict[str, defaultdict[str, list[dict]]] = {}
+
+        seen_ids: set[str] = set()
+        stack: list[tuple[dict, str | None]] = [(element, None) for element in reversed(list(elements))]
+        while stack:
+            element, parent_id = stack.pop()
+            element_id = element.get("id")
+            if element_id:
+                if element_id in seen_ids:
+                    # the flat element lists have the children both at the top level and under their parent
+                    if parent_id:
+                        self.parent_ids.setdefault(element_id, parent_id)
+                    continue
+                seen_ids.add(element_id)
+                self._index_element(element, element_id, parent_id)
+            children = element.get("children", [])
+            stack.extend((child, element_id or parent_id) for child in reversed(children))
+
+    def _index_element(self, element: dict, element_id: str, parent_id: str | None) -> None:
+        if parent_id:
+            self.parent_ids[element_id] = parent_id
+        if tag_name := element.get("tagName"):
+            self.ids_by_tag[tag_name].append(element_id)
+        if text := element.get("text"):
+            self.ids_by_text[text].append(element_id)
+        children_by_tag: defaultdict[str, list[dict]] = defaultdict(list)
+        for child in element.get("children", []):
+            children_by_tag[child.get("tagName", "")].append(child)
+        self.children_by_tag[element_id] = children_by_tag
+
+    def get_children_by_tag(self, element_id: str, tag_name: str) -> list[dict]:
+        children_by_tag = self.children_by_tag.get(element_id)
+        if children_by_tag is None:
+            return []
+        return children_by_tag.get(tag_name, [])
+
+    def get_ancestor_ids(self, element_id: str) -> list[str]:
+        """
+        The ids of the ancestors of the element, the closest first.
+        """
+        ancestor_ids = []
+        while parent_id := self.parent_ids.get(element_id):
+            ancestor_ids.append(parent_id)
+            element_id = parent_id
+        return ancestor_ids
+
+    def get_ids_leading_to_text(self, text: str) -> set[str]:
+        """
+        The ids of the elements with exactly this text and of their ancestors: the subtrees without any of them
+        don't contain the text.
+        """
+        matched_ids = set(self.ids_by_text.get(text, []))
+        for element_id in list(matched_ids):
+            matched_ids.update(self.get_ancestor_ids(element_id))
+        return matched_ids
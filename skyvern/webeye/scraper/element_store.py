@@ -0,0 +1,78 @@
+import json
+import sys
+from typing import Any, Iterable
+
+# the version of the wire format of buildEncodedTreeFromBody in domUtils.js
+ELEMENT_TREE_WIRE_VERSION = 1
+
+# longer attribute values (urls, inline styles, long labels) are rarely repeated across elements
+INTERN_MAX_LENGTH = 64
+
+
+def _intern(value: Any) -> Any:
+    if type(value) is str and len(value) <= INTERN_MAX_LENGTH:
+        return sys.intern(value)
+    return value
+
+
+def compact_elements(elements: Iterable[dict]) -> None:
+    """
+    Shrink the scraped elements in place: the rects are dropped, nothing reads them once scraped and the element tree
+    cleanup drops them as well, and the tag names, frames, attribute names and short attribute values are interned, so
+    the copies of the element tree share the strings repeated on every element. Each element is compacted once, the
+    tree nodes are the same dicts as the elements.
+    """
+    seen: set[int] = set()
+    stack = list(elements)
+    while stack:
+        element = stack.pop()
+        if id(element) in seen:
+            continue
+        seen.add(id(element))
+
+        element.pop("rect", None)
+        for key in ("tagName", "frame"):
+            if key in element:
+                element[key] = _intern(element[key])
+        attributes = element.get("attributes")
+        if attributes:
+            element["attributes"] = {sys.intern(name): _intern(value) for name, value in attributes.items()}
+        stack.extend(element.get("children", []))
+
+
+def _decode_fields(fields: list, strings: list[str]) -> dict[str, Any]:
+    decoded: dict[str, Any] = {}
+    for idx in range(0, len(fields), 2):
+        key_index, value = fields[idx], fields[idx + 1]
+        if key_index >= 0:
+            decoded[strings[key_index]] = strings[value]
+        else:
+            decoded[strings[-key_index - 1]] = value
+    return decoded
+
+
+def decode_element_tree(payload: str) -> tuple[list[dict], list[dict]]:
+    """
+    Build the elements and the element tree from the compact wire format of buildEncodedTreeFromBody, as
+    buildTreeFromBody returns them: the children are the elements themselves, and the strings of the string table are
+    interned, so the elements share them.
+    """
+    encoded = json.loads(payload)
+    if encoded.get("version") != ELEMENT_TREE_WIRE_VERSION:
+        raise ValueError(f"Unsupported element tree wire format version: {encoded.get('version')}")
+    strings = [_intern(string) for string in encoded["strings"]]
+
+    elements: list[dict] = []
+    for fields, attribute_fields in encoded["elements"]:
+        element = _decode_fields(fields, strings)
+        element["attributes"] = _decode_fields(attribute_fields, strings)
+        element["children"] = []
+        elements.append(element)
+
+    element_tree: list[dict] = []
+    for element, parent in zip(elements, encoded["parents"]):
+        if parent >= 0:
+            elements[parent]["children"].append(element)
+        elif parent == -1:
+            element_tree.append(element)
+    return elements, element_tree
@@ -8,8 +8,8 @@ from typing import Any, Awaitable, Callable, Self
 
 import structlog
 from playwright._impl._errors import TimeoutError
-from playwright.async_api import ElementHandle, Frame, Locator, Page
-from pydantic import BaseModel, PrivateAttr
+from playwright.async_api import ElementHandle, Frame, FrameLocator, Locator, Page
+from pydantic import BaseModel, PrivateAttr, SkipValidation
 
 from skyvern.config import settings
 from skyvern.constants import DEFAULT_MAX_TOKENS, SKYVERN_DIR, SKYVERN_ID_ATTR
@@ -21,6 +21,8 @@ from skyvern.forge.sdk.trace import TraceManager
 from skyvern.utils.image_resizer import Resolution
 from skyvern.utils.token_counter import count_tokens
 from skyvern.webeye.browser_factory import BrowserState
+from skyvern.webeye.scraper.element_index import ElementIndex
+from skyvern.webeye.scraper.element_store import compact_elements
 from skyvern.webeye.utils.page import SkyvernFrame
 
 LOG = structlog.get_logger()
@@ -248,14 +250,16 @@ class ScrapedPage(BaseModel, ElementTreeBuilder):
     7. The extracted text from the page
     """
 
-    elements: list[dict]
-    id_to_element_dict: dict[str, dict] = {}
+    # not validated: the validation would copy every element, and the elements of id_to_element_dict would no longer
+    # be the ones of elements
+    elements: SkipValidation[list[dict]]
+    id_to_element_dict: SkipValidation[dict[str, dict]] = {}
     id_to_frame_dict: dict[str, str] = {}
     id_to_css_dict: dict[str, str]
     id_to_element_hash: dict[str, str]
     hash_to_element_ids: dict[str, list[str]]
-    element_tree: list[dict]
-    element_tree_trimmed: list[dict]
+    element_tree: SkipValidation[list[dict]]
+    element_tree_trimmed: SkipValidation[list[dict]]
     economy_element_tree: list[dict] | None = None
     last_used_element_tree: list[dict] | None = None
     screenshots: list[bytes]
@@ -266,6 +270,9 @@ class ScrapedPage(BaseModel, ElementTreeBuilder):
     _browser_state: BrowserState = PrivateAttr()
     _clean_up_func: CleanupElementTreeFunc = PrivateAttr()
     _scrape_exclude: ScrapeExcludeFunc | None = PrivateAttr(default=None)
+    _element_index: ElementIndex | None = PrivateAttr(default=None)
+    # frame id -> the resolved iframe locator, frame and iframe depth, see resolve_locator
+    _resolved_frames: dict[str, tuple[FrameLocator, Frame, int]] = PrivateAttr(default_factory=dict)
 
     def __init__(self, **data: Any) -> None:
         missing_attrs = [attr for attr in ["_browser_state", "_clean_up_func"] if attr not in data]
@@ -283,6 +290,20 @@ class ScrapedPage(BaseModel, ElementTreeBuilder):
         self._clean_up_func = clean_up_func
         self._scrape_exclude = scrape_exclude
 
+    @property
+    def element_index(self) -> ElementIndex:
+        """
+        The secondary indexes of the elements, built on first use. The scraped page isn't changed once built, a new
+        scrape has its own index.
+        """
+        if self._element_index is None:
+            self._element_index = ElementIndex(self.elements)
+        return self._element_index
+
+    @property
+    def resolved_frames(self) -> dict[str, tuple[FrameLocator, Frame, int]]:
+        return self._resolved_frames
+
     def support_economy_elements_tree(self) -> bool:
         return True
 
@@ -545,6 +566,8 @@ async def scrape_web_unsafe(
     await asyncio.sleep(3)
 
     elements, element_tree = await get_interactable_element_tree(page, scrape_exclude)
+    # before the copies of the tree, so they share the interned strings
+    compact_elements(elements)
     element_tree = await cleanup_element_tree(page, url, copy.deepcopy(element_tree))
     element_tree_trimmed = trim_element_tree(copy.deepcopy(element_tree))
 
@@ -777,6 +800,38 @@ class IncrementalScrapePage(ElementTreeBuilder):
             timeout_ms=SettingsManager.get_settings().BROWSER_SCRAPING_BUILDING_ELEMENT_TREE_TIMEOUT_MS,
         )
 
+    async def wait_for_dom_increment(
+        self,
+        timeout_seconds: float,
+        quiet_ms: int | None = None,
+        wait_for_first_mutation: bool = True,
+        start_count: int = 0,
+    ) -> int:
+        """
+        Wait for the incremental DOM mutations instead of sleeping for timeout_seconds: the wait ends once new elements
+        were observed and none for quiet_ms, or after timeout_seconds. Without wait_for_first_mutation, quiet_ms
+        without any mutation ends the wait too.
+        start_count is the number of incremental elements before the interaction the wait is for, by default the
+        elements observed since start_listen_dom_increment are new. The ones observed before the wait started count as
+        the first mutation.
+        Returns the number of new incremental elements.
+        """
+        if quiet_ms is None:
+            quiet_ms = SettingsManager.get_settings().DOM_INCREMENT_QUIET_MS
+        timeout_ms = timeout_seconds * 1000
+        js_script = "async ([quietMs, timeoutMs, waitForFirstMutation, startCount]) => await waitForIncrementalElements(quietMs, timeoutMs, waitForFirstMutation, startCount)"
+        try:
+            return await SkyvernFrame.evaluate(
+                frame=self.skyvern_frame.get_frame(),
+                expression=js_script,
+                arg=[quiet_ms, timeout_ms, wait_for_first_mutation, start_count],
+                timeout_ms=timeout_ms + SettingsManager.get_settings().BROWSER_ACTION_TIMEOUT_MS,
+            )
+        except Exception:
+            # e.g. the page navigated away, there's nothing left to wait for
+            LOG.info("Failed to wait for the DOM increment", exc_info=True)
+            return 0
+
     async def get_incremental_elements_num(self) -> int:
         # check if the DOM has navigated away or refreshed
         js_script = "() => window.globalOneTimeIncrementElements === undefined"
@@ -786,16 +841,22 @@ class IncrementalScrapePage(ElementTreeBuilder):
         js_script = "() => window.globalOneTimeIncrementElements.length"
         return await SkyvernFrame.evaluate(frame=self.skyvern_frame.get_frame(), expression=js_script)
 
-    async def __validate_element_by_value(self, value: str, element: dict) -> tuple[Locator | None, bool]:
+    async def __validate_element_by_value(
+        self, value: str, element: dict, candidate_ids: set[str] | None = None
+    ) -> tuple[Locator | None, bool]:
         """
         Locator: the locator of the matched element. None if no valid element to interact;
         bool: is_matched. True, found an intercatable alternative one; False, not found  any alternative;
 
         If is_matched is True, but Locator is None. It means the value is matched, but the current element is non-interactable
+
+        candidate_ids: the ids of the elements with the value as text and of their ancestors, the other subtrees are skipped
         """
 
         interactable = element.get("interactable", False)
         element_id = element.get("id", "")
+        if candidate_ids is not None and element_id and element_id not in candidate_ids:
+            return None, False
 
         parent_locator: Locator | None = None
         if element_id:
@@ -806,7 +867,7 @@ class IncrementalScrapePage(ElementTreeBuilder):
         # if the child element matched value but not interactable, try to interact with the parent node
         children = element.get("children", [])
         for child in children:
-            child_locator, is_match = await self.__validate_element_by_value(value, child)
+            child_locator, is_match = await self.__validate_element_by_value(value, child, candidate_ids)
             if is_match:
                 if child_locator:
                     return child_locator, True
@@ -831,8 +892,14 @@ class IncrementalScrapePage(ElementTreeBuilder):
         return parent_locator, True
 
     async def select_one_element_by_value(self, value: str) -> Locator | None:
+        # the element tree changes with every increment, so the index isn't kept
+        candidate_ids = ElementIndex(self.element_tree).get_ids_leading_to_text(value)
+        if not candidate_ids:
+            return None
         for element in self.element_tree:
-            locator, _ = await self.__validate_element_by_value(value=value, element=element)
+            locator, _ = await self.__validate_element_by_value(
+                value=value, element=element, candidate_ids=candidate_ids
+            )
             if locator:
                 return locator
         return None
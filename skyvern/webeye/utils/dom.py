@@ -27,13 +27,22 @@ from skyvern.exceptions import (
 )
 from skyvern.webeye.actions import handler_utils
 from skyvern.webeye.scraper.scraper import IncrementalScrapePage, ScrapedPage, json_to_html, trim_element
-from skyvern.webeye.utils.page import SkyvernFrame
+from skyvern.webeye.utils.page import ElementQuery, ElementQueryHelper, SkyvernFrame, record_saved_round_trips
 
 LOG = structlog.get_logger()
 COMMON_INPUT_TAGS = {"input", "textarea", "select"}
 
 
 async def resolve_locator(scrape_page: ScrapedPage, page: Page, frame: str, css: str) -> tuple[Locator, Page | Frame]:
+    # the iframes resolved for a previous element of the scrape, as long as the iframe wasn't replaced since
+    if (resolved_frame := scrape_page.resolved_frames.get(frame)) is not None:
+        frame_locator, content_frame, iframe_depth = resolved_frame
+        if content_frame.page is page and not content_frame.is_detached():
+            # each iframe level takes a query_selector and a content_frame round trip
+            record_saved_round_trips(2 * iframe_depth)
+            return frame_locator.locator(css), content_frame
+
+    frame_id = frame
     iframe_path: list[str] = []
 
     while frame != "main.frame":
@@ -49,6 +58,7 @@ async def resolve_locator(scrape_page: ScrapedPage, page: Page, frame: str, css:
 
         frame = parent_frame
 
+    iframe_depth = len(iframe_path)
     current_page: Page | FrameLocator = page
     current_frame: Page | Frame = page
 
@@ -66,6 +76,9 @@ async def resolve_locator(scrape_page: ScrapedPage, page: Page, frame: str, css:
 
         current_page = current_page.frame_locator(f"[{SKYVERN_ID_ATTR}='{child_frame}']")
 
+    if isinstance(current_page, FrameLocator) and isinstance(current_frame, Frame):
+        scrape_page.resolved_frames[frame_id] = (current_page, current_frame, iframe_depth)
+
     return current_page.locator(css), current_frame
 
 
@@ -86,6 +99,15 @@ class SkyvernOptionType(typing.TypedDict):
     text: str
 
 
+class SkyvernElementState(typing.TypedDict):
+    tagName: str
+    visible: bool
+    disabledAttr: str | None
+    ariaDisabledAttr: str | None
+    styleDisabled: bool
+    rect: dict[str, float]
+
+
 class SkyvernElement:
     """
     SkyvernElement is a python interface to interact with js elements built during the scarping.
@@ -132,6 +154,9 @@ class SkyvernElement:
         self._selectable = static_element.get("isSelectable", False)
         self._frame_id = static_element.get("frame", "")
         self._attributes = static_element.get("attributes", {})
+        self._skyvern_frame: SkyvernFrame | None = None
+        # the url of the frame when the skyvern js functions were injected
+        self._skyvern_frame_url: str | None = None
 
     def __repr__(self) -> str:
         return f"SkyvernElement({str(self.__static_element)})"
@@ -245,10 +270,21 @@ class SkyvernElement:
 
         mode: typing.Literal["auto", "dynamic"] = "dynamic" if dynamic else "auto"
         try:
-            disabled_attr = await self.get_attr("disabled", mode=mode)
-            aria_disabled_attr = await self.get_attr("aria-disabled", mode=mode)
-            skyvern_frame = await SkyvernFrame.create_instance(self.get_frame())
-            style_disabled = await skyvern_frame.get_disabled_from_style(await self.get_element_handler())
+            if state := await self.get_element_state():
+                disabled_attr = await self.get_attr("disabled", mode="static") if not dynamic else None
+                aria_disabled_attr = await self.get_attr("aria-disabled", mode="static") if not dynamic else None
+                # the dynamic attributes, the frame instance, the element handle and the style check
+                record_saved_round_trips(2 + (disabled_attr is None) + (aria_disabled_attr is None))
+                if disabled_attr is None:
+                    disabled_attr = state["disabledAttr"]
+                if aria_disabled_attr is None:
+                    aria_disabled_attr = state["ariaDisabledAttr"]
+                style_disabled = state["styleDisabled"]
+            else:
+                disabled_attr = await self.get_attr("disabled", mode=mode)
+                aria_disabled_attr = await self.get_attr("aria-disabled", mode=mode)
+                skyvern_frame = await self.get_skyvern_frame()
+                style_disabled = await skyvern_frame.get_disabled_from_style(await self.get_element_handler())
 
         except Exception:
             # FIXME: maybe it should be considered as "disabled" element if failed to get the attributes?
@@ -278,25 +314,43 @@ class SkyvernElement:
         return await self.get_selectable() or self.get_tag_name() in SELECTABLE_ELEMENT
 
     async def is_visible(self, must_visible_style: bool = True) -> bool:
+        if must_visible_style and (state := await self.get_element_state()):
+            # the count, the frame instance, the element handle and the visibility check
+            record_saved_round_trips(3)
+            return state["visible"]
         if not await self.get_locator().count():
             return False
         if not must_visible_style:
             return True
-        skyvern_frame = await SkyvernFrame.create_instance(self.get_frame())
+        skyvern_frame = await self.get_skyvern_frame()
         return await skyvern_frame.get_element_visible(await self.get_element_handler())
 
     async def is_parent_of(self, target: ElementHandle) -> bool:
-        skyvern_frame = await SkyvernFrame.create_instance(self.get_frame())
+        skyvern_frame = await self.get_skyvern_frame()
         return await skyvern_frame.is_parent(await self.get_element_handler(), target)
 
     async def is_child_of(self, target: ElementHandle) -> bool:
-        skyvern_frame = await SkyvernFrame.create_instance(self.get_frame())
+        skyvern_frame = await self.get_skyvern_frame()
         return await skyvern_frame.is_parent(target, await self.get_element_handler())
 
     async def is_sibling_of(self, target: ElementHandle) -> bool:
-        skyvern_frame = await SkyvernFrame.create_instance(self.get_frame())
+        skyvern_frame = await self.get_skyvern_frame()
         return await skyvern_frame.is_sibling(await self.get_element_handler(), target)
 
+    async def is_parent_or_sibling_of(self, target: ElementHandle) -> bool:
+        skyvern_frame = await self.get_skyvern_frame()
+        element_handle = await self.get_element_handler()
+        parent_result, sibling_result = await skyvern_frame.query_elements(
+            [
+                ElementQuery(target=element_handle, helper=ElementQueryHelper.PARENT_OF, args=[target]),
+                ElementQuery(target=element_handle, helper=ElementQueryHelper.SIBLING_OF, args=[target]),
+            ]
+        )
+        for result in (parent_result, sibling_result):
+            if result.error:
+                raise SkyvernException(f"Failed to compare the elements: {result.error}")
+        return bool(parent_result.value or sibling_result.value)
+
     async def has_hidden_attr(self) -> bool:
         hidden: str | None = await self.get_attr("hidden", mode="dynamic")
         aria_hidden: str | None = await self.get_attr("aria-hidden", mode="dynamic")
@@ -344,6 +398,37 @@ class SkyvernElement:
     def get_locator(self) -> Locator:
         return self.locator
 
+    async def get_skyvern_frame(self) -> SkyvernFrame:
+        # creating the instance injects the skyvern js functions into the frame, once per document is enough. A
+        # navigation replaces the document and its functions, they're injected again then
+        frame_url = self.get_frame().url
+        if self._skyvern_frame is None or self._skyvern_frame_url != frame_url:
+            self._skyvern_frame = await SkyvernFrame.create_instance(self.get_frame())
+            self._skyvern_frame_url = frame_url
+        else:
+            record_saved_round_trips(1)
+        return self._skyvern_frame
+
+    async def get_element_state(self) -> SkyvernElementState | None:
+        """
+        The visibility, disabled attributes and style, tag name and rect of the element in a single round trip,
+        instead of one per check. None when the locator doesn't match exactly one element or the skyvern js functions
+        aren't in the frame, the callers fall back to the separate checks then.
+        """
+        js_script = """(elements) => typeof getElementState !== "function"
+            ? false
+            : elements.length === 1 ? getElementState(elements[0]) : null"""
+        try:
+            state = await self.get_locator().evaluate_all(js_script)
+        except Exception:
+            LOG.debug("Failed to get the element state", element_id=self.get_id(), exc_info=True)
+            return None
+        if state is False:
+            # the document was replaced without changing the url (a reload), the functions are injected again
+            self._skyvern_frame = None
+            return None
+        return state
+
     async def get_element_handler(self, timeout: float = settings.BROWSER_ACTION_TIMEOUT_MS) -> ElementHandle:
         handler = await self.locator.element_handle(timeout=timeout)
         assert handler is not None
@@ -373,7 +458,7 @@ class SkyvernElement:
     async def find_blocking_element(
         self, dom: DomUtil, incremental_page: IncrementalScrapePage | None = None
     ) -> tuple[SkyvernElement | None, bool]:
-        skyvern_frame = await SkyvernFrame.create_instance(self.get_frame())
+        skyvern_frame = await self.get_skyvern_frame()
         blocking_element_id, blocked = await skyvern_frame.get_blocking_element_id(await self.get_element_handler())
         if not blocking_element_id:
             return None, blocked
@@ -718,7 +803,7 @@ class SkyvernElement:
         return
 
     async def click_in_javascript(self) -> None:
-        skyvern_frame = await SkyvernFrame.create_instance(self.get_frame())
+        skyvern_frame = await self.get_skyvern_frame()
         await skyvern_frame.click_element_in_javascript(await self.get_element_handler())
 
     async def coordinate_click(self, page: Page, timeout: float = settings.BROWSER_ACTION_TIMEOUT_MS) -> None:
@@ -835,7 +920,7 @@ class SkyvernElement:
         if self.get_tag_name() != InteractiveElement.SELECT:
             return None
 
-        frame = await SkyvernFrame.create_instance(self.get_frame())
+        frame = await self.get_skyvern_frame()
         options, selected_value = await frame.get_select_options(await self.get_element_handler())
         self.__static_element["options"] = options
         if "attributes" in self.__static_element:
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import asyncio
 import time
+from dataclasses import dataclass, field
 from enum import StrEnum
 from io import BytesIO
 from typing import Any
@@ -13,8 +14,10 @@ from playwright.async_api import ElementHandle, Frame, Page
 
 from skyvern.constants import PAGE_CONTENT_TIMEOUT, SKYVERN_DIR
 from skyvern.exceptions import FailedToTakeScreenshot
+from skyvern.forge.sdk.core import skyvern_context
 from skyvern.forge.sdk.settings_manager import SettingsManager
 from skyvern.forge.sdk.trace import TraceManager
+from skyvern.webeye.scraper.element_store import decode_element_tree
 
 LOG = structlog.get_logger()
 
@@ -35,6 +38,45 @@ def load_js_script() -> str:
 JS_FUNCTION_DEFS = load_js_script()
 
 
+def record_saved_round_trips(count: int) -> None:
+    """
+    Count the browser round trips saved by the cached frames and the batched element reads, they are reported per
+    action by the action handler.
+    """
+    context = skyvern_context.current()
+    if context and count > 0:
+        context.saved_browser_round_trips += count
+
+
+class ElementQueryHelper(StrEnum):
+    # the keys of elementQueryHelpers in domUtils.js
+    VISIBLE = "visible"
+    BOX_VISIBLE = "boxVisible"
+    DISABLED_FROM_STYLE = "disabledFromStyle"
+    SCROLLABLE = "scrollable"
+    BLOCKING_ELEMENT_ID = "blockingElementId"
+    PARENT_OF = "parentOf"
+    SIBLING_OF = "siblingOf"
+    STATE = "state"
+
+
+@dataclass
+class ElementQuery:
+    # an element handle, or a css selector which has to match exactly one element of the document or of its open
+    # shadow roots
+    target: ElementHandle | str
+    helper: ElementQueryHelper
+    args: list[Any] = field(default_factory=list)
+
+
+@dataclass
+class ElementQueryResult:
+    # False when the element isn't in the DOM anymore, or the selector doesn't match exactly one element
+    found: bool
+    value: Any = None
+    error: str | None = None
+
+
 class ScreenshotMode(StrEnum):
     LITE = "lite"
     DETAILED = "detailed"
@@ -210,6 +252,9 @@ class SkyvernFrame:
         arg: Any | None = None,
         timeout_ms: float = SettingsManager.get_settings().BROWSER_ACTION_TIMEOUT_MS,
     ) -> Any:
+        context = skyvern_context.current()
+        if context:
+            context.browser_evaluations += 1
         try:
             async with asyncio.timeout(timeout_ms / 1000):
                 return await frame.evaluate(expression=expression, arg=arg)
@@ -367,6 +412,21 @@ class SkyvernFrame:
         js_script = "(element) => isScrollable(element)"
         return await self.evaluate(frame=self.frame, expression=js_script, arg=element)
 
+    async def query_elements(self, queries: list[ElementQuery]) -> list[ElementQueryResult]:
+        """
+        Run the queries in a single evaluation instead of one per helper, the results are in the order of the queries.
+        """
+        if not queries:
+            return []
+        js_script = "(queries) => runElementQueries(queries)"
+        results = await self.evaluate(
+            frame=self.frame,
+            expression=js_script,
+            arg=[[query.target, query.helper.value, query.args] for query in queries],
+        )
+        record_saved_round_trips(len(queries) - 1)
+        return [ElementQueryResult(**result) for result in results]
+
     async def get_element_visible(self, element: ElementHandle) -> bool:
         js_script = "(element) => isElementVisible(element) && !isHidden(element)"
         return await self.evaluate(frame=self.frame, expression=js_script, arg=element)
@@ -469,6 +529,30 @@ class SkyvernFrame:
         frame_index: int,
         timeout_ms: float = SettingsManager.get_settings().BROWSER_SCRAPING_BUILDING_ELEMENT_TREE_TIMEOUT_MS,
     ) -> tuple[list[dict], list[dict]]:
+        """
+        The tree is transferred in the compact wire format of buildEncodedTreeFromBody, in chunks of
+        BROWSER_SCRAPING_ELEMENT_TREE_CHUNK_SIZE characters, rather than as the nested objects.
+        """
+        js_script = (
+            "async ([frame_name, frame_index, chunk_size]) => "
+            "await buildEncodedTreeFromBody(frame_name, frame_index, chunk_size)"
+        )
+        payload, remaining_chunks = await self.evaluate(
+            frame=self.frame,
+            expression=js_script,
+            timeout_ms=timeout_ms,
+            arg=[frame_name, frame_index, SettingsManager.get_settings().BROWSER_SCRAPING_ELEMENT_TREE_CHUNK_SIZE],
+        )
+        chunks = [payload]
+        for _ in range(remaining_chunks):
+            chunks.append(
+                await self.evaluate(frame=self.frame, expression="() => takeEncodedTreeChunk()", timeout_ms=timeout_ms)
+            )
+        try:
+            return decode_element_tree("".join(chunks))
+        except Exception:
+            # e.g. a page overriding JSON.stringify or Array.prototype.toJSON
+            LOG.warning("Failed to decode the encoded element tree, building it again", exc_info=True)
         js_script = "async ([frame_name, frame_index]) => await buildTreeFromBody(frame_name, frame_index)"
         return await self.evaluate(
             frame=self.frame, expression=js_script, timeout_ms=timeout_ms, arg=[frame_name, frame_index]
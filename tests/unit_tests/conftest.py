@@ -0,0 +1,16 @@
+from typing import AsyncIterator
+
+import pytest
+import pytest_asyncio
+from playwright.async_api import Error, Page, async_playwright
+
+
+@pytest_asyncio.fixture
+async def browser_page() -> AsyncIterator[Page]:
+    async with async_playwright() as playwright:
+        try:
+            browser = await playwright.chromium.launch(headless=True)
+        except Error:
+            pytest.skip("chromium is not installed")
+        yield await browser.new_page()
+        await browser.close()
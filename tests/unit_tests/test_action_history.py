@@ -0,0 +1,102 @@
+import json
+from datetime import datetime
+from typing import Any
+
+import pytest
+from cachetools import LRUCache
+
+from skyvern.config import settings
+from skyvern.forge.sdk.models import Step, StepStatus
+from skyvern.forge.sdk.schemas.tasks import Task, TaskStatus
+from skyvern.webeye.actions import history
+from skyvern.webeye.actions.actions import ClickAction
+from skyvern.webeye.actions.history import ActionHistoryStore, fit_action_history
+from skyvern.webeye.actions.models import AgentStepOutput
+from skyvern.webeye.actions.responses import ActionSuccess
+
+
+def _entry(element_id: str, reasoning: str) -> dict:
+    return {
+        "action": {"action_type": "click", "element_id": element_id, "reasoning": reasoning},
+        "results": [{"success": True}],
+    }
+
+
+@pytest.fixture(autouse=True)
+def count_characters(monkeypatch: pytest.MonkeyPatch) -> None:
+    # the tiktoken encodings are downloaded on first use, count characters instead
+    monkeypatch.setattr(history, "count_tokens", len)
+
+
+def test_history_under_budget_is_unchanged() -> None:
+    action_history = [_entry("AAAA", "open the menu"), _entry("AAAB", "click on search")]
+    assert fit_action_history(action_history, token_budget=10000) == action_history
+    assert fit_action_history(action_history, token_budget=None) == action_history
+
+
+def test_oldest_reasoning_then_oldest_actions_are_dropped() -> None:
+    action_history = [_entry("AAAA", "x" * 100), _entry("AAAB", "y" * 100), _entry("AAAC", "z" * 100)]
+
+    # dropping the reasoning of the first action is enough
+    budget = sum(len(json.dumps(entry)) for entry in action_history) - 100
+    summarized_history = fit_action_history(action_history, token_budget=budget)
+    assert [entry["action"].get("reasoning") for entry in summarized_history] == [None, "y" * 100, "z" * 100]
+
+    # only the last action fits
+    summarized_history = fit_action_history(action_history, token_budget=len(json.dumps(action_history[-1])))
+    assert summarized_history == [action_history[-1]]
+
+
+def _step(order: int, element_id: str) -> Step:
+    action = ClickAction(element_id=element_id, reasoning=f"click on {element_id}")
+    return Step(
+        created_at=datetime.utcnow(),
+        modified_at=datetime.utcnow(),
+        task_id="tsk_1",
+        step_id=f"stp_{order}",
+        status=StepStatus.completed,
+        output=AgentStepOutput(actions_and_results=[(action, [ActionSuccess()])]),
+        order=order,
+        is_last=False,
+        organization_id="o_1",
+    )
+
+
+@pytest.mark.asyncio
+async def test_history_is_reloaded_when_it_misses_the_previous_step(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(ActionHistoryStore, "_histories", LRUCache(maxsize=10))
+    monkeypatch.setattr(settings, "PROMPT_ACTION_HISTORY_WINDOW", 1)
+    task = Task(
+        url="https://example.com",
+        created_at=datetime.utcnow(),
+        modified_at=datetime.utcnow(),
+        task_id="tsk_1",
+        status=TaskStatus.running,
+        organization_id="o_1",
+    )
+    db_steps = [_step(0, "AAAA"), _step(1, "AAAB")]
+    load_count = 0
+
+    async def load_last_steps(limit: int, **kwargs: Any) -> list[Step]:
+        nonlocal load_count
+        load_count += 1
+        return db_steps[-limit:]
+
+    async def get_element_ids(step: Step) -> list[str]:
+        action_history = await ActionHistoryStore.get_action_history(task, step, load_last_steps)
+        return [entry["action"]["element_id"] for entry in action_history]
+
+    assert await get_element_ids(_step(1, "AAAB")) == ["AAAA"]
+    # the step updates of this process are recorded
+    ActionHistoryStore.record_step(db_steps[1])
+    assert await get_element_ids(_step(2, "AAAC")) == ["AAAB"]
+    assert load_count == 1
+
+    # the step 2 ran in another worker
+    db_steps.append(_step(2, "AAAC"))
+    assert await get_element_ids(_step(3, "AAAD")) == ["AAAC"]
+    assert load_count == 2
+
+    ActionHistoryStore.forget_task(task.task_id)
+    assert await get_element_ids(_step(3, "AAAD")) == ["AAAC"]
+    assert load_count == 3
@@ -0,0 +1,57 @@
+from unittest.mock import AsyncMock
+
+import pytest
+
+from skyvern.config import settings
+from skyvern.forge import app
+from skyvern.webeye.actions.actions import ClickAction
+from skyvern.webeye.actions.journal import ActionJournal
+
+
+def _click_action(step_id: str, action_order: int) -> ClickAction:
+    return ClickAction(element_id="AAAB", task_id="tsk_1", step_id=step_id, action_order=action_order)
+
+
+@pytest.mark.asyncio
+async def test_actions_are_written_in_one_batch_per_step(monkeypatch: pytest.MonkeyPatch) -> None:
+    create_actions = AsyncMock()
+    monkeypatch.setattr(app.DATABASE, "create_actions", create_actions)
+    monkeypatch.setattr(ActionJournal, "_pending", {})
+
+    for action_order in range(3):
+        await ActionJournal.record(_click_action("stp_1", action_order))
+    await ActionJournal.record(_click_action("stp_2", 0))
+    create_actions.assert_not_called()
+
+    await ActionJournal.flush_task("tsk_1")
+    written_batches = [call.args[0] for call in create_actions.call_args_list]
+    assert [[action.action_order for action in batch] for batch in written_batches] == [[0, 1, 2], [0]]
+    assert all(action.created_at for batch in written_batches for action in batch)
+
+    await ActionJournal.flush("stp_1")
+    assert create_actions.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_failed_write_keeps_the_actions(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(app.DATABASE, "create_actions", AsyncMock(side_effect=RuntimeError))
+    monkeypatch.setattr(ActionJournal, "_pending", {})
+    monkeypatch.setattr(settings, "ACTION_JOURNAL_MAX_PENDING_ACTIONS", 2)
+
+    await ActionJournal.record(_click_action("stp_1", 0))
+    with pytest.raises(RuntimeError):
+        await ActionJournal.record(_click_action("stp_1", 1))
+    assert [action.action_order for action in ActionJournal._pending["stp_1"]] == [0, 1]
+
+
+@pytest.mark.asyncio
+async def test_actions_are_written_when_recorded_for_remote_readers(monkeypatch: pytest.MonkeyPatch) -> None:
+    create_actions = AsyncMock()
+    monkeypatch.setattr(app.DATABASE, "create_actions", create_actions)
+    monkeypatch.setattr(ActionJournal, "_pending", {})
+    monkeypatch.setattr(settings, "ACTION_JOURNAL_MAX_PENDING_ACTIONS", 1)
+
+    await ActionJournal.record(_click_action("stp_1", 0))
+    await ActionJournal.record(_click_action("stp_1", 1))
+    assert [[action.action_order for action in call.args[0]] for call in create_actions.call_args_list] == [[0], [1]]
+    assert ActionJournal._pending == {}
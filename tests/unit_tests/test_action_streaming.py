@@ -0,0 +1,165 @@
+import asyncio
+import json
+from datetime import datetime
+from typing import Any
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from skyvern.config import settings
+from skyvern.forge import app
+from skyvern.forge.agent import ForgeAgent
+from skyvern.forge.sdk.api.llm.api_handler_factory import LLMAPIHandlerFactory
+from skyvern.forge.sdk.artifact.storage.test_helpers import TEST_ORGANIZATION_ID, TEST_TASK_ID, create_fake_step
+from skyvern.forge.sdk.core import skyvern_context
+from skyvern.forge.sdk.core.skyvern_context import SkyvernContext
+from skyvern.forge.sdk.models import Step, StepStatus
+from skyvern.forge.sdk.schemas.tasks import Task, TaskStatus
+from skyvern.webeye.actions.actions import Action, ActionType
+from skyvern.webeye.actions.handler import ActionHandler
+from skyvern.webeye.actions.models import DetailedAgentStepOutput
+from skyvern.webeye.actions.responses import ActionResult, ActionSuccess
+from skyvern.webeye.scraper.scraper import ScrapedPage
+
+LLM_RESPONSE = {
+    "actions": [
+        {"action_type": "CLICK", "element_id": "AAAA", "reasoning": "open the form"},
+        {"action_type": "INPUT_TEXT", "element_id": "AAAB", "text": "skyvern", "reasoning": "fill the name"},
+        {"action_type": "WAIT", "reasoning": "wait for the form"},
+        {"action_type": "COMPLETE", "reasoning": "the form is filled"},
+    ]
+}
+
+
+@pytest.fixture
+def executed_actions(monkeypatch: pytest.MonkeyPatch) -> list[Action]:
+    actions: list[Action] = []
+
+    async def handle_action(
+        scraped_page: ScrapedPage, task: Task, step: Step, page: Any, action: Action
+    ) -> list[ActionResult]:
+        actions.append(action)
+        return [ActionSuccess(data=action.reasoning)]
+
+    monkeypatch.setattr(ActionHandler, "handle_action", handle_action)
+    return actions
+
+
+async def _run_agent_step(
+    monkeypatch: pytest.MonkeyPatch,
+    llm_response: dict[str, Any],
+    executed_actions: list[Action],
+    executed_while_streaming: list[Action],
+) -> tuple[Step, DetailedAgentStepOutput, AsyncMock]:
+    """
+    Run a step whose LLM response is streamed in small chunks, the returned mock records the artifacts after each
+    action.
+    """
+    monkeypatch.setattr(settings, "ENABLE_LLM_ACTION_STREAMING", True)
+    monkeypatch.setattr(settings, "ACTION_DELAY_MIN_SECONDS", 0)
+    monkeypatch.setattr(settings, "ACTION_DELAY_MAX_SECONDS", 0)
+
+    async def stream_llm_response(**kwargs: Any) -> dict[str, Any]:
+        response = json.dumps(llm_response)
+        for idx in range(0, len(response), 16):
+            kwargs["stream_handler"].on_text(response[idx : idx + 16])
+            # let the streamed actions be executed while the response is streamed
+            await asyncio.sleep(0)
+        executed_while_streaming.extend(executed_actions)
+        return json.loads(response)
+
+    monkeypatch.setattr(
+        LLMAPIHandlerFactory, "get_override_llm_api_handler", lambda *args, **kwargs: stream_llm_response
+    )
+    monkeypatch.setattr(app.AGENT_FUNCTION, "prepare_step_execution", AsyncMock())
+    skyvern_context.set(SkyvernContext(organization_id=TEST_ORGANIZATION_ID, task_id=TEST_TASK_ID))
+
+    task = Task(
+        url="https://example.com",
+        navigation_goal="fill the form",
+        created_at=datetime.utcnow(),
+        modified_at=datetime.utcnow(),
+        task_id=TEST_TASK_ID,
+        status=TaskStatus.running,
+        organization_id=TEST_ORGANIZATION_ID,
+    )
+    scraped_page = ScrapedPage(
+        elements=[],
+        id_to_css_dict={},
+        id_to_element_hash={},
+        hash_to_element_ids={},
+        element_tree=[],
+        element_tree_trimmed=[],
+        screenshots=[],
+        url=task.url,
+        html="",
+        _browser_state=None,
+        _clean_up_func=None,
+        _scrape_exclude=None,
+    )
+    browser_state = MagicMock()
+    browser_state.must_get_working_page = AsyncMock()
+    agent = ForgeAgent()
+
+    async def update_step(step: Step, status: StepStatus | None = None, **kwargs: Any) -> Step:
+        return step.model_copy(update={"status": status}) if status else step
+
+    record_artifacts_after_action = AsyncMock()
+    monkeypatch.setattr(agent, "update_step", update_step)
+    monkeypatch.setattr(agent, "build_and_record_step_prompt", AsyncMock(return_value=(scraped_page, "prompt")))
+    monkeypatch.setattr(agent, "record_artifacts_after_action", record_artifacts_after_action)
+
+    try:
+        step, detailed_output = await agent.agent_step(task, create_fake_step("stp_1"), browser_state)
+    finally:
+        skyvern_context.reset()
+    return step, detailed_output, record_artifacts_after_action
+
+
+@pytest.mark.asyncio
+async def test_streamed_actions_are_executed_once(
+    monkeypatch: pytest.MonkeyPatch, executed_actions: list[Action]
+) -> None:
+    executed_while_streaming: list[Action] = []
+
+    step, detailed_output, _ = await _run_agent_step(
+        monkeypatch, LLM_RESPONSE, executed_actions, executed_while_streaming
+    )
+
+    assert step.status == StepStatus.completed
+    # the click and the input are executed while streamed, and the complete action once the response is parsed.
+    # Early execution stops at the wait action, which is then dropped as other actions follow it
+    assert [action.action_type for action in executed_actions] == [
+        ActionType.CLICK,
+        ActionType.INPUT_TEXT,
+        ActionType.COMPLETE,
+    ]
+    assert [action.action_type for action in executed_while_streaming] == [ActionType.CLICK, ActionType.INPUT_TEXT]
+    assert detailed_output.actions_and_results is not None
+    # the pre-executed instances are kept in the actions of the step
+    assert all(
+        action is executed_action
+        for (action, _), executed_action in zip(detailed_output.actions_and_results, executed_actions, strict=True)
+    )
+    for action, results in detailed_output.actions_and_results:
+        # each action is paired with its own results
+        assert [result.data for result in results] == [action.reasoning]
+
+
+@pytest.mark.asyncio
+async def test_pre_executed_last_action_gets_the_last_action_capture(
+    monkeypatch: pytest.MonkeyPatch, executed_actions: list[Action]
+) -> None:
+    monkeypatch.setattr(settings, "ARTIFACT_CAPTURE_POLICY", "last_action")
+    executed_while_streaming: list[Action] = []
+
+    _, _, record_artifacts_after_action = await _run_agent_step(
+        monkeypatch,
+        {"actions": [{"action_type": "CLICK", "element_id": "AAAA", "reasoning": "open the form"}]},
+        executed_actions,
+        executed_while_streaming,
+    )
+
+    assert [action.action_type for action in executed_while_streaming] == [ActionType.CLICK]
+    # recorded while streamed, then with the last action capture once the click is known to be the last action
+    assert [call.kwargs["is_last_action"] for call in record_artifacts_after_action.call_args_list] == [False, True]
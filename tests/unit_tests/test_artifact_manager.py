@@ -0,0 +1,82 @@
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+from unittest.mock import AsyncMock
+
+import pytest
+
+from skyvern.config import settings
+from skyvern.forge import app
+from skyvern.forge.sdk.artifact.manager import ArtifactManager
+from skyvern.forge.sdk.artifact.models import Artifact, ArtifactType
+from skyvern.forge.sdk.artifact.storage.local import LocalStorage
+from skyvern.forge.sdk.artifact.storage.test_helpers import TEST_ORGANIZATION_ID, create_fake_step
+
+
+@pytest.fixture
+def created_artifacts(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> list[Artifact]:
+    artifacts: list[Artifact] = []
+
+    async def create_artifact(artifact_id: str, artifact_type: str, uri: str, **kwargs: Any) -> Artifact:
+        artifact = Artifact(
+            created_at=datetime.utcnow(),
+            modified_at=datetime.utcnow(),
+            artifact_id=artifact_id,
+            artifact_type=artifact_type,
+            uri=uri,
+            organization_id=kwargs["organization_id"],
+            step_id=kwargs.get("step_id"),
+            task_id=kwargs.get("task_id"),
+        )
+        artifacts.append(artifact)
+        return artifact
+
+    monkeypatch.setattr(app.DATABASE, "create_artifact", create_artifact)
+    monkeypatch.setattr(app, "STORAGE", LocalStorage(artifact_path=str(tmp_path)))
+    return artifacts
+
+
+@pytest.mark.asyncio
+async def test_empty_artifact_is_not_content_addressed(
+    monkeypatch: pytest.MonkeyPatch, created_artifacts: list[Artifact]
+) -> None:
+    monkeypatch.setattr(settings, "ENABLE_CONTENT_ADDRESSED_ARTIFACTS", True)
+    step = create_fake_step("stp_1")
+
+    await ArtifactManager().create_artifact(step=step, artifact_type=ArtifactType.VISIBLE_ELEMENTS_TREE, data=b"")
+
+    assert "/cas/" not in created_artifacts[0].uri
+    assert created_artifacts[0].organization_id == TEST_ORGANIZATION_ID
+
+
+@pytest.mark.asyncio
+async def test_recording_artifact_is_created_empty(created_artifacts: list[Artifact]) -> None:
+    # as initialize_execution_state creates the recording artifact, before any segment is recorded
+    artifact_manager = ArtifactManager()
+    step = create_fake_step("stp_1")
+
+    artifact_id = await artifact_manager.create_artifact(step=step, artifact_type=ArtifactType.RECORDING, data=b"")
+
+    assert created_artifacts[0].artifact_id == artifact_id
+    assert created_artifacts[0].artifact_type == ArtifactType.RECORDING
+    assert created_artifacts[0].step_id == "stp_1"
+    # nothing to upload until the recording grows
+    assert artifact_manager.upload_aiotasks_map[step.task_id] == []
+
+
+@pytest.mark.asyncio
+async def test_content_addressed_artifact_is_not_updated_in_place(
+    monkeypatch: pytest.MonkeyPatch, created_artifacts: list[Artifact]
+) -> None:
+    monkeypatch.setattr(settings, "ENABLE_CONTENT_ADDRESSED_ARTIFACTS", True)
+    artifact_manager = ArtifactManager()
+    step = create_fake_step("stp_1")
+    await artifact_manager.create_artifact(step=step, artifact_type=ArtifactType.LLM_PROMPT, data=b"prompt")
+    await artifact_manager.wait_for_upload_aiotasks([step.task_id])
+    monkeypatch.setattr(app.DATABASE, "get_artifact_by_id", AsyncMock(return_value=created_artifacts[0]))
+
+    # the blob is shared with every artifact with the same content
+    with pytest.raises(ValueError):
+        await artifact_manager.update_artifact_data(
+            artifact_id=created_artifacts[0].artifact_id, organization_id=TEST_ORGANIZATION_ID, data=b"other prompt"
+        )
@@ -0,0 +1,31 @@
+import pytest
+
+from skyvern.config import settings
+from skyvern.forge.sdk.artifact.capture_policy import ArtifactCapturePolicy, get_action_capture
+
+
+def test_every_action_is_captured_with_the_always_and_viewport_policies() -> None:
+    capture = get_action_capture(ArtifactCapturePolicy.ALWAYS, action_failed=False, is_last_action=False)
+    assert capture.capture and not capture.viewport_only
+
+    capture = get_action_capture(ArtifactCapturePolicy.VIEWPORT, action_failed=False, is_last_action=False)
+    assert capture.capture and capture.viewport_only
+
+
+@pytest.mark.parametrize(
+    "policy",
+    [ArtifactCapturePolicy.ON_FAILURE, ArtifactCapturePolicy.SAMPLED, ArtifactCapturePolicy.LAST_ACTION],
+)
+def test_failed_actions_are_always_captured(policy: ArtifactCapturePolicy, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "ARTIFACT_CAPTURE_SAMPLE_RATE", 0)
+
+    assert get_action_capture(policy, action_failed=True, is_last_action=False).capture
+    assert not get_action_capture(policy, action_failed=False, is_last_action=False).capture
+
+
+def test_last_action_and_sampled_policies(monkeypatch: pytest.MonkeyPatch) -> None:
+    assert get_action_capture(ArtifactCapturePolicy.LAST_ACTION, action_failed=False, is_last_action=True).capture
+    assert not get_action_capture(ArtifactCapturePolicy.ON_FAILURE, action_failed=False, is_last_action=True).capture
+
+    monkeypatch.setattr(settings, "ARTIFACT_CAPTURE_SAMPLE_RATE", 1)
+    assert get_action_capture(ArtifactCapturePolicy.SAMPLED, action_failed=False, is_last_action=False).capture
@@ -0,0 +1,34 @@
+import time
+
+import pytest
+from playwright.async_api import Page
+
+from skyvern.webeye.scraper.scraper import IncrementalScrapePage
+from skyvern.webeye.utils.page import SkyvernFrame
+
+RENDER_OPTIONS = """() => {
+  document.getElementById("menu").innerHTML = '<ul role="listbox"><li role="option">a</li><li role="option">b</li></ul>';
+}"""
+
+
+@pytest.mark.asyncio
+async def test_options_rendered_before_the_wait_end_it_once_quiet(browser_page: Page) -> None:
+    await browser_page.set_content('<input id="select"><div id="menu"></div>')
+    incremental_scraped = IncrementalScrapePage(skyvern_frame=await SkyvernFrame.create_instance(frame=browser_page))
+    await incremental_scraped.start_listen_dom_increment()
+    # rendered synchronously by the interaction, before the wait starts
+    await browser_page.evaluate(RENDER_OPTIONS)
+
+    started_at = time.monotonic()
+    new_elements = await incremental_scraped.wait_for_dom_increment(timeout_seconds=5, quiet_ms=200)
+
+    assert new_elements > 0
+    # not the whole timeout
+    assert time.monotonic() - started_at < 2
+
+    # with the count taken before the next interaction, only the elements observed after it are new
+    start_count = await incremental_scraped.get_incremental_elements_num()
+    new_elements = await incremental_scraped.wait_for_dom_increment(
+        timeout_seconds=0.5, quiet_ms=200, start_count=start_count
+    )
+    assert new_elements == 0
@@ -0,0 +1,25 @@
+from skyvern.webeye.scraper.element_index import ElementIndex
+
+CHECKBOX = {"id": "AAAC", "tagName": "input", "attributes": {"type": "checkbox"}, "children": []}
+OPTION = {"id": "AAAE", "tagName": "li", "text": "Canada", "children": []}
+# the option is nested under an element without id
+LISTBOX = {"id": "AAAD", "tagName": "ul", "children": [{"tagName": "div", "children": [OPTION]}]}
+LABEL = {"id": "AAAB", "tagName": "label", "text": "Accept", "children": [CHECKBOX]}
+
+
+def test_flat_elements_are_indexed_once() -> None:
+    # the flat element lists have the children at the top level too
+    index = ElementIndex([CHECKBOX, LABEL, LISTBOX, OPTION])
+
+    assert index.get_children_by_tag("AAAB", "input") == [CHECKBOX]
+    assert index.get_children_by_tag("AAAB", "select") == []
+    assert index.ids_by_tag["input"] == ["AAAC"]
+    assert index.get_ancestor_ids("AAAC") == ["AAAB"]
+    assert index.get_ancestor_ids("AAAE") == ["AAAD"]
+
+
+def test_ids_leading_to_text() -> None:
+    index = ElementIndex([LABEL, LISTBOX])
+
+    assert index.get_ids_leading_to_text("Canada") == {"AAAE", "AAAD"}
+    assert index.get_ids_leading_to_text("Mexico") == set()
@@ -0,0 +1,41 @@
+import pytest
+from playwright.async_api import Page
+
+from skyvern.webeye.utils.page import ElementQuery, ElementQueryHelper, SkyvernFrame
+
+PAGE_CONTENT = """
+<button unique_id="AAAA">submit</button>
+<div id="host"></div>
+<script>
+  const shadowRoot = document.getElementById("host").attachShadow({ mode: "open" });
+  shadowRoot.innerHTML = '<svg unique_id="AAAB" width="10" height="10"></svg><div id="nested-host"></div>';
+  shadowRoot.getElementById("nested-host").attachShadow({ mode: "open" }).innerHTML =
+    '<input unique_id="AAAC" disabled>';
+</script>
+"""
+
+
+@pytest.mark.asyncio
+async def test_selectors_pierce_the_open_shadow_roots(browser_page: Page) -> None:
+    await browser_page.set_content(PAGE_CONTENT)
+    skyvern_frame = await SkyvernFrame.create_instance(frame=browser_page)
+
+    results = await skyvern_frame.query_elements(
+        [
+            ElementQuery(target='[unique_id="AAAA"]', helper=ElementQueryHelper.BOX_VISIBLE),
+            # in a web component, and in a nested one
+            ElementQuery(target='[unique_id="AAAB"]', helper=ElementQueryHelper.BOX_VISIBLE),
+            ElementQuery(target='[unique_id="AAAC"]', helper=ElementQueryHelper.BOX_VISIBLE),
+            ElementQuery(target='[unique_id="AAAD"]', helper=ElementQueryHelper.BOX_VISIBLE),
+            # matches more than one element
+            ElementQuery(target="[unique_id]", helper=ElementQueryHelper.BOX_VISIBLE),
+        ]
+    )
+
+    assert [(result.found, result.value) for result in results] == [
+        (True, True),
+        (True, True),
+        (True, True),
+        (False, None),
+        (False, None),
+    ]
@@ -0,0 +1,104 @@
+from typing import Any
+
+import pytest
+
+from skyvern.webeye.utils.dom import SkyvernElement, SkyvernElementState
+from skyvern.webeye.utils.page import SkyvernFrame
+
+ELEMENT_STATE = SkyvernElementState(
+    tagName="button",
+    visible=True,
+    disabledAttr=None,
+    ariaDisabledAttr="true",
+    styleDisabled=False,
+    rect={"x": 0, "y": 0, "width": 100, "height": 20},
+)
+
+
+class FakeLocator:
+    def __init__(self, state: SkyvernElementState | bool | None, count: int = 1) -> None:
+        # what the element state script returns: the state, None without exactly one match, False without the js
+        self.state = state
+        self.match_count = count
+
+    async def evaluate_all(self, expression: str) -> SkyvernElementState | bool | None:
+        return self.state
+
+    async def count(self) -> int:
+        return self.match_count
+
+    async def element_handle(self, timeout: float) -> object:
+        return object()
+
+    async def get_attribute(self, name: str, timeout: float) -> str | None:
+        return None
+
+
+class FakeFrame:
+    url = "https://example.com/"
+
+
+class FakeSkyvernFrame:
+    async def get_element_visible(self, element: Any) -> bool:
+        return False
+
+    async def get_disabled_from_style(self, element: Any) -> bool:
+        return True
+
+
+@pytest.fixture
+def created_frames(monkeypatch: pytest.MonkeyPatch) -> list[Any]:
+    created_frames: list[Any] = []
+
+    async def create_instance(frame: Any) -> FakeSkyvernFrame:
+        created_frames.append(frame)
+        return FakeSkyvernFrame()
+
+    monkeypatch.setattr(SkyvernFrame, "create_instance", create_instance)
+    return created_frames
+
+
+def _element(locator: FakeLocator, frame: FakeFrame) -> SkyvernElement:
+    return SkyvernElement(locator, frame, {"id": "AAAB", "tagName": "button"})  # type: ignore[arg-type]
+
+
+@pytest.mark.asyncio
+async def test_checks_are_read_from_the_element_state(created_frames: list[Any]) -> None:
+    element = _element(FakeLocator(ELEMENT_STATE), FakeFrame())
+
+    assert await element.is_visible()
+    assert await element.is_disabled()
+    assert await element.get_element_state() == ELEMENT_STATE
+    # no injection, the state script doesn't need the frame instance
+    assert created_frames == []
+
+
+@pytest.mark.asyncio
+async def test_checks_fall_back_when_the_locator_matches_several_elements(created_frames: list[Any]) -> None:
+    element = _element(FakeLocator(None, count=2), FakeFrame())
+
+    assert not await element.is_visible()
+    assert await element.is_disabled()
+    # a single instance for both checks
+    assert len(created_frames) == 1
+
+
+@pytest.mark.asyncio
+async def test_functions_are_injected_again_in_a_new_document(created_frames: list[Any]) -> None:
+    frame = FakeFrame()
+    locator = FakeLocator(None)
+    element = _element(locator, frame)
+
+    await element.is_visible()
+    await element.is_visible()
+    assert len(created_frames) == 1
+
+    # navigated to another page
+    frame.url = "https://example.com/next"
+    await element.is_visible()
+    assert len(created_frames) == 2
+
+    # reloaded, the state script doesn't find the functions
+    locator.state = False
+    await element.is_visible()
+    assert len(created_frames) == 3
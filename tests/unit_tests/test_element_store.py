@@ -0,0 +1,54 @@
+import json
+
+from skyvern.webeye.scraper.element_store import ELEMENT_TREE_WIRE_VERSION, compact_elements, decode_element_tree
+
+RECT = {"bottom": 30.0, "top": 10.0, "left": 5.0, "right": 105.0, "width": 100.0, "height": 20.0}
+
+
+def test_compact_elements() -> None:
+    # json values aren't shared, as the strings of the elements returned by the browser
+    elements = json.loads(
+        json.dumps(
+            [
+                {"id": "AAAB", "tagName": "button", "attributes": {"type": "submit"}, "rect": RECT, "children": []},
+                {"id": "AAAC", "tagName": "button", "attributes": {"type": "submit"}, "children": []},
+            ]
+        )
+    )
+    label = {"id": "AAAA", "tagName": "label", "children": [elements[0]]}
+
+    compact_elements([label, *elements])
+
+    assert "rect" not in elements[0]
+    assert elements[0]["tagName"] is elements[1]["tagName"]
+    assert elements[0]["attributes"]["type"] is elements[1]["attributes"]["type"]
+    assert label["children"][0] is elements[0]
+
+
+def test_decode_element_tree() -> None:
+    # a label with a checkbox, and a label out of the tree
+    strings = ["id", "AAAA", "tagName", "label", "attributes", "children", "AAAB", "input", "type", "checkbox"]
+    strings += ["interactable", "required"]
+    payload = {
+        "version": ELEMENT_TREE_WIRE_VERSION,
+        "strings": strings,
+        "elements": [
+            [[0, 1, 2, 3, -5, None, -6, None], []],
+            [[0, 6, 2, 7, -5, None, -6, None, -11, True], [8, 9, -12, True]],
+            [[0, 1, 2, 3, -5, None, -6, None], []],
+        ],
+        "parents": [-1, 0, -2],
+    }
+
+    elements, element_tree = decode_element_tree(json.dumps(payload))
+
+    assert list(elements[1].items()) == [
+        ("id", "AAAB"),
+        ("tagName", "input"),
+        ("attributes", {"type": "checkbox", "required": True}),
+        ("children", []),
+        ("interactable", True),
+    ]
+    assert element_tree == [elements[0]]
+    assert elements[0]["children"][0] is elements[1]
+    assert elements[2]["children"] == []
@@ -0,0 +1,92 @@
+import asyncio
+import json
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Iterator
+
+import pytest
+
+from skyvern.config import settings
+from skyvern.forge import app
+from skyvern.forge.sdk.artifact.models import Artifact, ArtifactType
+from skyvern.forge.sdk.artifact.storage.local import LocalStorage
+from skyvern.forge.sdk.artifact.storage.test_helpers import TEST_ORGANIZATION_ID
+from skyvern.forge.sdk.core import skyvern_context
+from skyvern.forge.sdk.core.skyvern_context import SkyvernContext
+from skyvern.forge.sdk.log_artifacts import save_step_logs
+
+STEP_ID = "stp_1"
+
+
+@pytest.fixture
+def log_artifacts(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> Iterator[dict[ArtifactType, Artifact]]:
+    artifacts: dict[ArtifactType, Artifact] = {}
+
+    async def create_artifact(artifact_id: str, artifact_type: ArtifactType, uri: str, **kwargs: Any) -> Artifact:
+        artifact = Artifact(
+            created_at=datetime.utcnow(),
+            modified_at=datetime.utcnow(),
+            artifact_id=artifact_id,
+            artifact_type=artifact_type,
+            uri=uri,
+            organization_id=kwargs["organization_id"],
+            step_id=kwargs.get("step_id"),
+        )
+        artifacts[artifact_type] = artifact
+        return artifact
+
+    async def get_artifact_by_entity_id(artifact_type: ArtifactType, **kwargs: Any) -> Artifact | None:
+        return artifacts.get(artifact_type)
+
+    monkeypatch.setattr(settings, "ENABLE_LOG_ARTIFACTS", True)
+    monkeypatch.setattr(settings, "LOG_ARTIFACT_FLUSH_INTERVAL_SECONDS", 0.05)
+    monkeypatch.setattr(app.DATABASE, "create_artifact", create_artifact)
+    monkeypatch.setattr(app.DATABASE, "get_artifact_by_entity_id", get_artifact_by_entity_id)
+    monkeypatch.setattr(app, "STORAGE", LocalStorage(artifact_path=str(tmp_path)))
+    skyvern_context.set(SkyvernContext(organization_id=TEST_ORGANIZATION_ID))
+    yield artifacts
+    skyvern_context.reset()
+
+
+def _log(event: str) -> None:
+    skyvern_context.ensure_context().log.append({"event": event, "level": "info", "step_id": STEP_ID})
+
+
+@pytest.mark.asyncio
+async def test_buffered_log_entries_are_flushed_after_the_interval(
+    log_artifacts: dict[ArtifactType, Artifact],
+) -> None:
+    _log("step started")
+    await save_step_logs(STEP_ID)
+    # buffered until the flush interval has elapsed
+    assert log_artifacts == {}
+
+    # flushed without the step being saved again
+    await asyncio.sleep(0.2)
+    await app.ARTIFACT_MANAGER.wait_for_upload_aiotasks([STEP_ID])
+    raw_artifact = log_artifacts[ArtifactType.SKYVERN_LOG_RAW]
+    content = b"".join([segment async for segment in app.ARTIFACT_MANAGER.iter_artifact_content(raw_artifact)])
+    assert [json.loads(line)["event"] for line in content.splitlines()] == ["step started"]
+    assert await app.STORAGE.retrieve_artifact(raw_artifact) == content
+
+
+@pytest.mark.asyncio
+async def test_whole_log_is_stored_at_the_artifact_uri(
+    monkeypatch: pytest.MonkeyPatch, log_artifacts: dict[ArtifactType, Artifact]
+) -> None:
+    # every save flushes
+    monkeypatch.setattr(settings, "LOG_ARTIFACT_SEGMENT_MAX_ENTRIES", 1)
+    _log("step started")
+    await save_step_logs(STEP_ID)
+    _log("step completed")
+    await save_step_logs(STEP_ID)
+    await app.ARTIFACT_MANAGER.wait_for_upload_aiotasks([STEP_ID])
+
+    assert log_artifacts[ArtifactType.SKYVERN_LOG_RAW].uri.endswith(".ndjson")
+
+    raw_log = await app.STORAGE.retrieve_artifact(log_artifacts[ArtifactType.SKYVERN_LOG_RAW])
+    assert raw_log is not None
+    assert [json.loads(line)["event"] for line in raw_log.splitlines()] == ["step started", "step completed"]
+    formatted_log = await app.STORAGE.retrieve_artifact(log_artifacts[ArtifactType.SKYVERN_LOG])
+    assert formatted_log is not None
+    assert b"step completed" in formatted_log
@@ -0,0 +1,53 @@
+import asyncio
+
+import pytest
+
+# the app is imported first, the workflow modules it loads import the secret resolver
+from skyvern.forge import app as _  # noqa: F401
+from skyvern.forge.sdk.workflow.secret_resolver import EncryptedSecretCache, SecretProvider, SecretResolver
+
+
+class FakeAWSClient:
+    def __init__(self) -> None:
+        self.calls: list[str] = []
+
+    async def get_secret(self, secret_name: str) -> str | None:
+        self.calls.append(secret_name)
+        await asyncio.sleep(0)
+        return f"value-of-{secret_name}"
+
+
+def test_encrypted_secret_cache() -> None:
+    cache = EncryptedSecretCache(maxsize=10, ttl=30)
+    cache.set("org_1", SecretProvider.AWS_SECRETS_MANAGER, "key", {"password": "hunter2"})
+
+    assert "hunter2" not in str(list(cache._cache.values()))
+    assert cache.get("org_1", SecretProvider.AWS_SECRETS_MANAGER, "key") == {"password": "hunter2"}
+    assert cache.get("org_2", SecretProvider.AWS_SECRETS_MANAGER, "key") is None
+
+
+@pytest.mark.asyncio
+async def test_secret_resolver_fetches_each_secret_once(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(SecretResolver, "cache", EncryptedSecretCache(maxsize=10, ttl=0))
+    aws_client = FakeAWSClient()
+    resolver = SecretResolver(aws_client, "org_1")  # type: ignore[arg-type]
+
+    resolver.prefetch_aws_secret("a")
+    resolver.prefetch_aws_secret("b")
+    values = await asyncio.gather(resolver.get_aws_secret("a"), resolver.get_aws_secret("b"))
+
+    assert values == ["value-of-a", "value-of-b"]
+    assert sorted(aws_client.calls) == ["a", "b"]
+
+
+def test_secret_resolver_semaphores_are_per_event_loop() -> None:
+    async def get_semaphore() -> asyncio.Semaphore:
+        return SecretResolver._get_semaphore(SecretProvider.AWS_SECRETS_MANAGER)
+
+    loop = asyncio.new_event_loop()
+    try:
+        semaphore = loop.run_until_complete(get_semaphore())
+        assert loop.run_until_complete(get_semaphore()) is semaphore
+    finally:
+        loop.close()
+    assert asyncio.run(get_semaphore()) is not semaphore
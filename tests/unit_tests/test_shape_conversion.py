@@ -0,0 +1,115 @@
+from collections import Counter
+from datetime import timedelta
+from typing import Any, Iterator
+
+import pytest
+
+from skyvern.forge import app
+from skyvern.forge.agent_functions import AgentFunction
+from skyvern.forge.sdk.core import skyvern_context
+from skyvern.forge.sdk.core.skyvern_context import SkyvernContext
+from skyvern.webeye.utils.page import ElementQuery, ElementQueryHelper, ElementQueryResult, SkyvernFrame
+
+
+class FakeCache:
+    def __init__(self, values: dict[str, Any]) -> None:
+        self.values = values
+
+    async def set(self, key: str, value: Any, ex: int | timedelta | None = None) -> None:
+        self.values[key] = value
+
+    async def get_many(self, keys: list[str]) -> list[Any]:
+        return [self.values.get(key) for key in keys]
+
+
+class FakeLocator:
+    async def scroll_into_view_if_needed(self, timeout: float) -> None:
+        return
+
+    async def wait_for(self, state: str, timeout: float) -> None:
+        return
+
+    async def screenshot(self, timeout: float, animations: str) -> bytes:
+        return b"screenshot"
+
+
+class FakeFrame:
+    def locator(self, selector: str) -> FakeLocator:
+        return FakeLocator()
+
+
+class FakeSkyvernFrame:
+    def __init__(self, missing_ids: set[str]) -> None:
+        self.missing_selectors = {f'[unique_id="{element_id}"]' for element_id in missing_ids}
+
+    def get_frame(self) -> FakeFrame:
+        return FakeFrame()
+
+    async def query_elements(self, queries: list[ElementQuery]) -> list[ElementQueryResult]:
+        results = []
+        for query in queries:
+            if query.target in self.missing_selectors:
+                results.append(ElementQueryResult(found=False))
+            elif query.helper == ElementQueryHelper.BLOCKING_ELEMENT_ID:
+                results.append(ElementQueryResult(found=True, value=("", False)))
+            else:
+                results.append(ElementQueryResult(found=True, value=True))
+        return results
+
+
+def _icon(element_id: str, icon_class: str) -> dict:
+    return {"id": element_id, "tagName": "i", "attributes": {"class": icon_class}, "children": []}
+
+
+def _svg(element_id: str) -> dict:
+    path = {"tagName": "path", "attributes": {"d": "M0 0L10 10"}, "children": []}
+    return {"id": element_id, "tagName": "svg", "attributes": {"viewBox": "0 0 10 10"}, "children": [path]}
+
+
+@pytest.fixture
+def llm_calls(monkeypatch: pytest.MonkeyPatch) -> Iterator[Counter[str]]:
+    calls: Counter[str] = Counter()
+
+    async def llm_api_handler(prompt: str, prompt_name: str, **kwargs: Any) -> dict[str, Any]:
+        calls[prompt_name] += 1
+        return {"shape": f"{prompt_name} shape", "recognized": True}
+
+    async def create_instance(frame: Any) -> SkyvernFrame:
+        # the first close icon was removed from the page after the scraping
+        return FakeSkyvernFrame(missing_ids={"AAAA"})  # type: ignore[return-value]
+
+    monkeypatch.setattr(SkyvernFrame, "create_instance", create_instance)
+    monkeypatch.setattr(app, "SECONDARY_LLM_API_HANDLER", llm_api_handler)
+    monkeypatch.setattr(app, "SHAPE_STORE", None)
+    skyvern_context.set(SkyvernContext())
+    yield calls
+    skyvern_context.reset()
+
+
+@pytest.mark.asyncio
+async def test_identical_shapes_are_converted_once(monkeypatch: pytest.MonkeyPatch, llm_calls: Counter[str]) -> None:
+    cleanup_element_tree = AgentFunction().cleanup_element_tree_factory()
+    menu_icon = _icon("AAAD", "icon-menu")
+    monkeypatch.setattr(app, "CACHE", FakeCache({}))
+    await cleanup_element_tree(FakeFrame(), "", [menu_icon])  # type: ignore[arg-type]
+    assert llm_calls == {"css-shape-convert": 1}
+
+    # the menu icon is cached now
+    llm_calls.clear()
+    close_icons = [_icon("AAAA", "icon-close"), _icon("AAAB", "icon-close"), _icon("AAAC", "icon-close")]
+    menu_icon = _icon("AAAD", "icon-menu")
+    svgs = [_svg("AAAE"), _svg("AAAF")]
+    element_tree = [*close_icons, menu_icon, *svgs]
+
+    assert await cleanup_element_tree(FakeFrame(), "", element_tree) == element_tree  # type: ignore[arg-type]
+
+    # the icon which isn't on the page anymore leaves the conversion to the next one
+    assert llm_calls == {"css-shape-convert": 1, "svg-convert": 1}
+    assert [icon["attributes"].get("shape-description") for icon in close_icons] == [
+        None,
+        "css-shape-convert shape",
+        "css-shape-convert shape",
+    ]
+    assert menu_icon["attributes"]["shape-description"] == "css-shape-convert shape"
+    assert [svg["attributes"] for svg in svgs] == [{"alt": "svg-convert shape"}, {"alt": "svg-convert shape"}]
+    assert all("children" not in svg for svg in svgs)
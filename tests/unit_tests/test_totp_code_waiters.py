@@ -0,0 +1,89 @@
+import asyncio
+from datetime import datetime, timedelta
+from typing import Any
+
+import pytest
+
+from skyvern.config import settings
+from skyvern.forge import app
+from skyvern.forge.sdk.services.totp_code_waiters import TOTP_CODE_WAITERS, TOTPCodeWaiters
+from skyvern.webeye.actions.handler import _wait_for_verification_code_from_db
+
+
+@pytest.mark.asyncio
+async def test_sent_code_wakes_up_the_waiters_of_its_key(monkeypatch: pytest.MonkeyPatch) -> None:
+    waiters = TOTPCodeWaiters()
+    monkeypatch.setattr(waiters, "_ensure_listener", lambda: None)
+
+    with (
+        waiters.subscribe("o_1", "john@example.com") as code_sent,
+        waiters.subscribe("o_1", "jane@example.com") as other,
+    ):
+        wait_task = asyncio.create_task(waiters.wait(code_sent, timeout=5))
+        await asyncio.sleep(0)
+        waiters.notify("o_1", "john@example.com")
+        assert await wait_task
+        assert not other.is_set()
+        assert not await waiters.wait(other, timeout=0.01)
+
+    assert not waiters._waiters
+
+
+def test_notification_payload(monkeypatch: pytest.MonkeyPatch) -> None:
+    waiters = TOTPCodeWaiters()
+    monkeypatch.setattr(waiters, "_ensure_listener", lambda: None)
+
+    with waiters.subscribe("o_1", "john@example.com") as code_sent:
+        waiters._on_notification("not json")
+        waiters._on_notification('{"organization_id": "o_1", "totp_identifier": "john@example.com"}')
+        assert code_sent.is_set()
+
+
+@pytest.fixture
+def sent_codes(monkeypatch: pytest.MonkeyPatch) -> list[tuple[datetime, str]]:
+    # an unexpired code of a previous login
+    codes = [(datetime.utcnow() - timedelta(minutes=2), "111111")]
+
+    async def get_valid_totp_code(created_after: datetime | None = None, **kwargs: Any) -> Any:
+        valid_codes = [
+            (created_at, code) for created_at, code in codes if not created_after or created_at > created_after
+        ]
+        if not valid_codes:
+            return None
+        return type("TOTPCode", (), {"code": max(valid_codes)[1]})
+
+    monkeypatch.setattr(app.DATABASE, "get_valid_totp_code", get_valid_totp_code)
+    monkeypatch.setattr(TOTP_CODE_WAITERS, "_ensure_listener", lambda: None)
+    return codes
+
+
+@pytest.mark.asyncio
+async def test_code_of_a_previous_login_is_not_used(
+    monkeypatch: pytest.MonkeyPatch, sent_codes: list[tuple[datetime, str]]
+) -> None:
+    monkeypatch.setattr(settings, "VERIFICATION_CODE_INITIAL_WAIT_TIME_SECS", 60)
+    start_datetime = datetime.utcnow()
+    wait_task = asyncio.create_task(
+        _wait_for_verification_code_from_db(
+            "tsk_1", "o_1", "john@example.com", start_datetime, start_datetime + timedelta(minutes=1)
+        )
+    )
+    await asyncio.sleep(0.01)
+    assert not wait_task.done()
+
+    sent_codes.append((datetime.utcnow(), "222222"))
+    TOTP_CODE_WAITERS.notify("o_1", "john@example.com")
+    assert await asyncio.wait_for(wait_task, timeout=5) == "222222"
+
+
+@pytest.mark.asyncio
+async def test_latest_code_is_used_after_the_initial_wait(
+    monkeypatch: pytest.MonkeyPatch, sent_codes: list[tuple[datetime, str]]
+) -> None:
+    monkeypatch.setattr(settings, "VERIFICATION_CODE_INITIAL_WAIT_TIME_SECS", 0)
+    start_datetime = datetime.utcnow()
+
+    verification_code = await _wait_for_verification_code_from_db(
+        "tsk_1", "o_1", "john@example.com", start_datetime, start_datetime + timedelta(minutes=1)
+    )
+    assert verification_code == "111111"
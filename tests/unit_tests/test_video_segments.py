@@ -0,0 +1,95 @@
+from datetime import datetime
+from pathlib import Path
+from typing import Any, cast
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from skyvern.config import settings
+from skyvern.forge import app
+from skyvern.forge.agent import ForgeAgent
+from skyvern.forge.sdk.artifact.models import Artifact, ArtifactType
+from skyvern.forge.sdk.artifact.storage.local import LocalStorage
+from skyvern.forge.sdk.artifact.storage.test_helpers import TEST_ORGANIZATION_ID, TEST_TASK_ID, create_fake_step
+from skyvern.webeye.browser_factory import BrowserArtifacts, BrowserState, VideoArtifact
+from skyvern.webeye.browser_manager import BrowserManager
+
+
+@pytest.mark.asyncio
+async def test_only_the_new_bytes_of_the_recording_are_segmented(tmp_path: Path) -> None:
+    video_path = tmp_path / "recording.webm"
+    video_path.write_bytes(b"a" * 10)
+    video_artifact = VideoArtifact(video_path=str(video_path), video_artifact_id="a_1")
+    browser_state = BrowserState(
+        pw=cast(Any, None), browser_artifacts=BrowserArtifacts(video_artifacts=[video_artifact])
+    )
+    browser_manager = BrowserManager()
+
+    video_segments = await browser_manager.get_new_video_segments(browser_state)
+    assert [(segment.segment_index, segment.data) for segment in video_segments] == [(0, b"a" * 10)]
+    # not advanced until uploaded
+    assert len(await browser_manager.get_new_video_segments(browser_state)) == 1
+    video_segments[0].mark_uploaded()
+
+    with video_path.open("ab") as f:
+        f.write(b"b" * 5)
+    # not grown enough for a new segment yet
+    assert await browser_manager.get_new_video_segments(browser_state, min_size=8) == []
+
+    with video_path.open("ab") as f:
+        f.write(b"c" * 5)
+    video_segments = await browser_manager.get_new_video_segments(browser_state, min_size=8)
+    assert [(segment.segment_index, segment.data) for segment in video_segments] == [(1, b"b" * 5 + b"c" * 5)]
+    video_segments[0].mark_uploaded()
+    assert await browser_manager.get_new_video_segments(browser_state) == []
+
+
+@pytest.mark.asyncio
+async def test_recording_is_advanced_once_its_segment_is_stored(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    storage = LocalStorage(artifact_path=str(tmp_path / "artifacts"))
+    step = create_fake_step("stp_1")
+    artifact = Artifact(
+        created_at=datetime.utcnow(),
+        modified_at=datetime.utcnow(),
+        artifact_id="a_1",
+        artifact_type=ArtifactType.RECORDING,
+        uri=storage.build_uri(
+            organization_id=TEST_ORGANIZATION_ID, artifact_id="a_1", step=step, artifact_type=ArtifactType.RECORDING
+        ),
+        organization_id=TEST_ORGANIZATION_ID,
+        task_id=TEST_TASK_ID,
+    )
+    monkeypatch.setattr(settings, "VIDEO_SEGMENT_MIN_SIZE_BYTES", 0)
+    monkeypatch.setattr(app, "STORAGE", storage)
+    monkeypatch.setattr(app.DATABASE, "get_artifact_by_id", AsyncMock(return_value=artifact))
+    store_artifact_segment = storage.store_artifact_segment
+    monkeypatch.setattr(storage, "store_artifact_segment", AsyncMock(return_value=False))
+
+    video_path = tmp_path / "recording.webm"
+    video_path.write_bytes(b"a" * 10)
+    video_artifact = VideoArtifact(video_path=str(video_path), video_artifact_id="a_1")
+    browser_state = BrowserState(
+        pw=cast(Any, None), browser_artifacts=BrowserArtifacts(video_artifacts=[video_artifact])
+    )
+    task = MagicMock(task_id=TEST_TASK_ID, organization_id=TEST_ORGANIZATION_ID)
+    agent = ForgeAgent()
+
+    await agent._record_video_after_action(task, step, browser_state)
+    # not advanced, the bytes of the failed segment are uploaded with the next one
+    assert (video_artifact.uploaded_size, video_artifact.segment_count) == (0, 0)
+
+    monkeypatch.setattr(storage, "store_artifact_segment", store_artifact_segment)
+    with video_path.open("ab") as f:
+        f.write(b"b" * 5)
+    await agent._record_video_after_action(task, step, browser_state)
+    await app.ARTIFACT_MANAGER.wait_for_upload_aiotasks([TEST_TASK_ID])
+
+    assert (video_artifact.uploaded_size, video_artifact.segment_count) == (15, 1)
+    segment_uris = await storage.list_artifact_segment_uris(artifact)
+    assert [await storage.retrieve_artifact_segment(segment_uri) for segment_uri in segment_uris] == [
+        b"a" * 10 + b"b" * 5
+    ]
+    # the recording at the artifact uri is current while the task runs
+    assert await storage.retrieve_artifact(artifact) == b"a" * 10 + b"b" * 5